@@ -0,0 +1,206 @@
+"""Index IVF (inverted file) pour la recherche approchée dans un VectorStore.
+
+Les vecteurs unitaires sont répartis en `nlist` listes par un k‑means sphérique ;
+une requête ne parcourt que les `nprobe` listes dont le centroïde est le plus
+proche, puis classe exactement ces candidats. `nprobe` règle le compromis
+rappel / latence (nprobe = nlist ⇒ recherche exacte).
+
+    • insertion incrémentale : chaque vecteur rejoint la liste de son centroïde,
+    • suppression par identifiant stable (traces oubliées du journal),
+    • entraînement paresseux : tant que moins de `train_min` vecteurs sont
+      indexés, l'index n'est pas prêt et le store fait un balayage exact ;
+      il se réentraîne quand la population a été multipliée par `retrain_factor`.
+
+Voir `benchmarks/ann_recall.py` pour le rappel mesuré contre la recherche exacte.
+"""
+
+import math
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+class _InvertedList:
+    """Identifiants et vecteurs d'une liste, en tableaux contigus à capacité doublée."""
+
+    def __init__(self, dim: int, dtype):
+        self.size = 0
+        self.ids = np.zeros(8, dtype=np.int64)
+        self.vectors = np.zeros((8, dim), dtype=dtype)
+
+    def extend(self, ids: np.ndarray, vectors: np.ndarray):
+        needed = self.size + len(ids)
+        if needed > len(self.ids):
+            capacity = max(needed, 2 * len(self.ids))
+            grown_ids = np.zeros(capacity, dtype=np.int64)
+            grown_vectors = np.zeros((capacity, self.vectors.shape[1]), dtype=self.vectors.dtype)
+            grown_ids[:self.size] = self.ids[:self.size]
+            grown_vectors[:self.size] = self.vectors[:self.size]
+            self.ids, self.vectors = grown_ids, grown_vectors
+        self.ids[self.size:needed] = ids
+        self.vectors[self.size:needed] = vectors
+        self.size = needed
+
+    def remove(self, ids: np.ndarray) -> int:
+        kept = np.flatnonzero(~np.isin(self.ids[:self.size], ids))
+        removed = self.size - kept.size
+        if removed:
+            self.ids[:kept.size] = self.ids[kept]
+            self.vectors[:kept.size] = self.vectors[kept]
+            self.size = kept.size
+        return removed
+
+
+def spherical_kmeans(vectors: np.ndarray, k: int, iters: int = 10, seed: int = 0) -> np.ndarray:
+    """Centroïdes unitaires (k, d) de vecteurs unitaires, par similarité cosinus."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)].copy()
+    for _ in range(iters):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vectors)
+        counts = np.bincount(assign, minlength=k)
+        empty = counts == 0
+        if empty.any():  # liste vide : réensemencée sur un point tiré au hasard
+            sums[empty] = vectors[rng.choice(len(vectors), size=int(empty.sum()))]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = np.divide(sums, norms, out=sums, where=norms != 0)
+    return centroids
+
+
+class IVFIndex:
+    """🧮 Index IVF sur vecteurs unitaires, indexés par identifiant stable.
+
+    Args:
+        nlist: Nombre de listes (None = √n au moment de l'entraînement).
+        nprobe: Listes parcourues par requête (compromis rappel / latence).
+        train_min: Population minimale avant le premier entraînement.
+        retrain_factor: Réentraîne quand la population dépasse ce facteur × celle du dernier entraînement.
+        kmeans_iters: Itérations du k‑means.
+        train_sample: Nombre maximal de vecteurs utilisés pour l'entraînement.
+        seed: Graine du k‑means (index reproductible).
+    """
+
+    def __init__(self, nlist: int | None = None, nprobe: int = 8, train_min: int = 2048,
+                 retrain_factor: float = 4.0, kmeans_iters: int = 10, train_sample: int = 65536, seed: int = 0):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_min = train_min
+        self.retrain_factor = retrain_factor
+        self.kmeans_iters = kmeans_iters
+        self.train_sample = train_sample
+        self.seed = seed
+        self.centroids = None
+        self.lists: List[_InvertedList] = []
+        self.where: Dict[int, int] = {}  # id → liste (-1 = en attente d'entraînement)
+        self.trained_size = 0
+        self._pending_ids: List[int] = []
+        self._pending_vectors: List[np.ndarray] = []
+
+    def __len__(self):
+        return len(self.where)
+
+    @property
+    def ready(self) -> bool:
+        return self.centroids is not None
+
+    # ------------------------------------------------------------------
+    def add(self, ids, vectors):
+        """Indexe des vecteurs unitaires (n, d) sous leurs identifiants."""
+        ids = np.atleast_1d(np.asarray(ids, dtype=np.int64))
+        vectors = np.atleast_2d(vectors)
+        if not self.ready:
+            self._pending_ids.extend(ids.tolist())
+            self._pending_vectors.extend(np.array(vectors))  # copie : les lignes du store bougent
+            self.where.update(dict.fromkeys(ids.tolist(), -1))
+            if len(self._pending_ids) >= self.train_min:
+                self.train()
+            return
+        self._assign(ids, vectors)
+        if len(self.where) > self.retrain_factor * self.trained_size:
+            self.train()
+
+    def remove(self, ids) -> int:
+        """Retire des identifiants de l'index ; retourne le nombre retiré."""
+        ids = np.atleast_1d(np.asarray(ids, dtype=np.int64))
+        lists = {}
+        for i in ids.tolist():
+            c = self.where.pop(i, None)
+            if c is not None:
+                lists.setdefault(c, []).append(i)
+        removed = 0
+        for c, members in lists.items():
+            members = np.asarray(members, dtype=np.int64)
+            if c < 0:
+                keep = ~np.isin(self._pending_ids, members)
+                self._pending_ids = [i for i, k in zip(self._pending_ids, keep) if k]
+                self._pending_vectors = [v for v, k in zip(self._pending_vectors, keep) if k]
+                removed += int((~keep).sum())
+            else:
+                removed += self.lists[c].remove(members)
+        return removed
+
+    def reset(self):
+        self.__init__(self.nlist, self.nprobe, self.train_min, self.retrain_factor,
+                      self.kmeans_iters, self.train_sample, self.seed)
+
+    # ------------------------------------------------------------------
+    def _all(self) -> Tuple[np.ndarray, np.ndarray]:
+        ids = [lst.ids[:lst.size] for lst in self.lists]
+        vectors = [lst.vectors[:lst.size] for lst in self.lists]
+        if self._pending_ids:
+            ids.append(np.asarray(self._pending_ids, dtype=np.int64))
+            vectors.append(np.stack(self._pending_vectors))
+        if not ids:
+            return np.zeros(0, dtype=np.int64), np.zeros((0, 0))
+        return np.concatenate(ids), np.concatenate(vectors)
+
+    def train(self):
+        """(Ré)entraîne les centroïdes et réaffecte tous les vecteurs indexés."""
+        ids, vectors = self._all()
+        if not len(ids):
+            return
+        k = self.nlist or max(1, int(math.sqrt(len(ids))))
+        rng = np.random.default_rng(self.seed)
+        sample = vectors if len(ids) <= self.train_sample else \
+            vectors[rng.choice(len(ids), size=self.train_sample, replace=False)]
+        self.centroids = spherical_kmeans(sample, min(k, len(sample)), self.kmeans_iters, self.seed)
+        self.lists = [_InvertedList(vectors.shape[1], vectors.dtype) for _ in range(len(self.centroids))]
+        self._pending_ids, self._pending_vectors = [], []
+        self.trained_size = len(ids)
+        self._assign(ids, vectors)
+
+    def _assign(self, ids: np.ndarray, vectors: np.ndarray):
+        assign = np.argmax(vectors @ self.centroids.T, axis=1)
+        order = np.argsort(assign, kind="stable")
+        bounds = np.searchsorted(assign[order], np.arange(len(self.lists) + 1))
+        for c in range(len(self.lists)):
+            members = order[bounds[c]:bounds[c + 1]]
+            if members.size:
+                self.lists[c].extend(ids[members], vectors[members])
+        self.where.update(zip(ids.tolist(), assign.tolist()))
+
+    # ------------------------------------------------------------------
+    def search(self, queries: np.ndarray, top_k: int, nprobe: int | None = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Top‑k approché de requêtes unitaires (B, d) : identifiants et scores (B, k).
+
+        Les lignes manquent de candidats si les listes sondées en contiennent moins
+        que k : identifiant −1 et score −inf en fin de ligne.
+        """
+        nprobe = min(nprobe or self.nprobe, len(self.lists))
+        coarse = queries @ self.centroids.T
+        probes = np.argpartition(-coarse, nprobe - 1, axis=1)[:, :nprobe]
+        out_ids = np.full((len(queries), top_k), -1, dtype=np.int64)
+        out_scores = np.full((len(queries), top_k), -np.inf, dtype=queries.dtype)
+        for b, q in enumerate(queries):
+            lists = [self.lists[c] for c in probes[b] if self.lists[c].size]
+            if not lists:
+                continue
+            ids = np.concatenate([lst.ids[:lst.size] for lst in lists])
+            scores = np.concatenate([lst.vectors[:lst.size] @ q for lst in lists])
+            k = min(top_k, len(ids))
+            best = np.argpartition(-scores, k - 1)[:k] if k < len(ids) else np.arange(len(ids))
+            best = best[np.lexsort((ids[best], -scores[best]))]
+            out_ids[b, :k] = ids[best]
+            out_scores[b, :k] = scores[best]
+        return out_ids, out_scores
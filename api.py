@@ -1,52 +1,299 @@
 """FastAPI pour exposer LyraCoreMinimal via HTTP.
 
 Endpoints :
-    • POST /lyra  {"prompt": str}  → réponse stylisée + états internes
-    • GET  /status                 → horodatage, nombre de traces, alertes CRITRIX
-    • POST /reset                 → réinitialise le core (facultatif)
+    • POST /lyra  {"prompt": str, "session_id"?: str}  → réponse stylisée + états internes
+    • POST /lyra/stream (même corps)  → flux SSE : événements `token` puis `state`
+    • POST /lyra/batch {"items": [{"prompt", "session_id"?}], "session_id"?}
+                                   → résultats dans l'ordre, erreurs par élément
+    • GET  /status?session_id=…    → horodatage, nombre de traces, alertes CRITRIX
+                                     (null si la session n'est pas résidente : jamais créée ni réveillée)
+    • GET  /metrics                → métriques Prometheus (durées par étape, files, caches)
+    • GET  /healthz                → 200 dès que le processus répond (vivant)
+    • GET  /readyz                 → 200 une fois modèles et clients chargés, 503 avant
+    • POST /reset?session_id=…[&forget=true] → réinitialise le core de la session
 
-L’application charge un unique LyraCoreMinimal en mémoire.
+Chaque session (champ `session_id`, en‑tête `X-Session-Id`, sinon "default")
+possède son propre LyraCoreMinimal, créé à la première requête et évincé par
+LRU/TTL (voir `lyra.sessions`). Configuration par variables d'environnement :
+LYRA_MAX_SESSIONS, LYRA_SESSION_TTL (s), LYRA_SESSION_MEMORY_MB, LYRA_CPU_WORKERS,
+LYRA_LLM_CACHE_SIZE / LYRA_LLM_CACHE_TTL (cache de complétions, voir `lyra.completion_cache`),
+LYRA_BATCH_MAX_ITEMS (taille maximale d'un lot, défaut 256),
+LYRA_EVENTS (flux d'événements JSONL/SQLite écrit en arrière-plan, voir `lyra.events`),
+LYRA_INTEGRATOR (euler|rk4|adaptive), LYRA_REALTIME (secondes simulées par seconde
+d'horloge entre deux requêtes d'une session ; 0, défaut : un pas par requête).
+
+Avec LYRA_MEMORY_DIR, le journal de chaque session est persisté sur disque
+(`<dir>/<session>/journal`, voir `lyra.sessions.session_key` pour les ids non sûrs) :
+une session évincée, un redéploiement ou /reset le rouvrent tel quel ;
+/reset?forget=true l'efface.
+
+Avec LYRA_HIBERNATE_DIR, une session évincée (LRU, TTL, budget mémoire) ou encore
+résidente à l'arrêt du processus est écrite sur disque en instantané binaire
+(`lyra.snapshot`) et réveillée telle quelle à sa requête suivante — y compris
+par un autre worker partageant le répertoire. /reset efface l'instantané.
+
+`POST /lyra?timings=true` ajoute `timings_ms` : durée de chaque étape du pas
+(llm, encode, journal.decay, dynamics.*, memory_query, styling…, voir `lyra.metrics`).
+
+Le chemin /lyra est entièrement asynchrone : appel LLM non bloquant, encodage et
+dynamique sur un pool de threads borné (`lyra.workers`).
+
+Démarrage à froid : l'import ne charge aucun modèle ; le préchauffage
+(`lyra.warmup`, LYRA_WARMUP=background|blocking|off) charge l'encodeur, le client
+LLM et construit un premier core pendant que /healthz répond déjà. Les durées
+d'import et de préchauffage sont exposées par /readyz et `lyra_startup_seconds`.
 """
 
-from fastapi import FastAPI, HTTPException
+from lyra.warmup import STARTED, Warmup  # en premier : point zéro de la mesure de démarrage
+
+import asyncio
+import json
+import os
+import shutil
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
+from typing import List
 from datetime import datetime
 
+from lyra.batch import run_batch
+from lyra.completion_cache import get_completion_cache
 from lyra.core_pipeline import LyraCoreMinimal
+from lyra.encoder import encoders
+from lyra.events import get_event_log
+from lyra.metrics import REGISTRY, Callback, collect_timings, process_memory, timings_ms
+from lyra.sessions import SessionManager, session_key
+from lyra.snapshot import Hibernator
+
+DEFAULT_SESSION = "default"
+
+
+def _env_float(name: str, default: float | None) -> float | None:
+    value = os.getenv(name)
+    return default if value in (None, "") else float(value)
+
+
+MEMORY_DIR = os.getenv("LYRA_MEMORY_DIR") or None
+
+
+def _memory_dir(session_id: str) -> str | None:
+    if MEMORY_DIR is None:
+        return None
+    return os.path.join(MEMORY_DIR, session_key(session_id))
+
+
+HIBERNATE_DIR = os.getenv("LYRA_HIBERNATE_DIR") or None
+
+WARMUP_MODE = os.getenv("LYRA_WARMUP", "background")
+warmup = Warmup()
+
+
+@asynccontextmanager
+async def lifespan(_app):
+    if WARMUP_MODE == "off":
+        warmup.skip()
+    elif WARMUP_MODE == "blocking":
+        await asyncio.get_running_loop().run_in_executor(None, warmup.run)
+    else:
+        warmup.start()
+    yield
+    await sessions.hibernate_all()
+
+
+app = FastAPI(title="Lyra API", version="0.2", lifespan=lifespan)
+sessions = SessionManager(
+    factory=lambda session_id: LyraCoreMinimal(dt=0.1, memory_dir=_memory_dir(session_id),
+                                               session_id=session_id,
+                                               integrator=os.getenv("LYRA_INTEGRATOR", "euler"),
+                                               realtime=_env_float("LYRA_REALTIME", 0.0)),
+    max_sessions=int(_env_float("LYRA_MAX_SESSIONS", 1000)),
+    ttl=_env_float("LYRA_SESSION_TTL", 3600.0),
+    max_memory_mb=_env_float("LYRA_SESSION_MEMORY_MB", None),
+    hibernator=Hibernator(HIBERNATE_DIR, memory_dir=_memory_dir) if HIBERNATE_DIR else None,
+)
 
-app = FastAPI(title="Lyra API", version="0.1")
-core = LyraCoreMinimal(dt=0.1)
+# ---------- Séries lues au scrape de /metrics (aucun coût par requête) ----------
+def _startup_phases():
+    phases = {("import",): IMPORT_SECONDS}
+    for name, component in warmup.components.items():
+        if "seconds" in component:
+            phases[(f"warmup.{name}",)] = component["seconds"]
+    if warmup.ready_after is not None:
+        phases[("ready",)] = warmup.ready_after
+    return phases
+
+
+def _per_encoder(stat: str):
+    return lambda: {(e.model_name,): e.stats().get(stat, 0) for e in encoders()}
+
+
+for _metric in (
+    Callback("lyra_sessions", "Sessions résidentes.", lambda: len(sessions)),
+    Callback("lyra_session_evictions_total", "Sessions évincées (LRU, TTL, mémoire).",
+             lambda: sessions.evictions, kind="counter"),
+    Callback("lyra_journal_traces", "Traces actives, tous journaux résidents confondus.",
+             lambda: sum(len(s.core.journal.store) for s in list(sessions.sessions.values()))),
+    Callback("lyra_encoder_queue_depth", "Textes en attente d'encodage.",
+             _per_encoder("queue_depth"), labelnames=("model",)),
+    Callback("lyra_encoder_batches_total", "Appels au modèle d'encodage.",
+             _per_encoder("batches"), kind="counter", labelnames=("model",)),
+    Callback("lyra_encoder_items_total", "Textes encodés par le modèle.",
+             _per_encoder("items"), kind="counter", labelnames=("model",)),
+    Callback("lyra_embedding_cache_hits_total", "Embeddings servis par le cache.",
+             _per_encoder("cache_hits"), kind="counter", labelnames=("model",)),
+    Callback("lyra_embedding_cache_misses_total", "Embeddings absents du cache.",
+             _per_encoder("cache_misses"), kind="counter", labelnames=("model",)),
+    Callback("lyra_llm_cache_hits_total", "Complétions servies par le cache.",
+             lambda: get_completion_cache().hits, kind="counter"),
+    Callback("lyra_llm_upstream_calls_total", "Complétions demandées au backend via le cache.",
+             lambda: get_completion_cache().upstream_calls, kind="counter"),
+    Callback("lyra_events_pending", "Événements en attente d'écriture.",
+             lambda: get_event_log().stats()["pending"]),
+    Callback("lyra_events_dropped_total", "Événements abandonnés (file pleine).",
+             lambda: get_event_log().dropped, kind="counter"),
+    Callback("lyra_startup_seconds", "Durées de démarrage : import de l'API, préchauffage par composant, prêt.",
+             lambda: _startup_phases(), labelnames=("phase",)),
+    Callback("lyra_ready", "1 quand le préchauffage est terminé.", lambda: int(warmup.ready)),
+    Callback("lyra_process_memory_bytes", "Mémoire du worker : rss, pss, private (voir lyra.metrics.process_memory).",
+             lambda: {(k,): v for k, v in process_memory().items() if k in ("rss", "pss", "private")},
+             labelnames=("kind",)),
+):
+    REGISTRY.register(_metric)
 
 class PromptIn(BaseModel):
     prompt: str
+    session_id: str | None = None
+
+class BatchItemIn(BaseModel):
+    prompt: str
+    session_id: str | None = None
+
+class BatchIn(BaseModel):
+    items: List[BatchItemIn]
+    session_id: str | None = None
+
+BATCH_MAX_ITEMS = int(_env_float("LYRA_BATCH_MAX_ITEMS", 256))
+
+def _session_id(explicit: str | None, header: str | None) -> str:
+    return explicit or header or DEFAULT_SESSION
 
 @app.post("/lyra")
-async def run_lyra(data: PromptIn):
+async def run_lyra(data: PromptIn, timings: bool = False, x_session_id: str | None = Header(default=None)):
     if len(data.prompt.strip()) == 0:
         raise HTTPException(status_code=400, detail="Prompt cannot be empty")
-    result = core.step(user_prompt=data.prompt)
-    return {
+    session_id = _session_id(data.session_id, x_session_id)
+    with collect_timings() as breakdown:
+        async with sessions.use(session_id) as core:
+            result = await core.astep(user_prompt=data.prompt)
+    response = {
         "timestamp": datetime.utcnow().isoformat(),
+        "session_id": session_id,
         "styled_output": result["styled_output"],
         "critrix_alert": result["critrix_alert"],
         "noyau_state": result["noyau_state"],
         "t": result["t"],
     }
+    if timings:
+        response["timings_ms"] = timings_ms(breakdown)
+    return response
+
+@app.post("/lyra/stream")
+async def stream_lyra(data: PromptIn, x_session_id: str | None = Header(default=None)):
+    """Server-Sent Events : `token` (texte stylisé incrémental) puis `state` (états finaux)."""
+    if len(data.prompt.strip()) == 0:
+        raise HTTPException(status_code=400, detail="Prompt cannot be empty")
+    session_id = _session_id(data.session_id, x_session_id)
+
+    async def events():
+        async with sessions.use(session_id) as core:
+            async for kind, payload in core.astream(data.prompt):
+                if kind == "state":
+                    payload = {
+                        "timestamp": datetime.utcnow().isoformat(),
+                        "session_id": session_id,
+                        "styled_output": payload["styled_output"],
+                        "critrix_alert": payload["critrix_alert"],
+                        "noyau_state": payload["noyau_state"],
+                        "t": payload["t"],
+                    }
+                else:
+                    payload = {"text": payload}
+                yield f"event: {kind}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.post("/lyra/batch")
+async def batch_lyra(data: BatchIn, x_session_id: str | None = Header(default=None)):
+    """Plusieurs prompts (une ou plusieurs sessions) : LLM en parallèle, encodage et dynamique groupés."""
+    if not data.items:
+        raise HTTPException(status_code=400, detail="Batch cannot be empty")
+    if len(data.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch limited to {BATCH_MAX_ITEMS} items")
+    default = _session_id(data.session_id, x_session_id)
+    items = [(item.session_id or default, item.prompt) for item in data.items]
+    results = await run_batch(sessions, items)
+    out = []
+    for index, result in enumerate(results):
+        if "error" in result:
+            out.append({"index": index, "session_id": result["session_id"], "error": result["error"]})
+        else:
+            out.append({
+                "index": index,
+                "session_id": result["session_id"],
+                "styled_output": result["styled_output"],
+                "critrix_alert": result["critrix_alert"],
+                "noyau_state": result["noyau_state"],
+                "t": result["t"],
+            })
+    return {"timestamp": datetime.utcnow().isoformat(), "results": out}
+
+@app.get("/healthz")
+async def healthz():
+    return {"status": "alive"}
+
+@app.get("/readyz")
+async def readyz():
+    body = {"ready": warmup.ready, "import_s": IMPORT_SECONDS, **warmup.report()}
+    return JSONResponse(body, status_code=200 if warmup.ready else 503)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 @app.get("/status")
-async def status():
+async def status(session_id: str | None = None, x_session_id: str | None = Header(default=None)):
+    session_id = _session_id(session_id, x_session_id)
+    # lecture seule : ni création, ni réveil, ni rafraîchissement LRU de la session
+    session = sessions.get(session_id)
+    core = session.core if session is not None else None
+    events = get_event_log() if core is None else core.events
     return {
         "timestamp": datetime.utcnow().isoformat(),
-        "t": round(core.t, 2),
-        "memory_traces": core.journal.get_status()["active_traces"],
-        "critrix_alert": core.critrix.is_over_threshold,
+        "session_id": session_id,
+        "resident": core is not None,
+        "t": round(core.t, 2) if core is not None else None,
+        "memory_traces": core.journal.get_status()["active_traces"] if core is not None else None,
+        "critrix_alert": bool(core.critrix.is_over_threshold) if core is not None else None,
+        "sessions": sessions.stats(),
+        "llm_cache": cache.stats() if (cache := get_completion_cache()) is not None else None,
+        "events": events.stats() if events is not None else None,
     }
 
 @app.post("/reset")
-async def reset_core():
-    global core
-    core = LyraCoreMinimal(dt=0.1)
-    return {"status": "reset", "timestamp": datetime.utcnow().isoformat()}
+async def reset_core(session_id: str | None = None, forget: bool = False,
+                     x_session_id: str | None = Header(default=None)):
+    session_id = _session_id(session_id, x_session_id)
+    memory_dir = _memory_dir(session_id) if forget else None
+    # journal fermé et effacé avant qu'une requête ne rouvre le dossier
+    await sessions.reset(session_id, then=(lambda: shutil.rmtree(memory_dir, ignore_errors=True)) if memory_dir else None)
+    return {"status": "reset", "session_id": session_id, "forgotten": forget,
+            "timestamp": datetime.utcnow().isoformat()}
+
+IMPORT_SECONDS = round(time.perf_counter() - STARTED, 4)
 
 # Pour exécuter :
 #   uvicorn lyra.api:app --reload
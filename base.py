@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 import numpy as np
-from typing import Dict, Callable, Tuple
+from typing import Dict, Callable, Iterable, Tuple
+
+from lyra.delay import DelayLine, capacity_for
 
 
 class LyraModule(ABC):
@@ -12,21 +14,52 @@ class LyraModule(ABC):
         params (dict): Paramètres, les racines de la dynamique.
         neighbors (dict): Voisins {name: (rho, delta, gfunc)}, filaments de couplage.
         tau_c (float): Tension locale, écho de la cohérence critique.
+        history (DelayLine): États passés, lus par les voisins à t − δ.
+
+    Un module peut être lié à un `LyraNetwork` : son état vit alors dans le
+    vecteur d'état compilé du réseau (voir `lyra.network`).
     """
 
+    # Version vectorisée facultative de `intrinsic`, utilisée par LyraNetwork pour
+    # tous les modules d'une même classe : intrinsic_batch(t, state, params) → ndarray,
+    # où `params` associe à chaque clé de `batch_params` un tableau (défaut si absente).
+    batch_params: Dict[str, float] = {}
+    intrinsic_batch = None
+    # Vrai si `intrinsic` fait évoluer un état interne (ex. tau_c de CRITRIX) : les
+    # intégrateurs d'ordre supérieur ne l'évaluent alors qu'une fois par pas.
+    stateful_intrinsic = False
+
     def __init__(self, name: str, params: Dict, neighbors: Dict[str, Tuple[float, float, Callable]] = None):
         if not isinstance(name, str) or not name:
             raise ValueError("Name must be a non-empty string")
         if not isinstance(params, dict):
             raise ValueError("Params must be a dictionary")
         self.name = name
+        self._network = None
+        self._index = -1
+        self._state = 0.0
         self.state = params.get("state0", 0.0)
         self.params = params
         self.neighbors = neighbors or {}
-        self.input_cache = {}
+        self.ext_inputs: Dict[str, Callable[[float], float]] = {}
+        self.history = DelayLine()
         self.tau_c = 0.0
+        self.topology_version = 0
         self._validate_neighbors()
 
+    @property
+    def state(self) -> float:
+        if self._network is not None:
+            return self._network.x[self._index]
+        return self._state
+
+    @state.setter
+    def state(self, value: float):
+        if self._network is not None:
+            self._network.x[self._index] = value
+        else:
+            self._state = value
+
     def _validate_neighbors(self):
         for j, (rho, delta, gfunc) in self.neighbors.items():
             if not isinstance(rho, (int, float)) or not isinstance(delta, (int, float)):
@@ -38,6 +71,42 @@ class LyraModule(ABC):
         """Ajoute un voisin, un filament mycélien."""
         self.neighbors[name] = (rho, delta, gfunc)
         self._validate_neighbors()
+        self.topology_version += 1
+
+    def record(self, t: float):
+        """Inscrit l'état courant dans l'historique (une fois par instant t)."""
+        if self._network is not None:
+            self._network.history.push(t, self._index, self.state)
+        else:
+            self.history.push(t, 0, self.state)
+
+    def state_at(self, t: float) -> float:
+        """État au temps t (interpolé dans l'historique, vivant si t est récent)."""
+        if self._network is not None:
+            return self._network.state_at(self._index, t)
+        return self.history.read(0, t, self.state)[0]
+
+    def read_input(self, j: str, t: float):
+        """Signal du voisin j au temps t via les entrées du dernier pas (None si absent)."""
+        source = self.ext_inputs.get(j)
+        return None if source is None else source(t)
+
+    def coupling(self, t: float) -> float:
+        """Somme des influences des voisins au temps t : Σ rho·gfunc(x_j(t − δ))."""
+        total = 0.0
+        for j, (rho, delta, gfunc) in self.neighbors.items():
+            value = self.read_input(j, t - delta)
+            if value is not None:
+                total += rho * gfunc(value)
+        return total
+
+    def jump(self, t: float, steps: int, dt: float, exact: bool = False) -> bool:
+        """Avance de `steps` pas depuis t en forme close, voisins figés (False : non applicable).
+
+        exact=False reproduit les pas d'Euler ; exact=True suit la solution
+        continue (intégrateurs "rk4"/"adaptive"). Utilisé par `LyraNetwork.advance`.
+        """
+        return False
 
     def update_tau_c(self, input_value: float, output_value: float) -> float:
         """Calcule la tension locale, écho de la cohérence."""
@@ -53,26 +122,79 @@ class LyraModule(ABC):
         """Évolue l’état, tissant les influences internes et externes."""
         if not isinstance(ext_inputs, dict):
             raise ValueError("ext_inputs must be a dictionary of callables")
+        self.ext_inputs = ext_inputs
+        self.record(t)
         dx = self.intrinsic(t)
         for j, (rho, delta, gfunc) in self.neighbors.items():
             if j not in ext_inputs:
                 continue
-            cache_key = (j, t - delta)
-            if cache_key not in self.input_cache:
-                self.input_cache[cache_key] = ext_inputs[j](t - delta)
-            input_value = self.input_cache[cache_key]
+            input_value = ext_inputs[j](t - delta)
             dx += rho * gfunc(input_value)
         self.state += dx * self.params.get("dt", 0.1)
         self.state = np.clip(self.state, -10, 10)
         return self.state
 
 
+def delayed_inputs(modules: Iterable[LyraModule]) -> Dict[str, Callable[[float], float]]:
+    """Prépare les entrées retardées d'un ensemble de modules pas‑à‑pas.
+
+    L'historique de chaque module est dimensionné d'après le plus grand délai
+    des arêtes qui le lisent ; retourne {name: callable(t) → état à t}.
+    """
+    modules = list(modules)
+    horizon: Dict[str, float] = {}
+    for m in modules:
+        for j, (_rho, delta, _g) in m.neighbors.items():
+            horizon[j] = max(horizon.get(j, 0.0), delta)
+    for m in modules:
+        m.history.reserve(capacity_for(horizon.get(m.name, 0.0), m.params.get("dt", 0.1)))
+    return {m.name: m.state_at for m in modules}
+
+
 # 🔬 Exemple minimal de module lyrique
 class PoeticModule(LyraModule):
     """Un module poétique, tissant des pulsations créatives."""
+    batch_params = {"alpha": 0.1}
+
     def intrinsic(self, t: float) -> float:
         return -self.params.get("alpha", 0.1) * self.state + np.sin(t)
 
+    @staticmethod
+    def intrinsic_batch(t: float, state: np.ndarray, params: Dict[str, np.ndarray]) -> np.ndarray:
+        return -params["alpha"] * state + np.sin(t)
+
+    def jump(self, t: float, steps: int, dt: float, exact: bool = False) -> bool:
+        """dx/dt = −αx + sin(t) + c : décroissance linéaire forcée, sommée en forme close.
+
+        Euler : x_n = rⁿx₀ + dt·Σ r^(n−1−k)(sin(t + k·dt) + c), r = 1 − α·dt, la
+        somme des sinus étant une série géométrique complexe. Refusé si l'état
+        pouvait atteindre les bornes ±10 en chemin.
+        """
+        alpha = self.params.get("alpha", 0.1)
+        c = self.coupling(t)
+        x0 = float(self.state)
+        if exact:
+            if alpha <= 0:
+                return False
+            bound = (1.0 + abs(c)) / alpha
+            tau = steps * dt
+            decay = np.exp(-alpha * tau)
+            forced = (np.exp(1j * tau) - decay) / (alpha + 1j)
+            x = decay * x0 + c * (1.0 - decay) / alpha + (np.exp(1j * t) * forced).imag
+        else:
+            r = 1.0 - alpha * dt
+            if not 0 < alpha * dt < 2:
+                return False
+            bound = dt * (1.0 + abs(c)) / (1.0 - abs(r))
+            rn = r ** steps
+            z = np.exp(1j * dt)
+            sines = (np.exp(1j * t) * (rn - z ** steps) / (r - z)).imag
+            x = rn * x0 + dt * (sines + c * (1.0 - rn) / (1.0 - r))
+        if max(abs(x0), bound) > 10:
+            return False
+        self.state = float(x)
+        return True
+
 
 # 🧪 Test local
 if __name__ == "__main__":
@@ -84,10 +206,7 @@ if __name__ == "__main__":
     module1.add_neighbor("pun", rho=0.5, delta=0.1, gfunc=identity)
     module2.add_neighbor("metaphor", rho=0.3, delta=0.2, gfunc=identity)
 
-    ext_inputs = {
-        "metaphor": lambda t: module1.state,
-        "pun": lambda t: module2.state
-    }
+    ext_inputs = delayed_inputs([module1, module2])
 
     for t in np.arange(0, 10, 0.1):
         s1 = module1.step(t, ext_inputs)
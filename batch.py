@@ -0,0 +1,90 @@
+"""Traitement par lots : plusieurs prompts, une ou plusieurs sessions, un appel.
+
+Déroulé de `run_batch` :
+    1. verrouille chaque session concernée (ordre fixe : pas d'interblocage),
+    2. lance tous les appels LLM en parallèle (`asyncio.gather`),
+    3. encode en un seul lot par encodeur les prompts (vecteurs de requête) et
+       les traces que le journal va capter (déposées dans le cache d'embeddings),
+    4. fait avancer la dynamique de tous les éléments en un seul passage sur le
+       pool CPU, dans l'ordre du lot (un même core voit ses prompts en séquence).
+
+Chaque élément produit soit le résultat de `LyraCoreMinimal.step`, soit une
+erreur ({"error": ...}) sans interrompre le reste du lot.
+"""
+
+import asyncio
+from contextlib import AsyncExitStack
+from typing import Dict, List, Sequence, Tuple
+
+from lyra.workers import run_cpu
+
+
+def _prefetch(cores: Dict[str, object], items, replies) -> Dict[int, object]:
+    """Un appel `encode_many` par encodeur ; retourne le vecteur de requête de chaque élément.
+
+    Si l'appel d'un encodeur échoue, ses éléments sont omis : `step` les encode
+    alors lui‑même et une erreur persistante ne touche que ces éléments.
+    """
+    groups: Dict[int, Tuple[object, List[str]]] = {}
+    for i, (session_id, prompt) in items:
+        core = cores[session_id]
+        encoder = core.journal.encoder
+        _, texts = groups.setdefault(id(encoder), (encoder, []))
+        texts.append(prompt)
+        if encoder.cache is not None:
+            texts.extend(core.trace_texts(replies[i]))
+    vectors = {}
+    for encoder, texts in groups.values():
+        unique = list(dict.fromkeys(texts))
+        try:
+            encoded = encoder.encode_many(unique)
+        except Exception:  # repli sur l'encodage élément par élément dans `step`
+            continue
+        for text, vector in zip(unique, encoded):
+            vectors[(id(encoder), text)] = vector
+    keys = {i: (id(cores[sid].journal.encoder), prompt) for i, (sid, prompt) in items}
+    return {i: vectors[key] for i, key in keys.items() if key in vectors}
+
+
+def _advance_all(cores, items, replies, query_vecs, results):
+    for i, (session_id, prompt) in items:
+        try:
+            results[i] = {"session_id": session_id,
+                          **cores[session_id].step(prompt, reply=replies[i], query_vec=query_vecs.get(i))}
+        except Exception as exc:  # un élément en échec n'interrompt pas le lot
+            results[i] = {"session_id": session_id, "error": f"{type(exc).__name__}: {exc}"}
+
+
+async def run_batch(sessions, items: Sequence[Tuple[str, str]]) -> List[Dict]:
+    """Traite [(session_id, prompt)] ; résultats (ou erreurs) dans l'ordre des éléments."""
+    results: List[Dict | None] = [None] * len(items)
+    pending = []
+    for i, (session_id, prompt) in enumerate(items):
+        if prompt.strip():
+            pending.append((i, (session_id, prompt)))
+        else:
+            results[i] = {"session_id": session_id, "error": "Prompt cannot be empty"}
+
+    async with AsyncExitStack() as stack:
+        cores = {}
+        for session_id in sorted({sid for _, (sid, _) in pending}):
+            cores[session_id] = await stack.enter_async_context(sessions.use(session_id))
+
+        # 1) LLM : tous les appels en parallèle
+        outcomes = await asyncio.gather(
+            *(cores[sid].autogenesis.agenerate(prompt) for _, (sid, prompt) in pending),
+            return_exceptions=True,
+        )
+        replies, ready = {}, []
+        for (i, (session_id, prompt)), outcome in zip(pending, outcomes):
+            if isinstance(outcome, BaseException):
+                results[i] = {"session_id": session_id, "error": f"{type(outcome).__name__}: {outcome}"}
+            else:
+                replies[i] = outcome
+                ready.append((i, (session_id, prompt)))
+
+        # 2) Encodage groupé, 3) dynamique de tout le lot sur le pool CPU
+        if ready:
+            query_vecs = await run_cpu(_prefetch, cores, ready, replies)
+            await run_cpu(_advance_all, cores, ready, replies, query_vecs, results)
+    return results
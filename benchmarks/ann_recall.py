@@ -0,0 +1,75 @@
+"""Rappel de l'index IVF contre la recherche exacte du VectorStore.
+
+Données synthétiques proches d'embeddings de phrases : mélange de gaussiennes
+en dimension 384 (thèmes) plus bruit, vecteurs normalisés. Pour chaque
+`nprobe`, mesure recall@k (fraction des k voisins exacts retrouvés) et la
+latence moyenne par requête.
+
+    python -m lyra.benchmarks.ann_recall --n 100000 --queries 200 --k 10
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from lyra.ann import IVFIndex
+from lyra.vector_store import VectorStore
+
+
+def synthetic_embeddings(n: int, dim: int, topics: int, noise: float, rng) -> np.ndarray:
+    centers = rng.normal(size=(topics, dim))
+    vectors = centers[rng.integers(topics, size=n)] + noise * rng.normal(size=(n, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--topics", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=1.0)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=None)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    data = synthetic_embeddings(args.n + args.queries, args.dim, args.topics, args.noise, rng)
+    base, queries = data[:args.n], data[args.n:]
+
+    exact = VectorStore(dim=args.dim, capacity=args.n)
+    for v in base:
+        exact.add(0.0, 0.0, v)
+
+    start = time.perf_counter()
+    index = IVFIndex(nlist=args.nlist, train_min=args.n)
+    approx = VectorStore(dim=args.dim, capacity=args.n, index=index)
+    for v in base:  # insertion incrémentale, entraînement déclenché à train_min
+        approx.add(0.0, 0.0, v)
+    print(f"index : {len(index.lists)} listes, construit en {time.perf_counter() - start:.1f} s")
+
+    start = time.perf_counter()
+    truth = [exact.search(q, args.k)[0] for q in queries]
+    exact_ms = 1000 * (time.perf_counter() - start) / args.queries
+    print(f"exact : {exact_ms:.2f} ms/requête")
+
+    print(f"{'nprobe':>6} {'recall@' + str(args.k):>10} {'ms/req':>8}")
+    for nprobe in args.nprobe:
+        start = time.perf_counter()
+        found = [approx.search(q, args.k, nprobe=nprobe)[0] for q in queries]
+        ms = 1000 * (time.perf_counter() - start) / args.queries
+        recall = np.mean([len(np.intersect1d(f, t)) / args.k for f, t in zip(found, truth)])
+        print(f"{nprobe:>6} {recall:>10.3f} {ms:>8.2f}")
+
+    # suppression : les traces oubliées disparaissent des résultats
+    approx.keep(np.arange(len(approx)) % 2 == 0)
+    leftover = np.concatenate([approx.search(q, args.k)[0] for q in queries[:20]])
+    assert (approx.ids[leftover[leftover >= 0]] % 2 == 0).all()
+    print(f"après suppression de la moitié : {len(index)} vecteurs indexés")
+
+
+if __name__ == "__main__":
+    main()
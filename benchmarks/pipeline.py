@@ -0,0 +1,293 @@
+"""Micro‑benchmarks des chemins chauds de /lyra, hors ligne et reproductibles.
+
+LLM et encodeur sont remplacés par leurs backends locaux déterministes
+(LYRA_LLM_BACKEND=stub sans latence, LYRA_ENCODER_BACKEND=stub) : seul le
+coût propre à Lyra est mesuré. Chaque cas est chronométré en `rounds` séries
+d'au moins `min_time` secondes ; on retient le temps par appel (médiane, min,
+écart interquartile).
+
+    python -m lyra.benchmarks.pipeline run --out benchmarks/baselines/main.json
+    python -m lyra.benchmarks.pipeline run --filter journal --out /tmp/new.json
+    python -m lyra.benchmarks.pipeline compare benchmarks/baselines/main.json /tmp/new.json
+
+`compare` signale chaque cas dont la médiane dépasse celle de la référence de
+plus de `--threshold` (défaut 15 %) et sort avec le code 1 s'il y en a un.
+"""
+
+import os
+
+# Avant tout import de lyra : backends locaux, caches et flux d'événements neutres
+os.environ["LYRA_LLM_BACKEND"] = "stub"
+os.environ["LYRA_STUB_LATENCY_MS"] = "0"
+os.environ["LYRA_ENCODER_BACKEND"] = "stub"
+os.environ["LYRA_LLM_CACHE_SIZE"] = "0"
+os.environ.pop("LYRA_EMBEDDING_CACHE_DIR", None)
+os.environ.pop("LYRA_EVENTS", None)
+
+import argparse
+import itertools
+import json
+import math
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict
+
+import numpy as np
+
+from lyra.base import PoeticModule, delayed_inputs
+from lyra.core_pipeline import LyraCoreMinimal
+from lyra.modules.journal import JournalOubli
+from lyra.modules.noyau_emotionnel import ContexteDynamique, NoyauEmotionnel
+from lyra.modules.vectorsonde import VectorSonde
+from lyra.snapshot import dumps, loads
+from lyra.transfer_functions import tanh
+
+NEIGHBOR_COUNTS = (1, 8, 64)
+MEMORY_SIZES = (100, 1000, 10000)
+MESSAGE = ("Merci pour cette lumière, c'est super mais un peu triste et vide ce soir, "
+           "comme un rivage absurde où l'on attend un écho qui ne vient pas.")
+PROMPTS = ("bonjour", "c'est triste et vide", "génial super", "une mer de silence", "merci joli")
+
+# Nom du cas → préparation ; la préparation renvoie l'appel (sans argument) à chronométrer
+CASES: Dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def case(name: str):
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+# ----------------------------------------------------------------------
+def _module_step(neighbors: int):
+    dt = 0.1
+    sources = [PoeticModule(f"n{i}", {"dt": dt}) for i in range(neighbors)]
+    module = PoeticModule("m", {"dt": dt})
+    for i, source in enumerate(sources):
+        module.add_neighbor(source.name, rho=0.1, delta=0.1 * (i % 3), gfunc=tanh)
+    inputs = delayed_inputs(sources + [module])
+    clock = itertools.count()
+    return lambda: module.step(next(clock) * dt, inputs)
+
+
+def _fill(store, size: int, dim: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    for k, vector in enumerate(rng.standard_normal((size, dim)).astype(np.float32)):
+        store.add(0.01 * k, 1.0, vector, {"source": "bench", "text_form": f"trace {k}"})
+
+
+def _journal(size: int) -> JournalOubli:
+    journal = JournalOubli("journal", {"lambda": 0.001, "threshold": 0.01, "max_length": size, "dt": 0.1})
+    _fill(journal.store, size, journal.encoder.dimension)
+    journal._anchor = float(journal.store.times[journal.store.live_rows()[-1]])
+    return journal
+
+
+def _journal_step(size: int):
+    journal = _journal(size)
+    journal.add_neighbor("src", rho=1.0, delta=0.0, gfunc=tanh)
+    inputs = {"src": math.sin}
+    clock = itertools.count(int(journal.resume_time / 0.1) + 1)
+    return lambda: journal.step(next(clock) * 0.1, inputs)
+
+
+def _journal_query(size: int):
+    journal = _journal(size)
+    return lambda: journal.query_similar("une mer de silence", top_k=5)
+
+
+def _sonde_query(size: int):
+    sonde = VectorSonde("sonde", {"max_length": size})
+    _fill(sonde.store, size, sonde.encoder.dimension)
+    return lambda: sonde.query("une mer de silence", top_k=5)
+
+
+for _n in NEIGHBOR_COUNTS:
+    CASES[f"module.step[neighbors={_n}]"] = lambda n=_n: _module_step(n)
+for _m in MEMORY_SIZES:
+    CASES[f"journal.step[memory={_m}]"] = lambda m=_m: _journal_step(m)
+    CASES[f"journal.query_similar[memory={_m}]"] = lambda m=_m: _journal_query(m)
+    CASES[f"vectorsonde.query[memory={_m}]"] = lambda m=_m: _sonde_query(m)
+
+
+def _noyau() -> NoyauEmotionnel:
+    return NoyauEmotionnel(sensibilite=0.8, contexte=ContexteDynamique(objectif="Exploration sensible"))
+
+
+@case("noyau.reagir")
+def _noyau_reagir():
+    noyau = _noyau()
+    return lambda: noyau.reagir(MESSAGE)
+
+
+@case("noyau._styliser")
+def _noyau_styliser():
+    noyau = _noyau()
+    noyau.reagir(MESSAGE)
+    return lambda: noyau._styliser(MESSAGE)
+
+
+@case("noyau.exprimer")
+def _noyau_exprimer():
+    noyau = _noyau()
+    noyau.reagir(MESSAGE)
+    return lambda: noyau.exprimer(MESSAGE)
+
+
+@case("core.step")
+def _core_step():
+    core = LyraCoreMinimal(dt=0.1)
+    prompts = itertools.cycle(PROMPTS)
+    for _ in range(50):  # mémoire du journal en régime établi
+        core.step(next(prompts))
+    return lambda: core.step(next(prompts))
+
+
+@case("core.advance[idle=1h]")
+def _core_advance():
+    core = LyraCoreMinimal(dt=0.1)
+    core.step(PROMPTS[0])
+    core.advance(core.t + 60.0)  # journal en régime : chaque appel est un saut en forme close
+    return lambda: core.advance(core.t + 3600.0)
+
+
+def _core_with_memory(size: int) -> LyraCoreMinimal:
+    core = LyraCoreMinimal(dt=0.1)
+    core.step(PROMPTS[0])
+    core.journal.max_length = size + 1
+    _fill(core.journal.store, size, core.journal.encoder.dimension)
+    return core
+
+
+def _snapshot_dumps(size: int):
+    core = _core_with_memory(size)
+    return lambda: dumps(core)
+
+
+def _snapshot_loads(size: int):
+    data = dumps(_core_with_memory(size))
+    return lambda: loads(data)
+
+
+for _m in MEMORY_SIZES:
+    CASES[f"snapshot.dumps[memory={_m}]"] = lambda m=_m: _snapshot_dumps(m)
+    CASES[f"snapshot.loads[memory={_m}]"] = lambda m=_m: _snapshot_loads(m)
+
+
+# ----------------------------------------------------------------------
+def measure(fn: Callable[[], object], rounds: int, min_time: float) -> Dict[str, float]:
+    """Temps par appel (µs) sur `rounds` séries calibrées à au moins `min_time` s."""
+    fn()  # échauffement (caches, compilation du réseau…)
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops = max(loops * 2, int(loops * min_time / max(elapsed, 1e-9) * 1.2))
+    samples = [elapsed / loops * 1e6]
+    for _ in range(rounds - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        samples.append((time.perf_counter() - start) / loops * 1e6)
+    quartiles = statistics.quantiles(samples, n=4) if len(samples) > 1 else [samples[0]] * 3
+    return {
+        "median_us": statistics.median(samples),
+        "min_us": min(samples),
+        "iqr_us": quartiles[2] - quartiles[0],
+        "rounds": rounds,
+        "loops": loops,
+    }
+
+
+def _environment() -> Dict[str, str]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "date": datetime.utcnow().isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": str(os.cpu_count()),
+    }
+
+
+def run(args) -> int:
+    pattern = re.compile(args.filter) if args.filter else None
+    results = {}
+    for name, setup in CASES.items():
+        if pattern is not None and not pattern.search(name):
+            continue
+        results[name] = stats = measure(setup(), args.rounds, args.min_time)
+        print(f"{name:<38} {stats['median_us']:>12.2f} µs  (min {stats['min_us']:.2f}, "
+              f"iqr {stats['iqr_us']:.2f}, {stats['loops']}×{stats['rounds']})", flush=True)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump({"environment": _environment(), "results": results}, fh, indent=2)
+        print(f"→ {args.out}")
+    return 0
+
+
+def compare(args) -> int:
+    with open(args.baseline, encoding="utf-8") as fh:
+        base = json.load(fh)["results"]
+    with open(args.candidate, encoding="utf-8") as fh:
+        new = json.load(fh)["results"]
+    regressions = 0
+    print(f"{'cas':<38} {'référence':>12} {'candidat':>12} {'ratio':>7}")
+    for name in sorted(base.keys() | new.keys()):
+        if name not in new or name not in base:
+            print(f"{name:<38} {'absent' if name not in base else '':>12} "
+                  f"{'absent' if name not in new else '':>12}")
+            continue
+        before, after = base[name]["median_us"], new[name]["median_us"]
+        ratio = after / before if before else math.inf
+        # la variation doit aussi dépasser la dispersion mesurée des deux côtés
+        noise = max(base[name].get("iqr_us", 0.0), new[name].get("iqr_us", 0.0))
+        flag = ""
+        if ratio > 1 + args.threshold and after - before > noise:
+            flag, regressions = "  ⚠ régression", regressions + 1
+        elif ratio < 1 - args.threshold and before - after > noise:
+            flag = "  ✔ amélioration"
+        print(f"{name:<38} {before:>10.2f}µs {after:>10.2f}µs {ratio:>6.2f}×{flag}")
+    print(f"{regressions} régression(s) au-delà de {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="mesure les cas et enregistre les résultats (JSON)")
+    run_parser.add_argument("--out", default=None, help="fichier JSON de résultats")
+    run_parser.add_argument("--filter", default=None, help="expression régulière sur les noms de cas")
+    run_parser.add_argument("--rounds", type=int, default=7)
+    run_parser.add_argument("--min-time", type=float, default=0.05, help="durée minimale d'une série (s)")
+    run_parser.add_argument("--list", action="store_true", help="affiche les cas sans les mesurer")
+    compare_parser = commands.add_parser("compare", help="compare deux fichiers de résultats")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--threshold", type=float, default=0.15)
+    args = parser.parse_args(argv)
+    if args.command == "run" and args.list:
+        print("\n".join(CASES))
+        return 0
+    return run(args) if args.command == "run" else compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Mémoire par worker : modèle chargé par chaque worker vs préchargé puis partagé par fork.
+
+Lance N processus qui encodent un texte avec l'encodeur partagé (`get_encoder`),
+puis relève pour chacun rss, pss et mémoire privée (`lyra.metrics.process_memory`) :
+    • independent : chaque processus démarre à neuf (spawn) et charge son modèle,
+                    comme `uvicorn --workers N` ;
+    • preload     : le parent charge les poids puis fork (comme `lyra.serve`).
+La somme des pss approche la mémoire réellement occupée sur l'hôte.
+
+    python -m lyra.benchmarks.worker_memory --workers 4
+    LYRA_ENCODER_BACKEND=stub python -m lyra.benchmarks.worker_memory   # hors ligne (chiffres non représentatifs)
+"""
+
+import argparse
+import gc
+import multiprocessing as mp
+
+from lyra.metrics import process_memory
+
+
+def _child(conn):
+    from lyra.encoder import get_encoder
+    get_encoder().encode("une mer de silence et de lumière")
+    conn.send("ready")
+    conn.recv()  # reste en vie le temps de la mesure
+
+
+def _measure(context: str, workers: int):
+    ctx = mp.get_context(context)
+    procs, conns = [], []
+    for _ in range(workers):
+        parent, child = ctx.Pipe()
+        proc = ctx.Process(target=_child, args=(child,))
+        proc.start()
+        procs.append(proc)
+        conns.append(parent)
+    for conn in conns:
+        conn.recv()
+    memory = [process_memory(p.pid) for p in procs]
+    for conn in conns:
+        conn.send("exit")
+    for proc in procs:
+        proc.join()
+    return memory
+
+
+def _report(label: str, memory, parent=None):
+    mib = 2 ** 20
+    print(f"\n{label}")
+    print(f"{'':>8} {'rss MiB':>9} {'pss MiB':>9} {'privé MiB':>10}")
+    for i, m in enumerate(memory):
+        print(f"{'worker ' + str(i):>8} {m['rss'] / mib:>9.1f} {m['pss'] / mib:>9.1f} {m['private'] / mib:>10.1f}")
+    total = sum(m["pss"] for m in memory) + (parent["pss"] if parent else 0)
+    print(f"{'total pss' + (' (+ parent)' if parent else ''):>8} : {total / mib:.1f} MiB")
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args(argv)
+    if not process_memory():
+        raise SystemExit("/proc/self/smaps_rollup indisponible (Linux requis)")
+
+    independent = _report("independent (spawn, un modèle par worker)", _measure("spawn", args.workers))
+
+    from lyra.encoder import get_encoder
+    get_encoder().model  # poids chargés dans le parent, sans inférence
+    gc.collect()
+    gc.freeze()
+    memory = _measure("fork", args.workers)
+    preload = _report("preload (fork, poids partagés)", memory, parent=process_memory())
+    print(f"\nmémoire totale : {independent / 2**20:.1f} → {preload / 2**20:.1f} MiB "
+          f"({preload / independent:.0%})")
+
+
+if __name__ == "__main__":
+    main()
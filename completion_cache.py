@@ -0,0 +1,182 @@
+"""Cache de complétions LLM avec regroupement des requêtes en vol.
+
+Clé : empreinte BLAKE2b de la requête complète (modèle, messages, paramètres
+d'échantillonnage), donc deux requêtes ne partagent une réponse que si elles
+sont identiques. Les entrées expirent après `ttl` secondes et le cache est
+borné à `max_items` (LRU).
+
+Regroupement (« single flight ») : tant qu'un appel est en cours pour une clé,
+les demandes identiques l'attendent au lieu d'en lancer un autre — en threads
+(`get_or_call`) comme en asyncio (`aget_or_call`). Une erreur n'est jamais mise
+en cache ; elle est propagée à tous les demandeurs regroupés. En asyncio, l'appel
+amont tourne dans sa propre tâche : l'annulation d'un demandeur (client
+déconnecté) n'atteint ni l'appel ni les autres demandeurs.
+
+Désactivé par défaut (la température > 0 rend chaque réponse différente) :
+LYRA_LLM_CACHE_SIZE (0 = désactivé), LYRA_LLM_CACHE_TTL (s, défaut 300).
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict
+
+
+def completion_key(request: dict) -> bytes:
+    raw = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).digest()
+
+
+class CompletionCache:
+    """🧊 Cache TTL/LRU de réponses, avec regroupement des appels identiques.
+
+    Args:
+        max_items: Nombre maximal de réponses conservées.
+        ttl: Durée de vie d'une réponse (s) ; None = illimitée.
+    """
+
+    def __init__(self, max_items: int = 1024, ttl: float | None = 300.0):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._entries: "OrderedDict[bytes, tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[bytes, Future] = {}
+        self._ainflight: Dict[tuple, asyncio.Future] = {}
+        self.lookups = 0
+        self.hits = 0
+        self.coalesced = 0
+        self.upstream_calls = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    # ------------------------------------------------------------------
+    def get(self, key: bytes) -> str | None:
+        with self._lock:
+            return self._get(key)
+
+    def lookup(self, key: bytes) -> str | None:
+        """Comme `get`, compté dans `stats()` ; une absence compte un appel amont (fait par l'appelant)."""
+        with self._lock:
+            self.lookups += 1
+            text = self._get(key)
+            if text is not None:
+                self.hits += 1
+            else:
+                self.upstream_calls += 1
+            return text
+
+    def _get(self, key: bytes) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, text = entry
+        if expires < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return text
+
+    def put(self, key: bytes, text: str):
+        with self._lock:
+            expires = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+            self._entries[key] = (expires, text)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    def get_or_call(self, key: bytes, call: Callable[[], str]) -> str:
+        """Réponse en cache, sinon celle de l'appel en vol, sinon `call()`."""
+        with self._lock:
+            self.lookups += 1
+            text = self._get(key)
+            if text is not None:
+                self.hits += 1
+                return text
+            pending = self._inflight.get(key)
+            if pending is None:
+                pending = self._inflight[key] = Future()
+                owner = True
+                self.upstream_calls += 1
+            else:
+                owner = False
+                self.coalesced += 1
+        if not owner:
+            return pending.result()
+        try:
+            text = call()
+        except BaseException as exc:
+            pending.set_exception(exc)
+            raise
+        else:
+            self.put(key, text)
+            pending.set_result(text)
+            return text
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    async def aget_or_call(self, key: bytes, call: Callable[[], Awaitable[str]]) -> str:
+        """Comme `get_or_call`, pour une coroutine (regroupement par boucle d'événements)."""
+        loop = asyncio.get_running_loop()
+        slot = (key, id(loop))
+        with self._lock:
+            self.lookups += 1
+            text = self._get(key)
+            if text is not None:
+                self.hits += 1
+                return text
+            pending = self._ainflight.get(slot)
+            if pending is None:
+                pending = self._ainflight[slot] = loop.create_task(self._afetch(key, slot, call))
+                pending.add_done_callback(lambda task: task.cancelled() or task.exception())  # erreur lue
+                self.upstream_calls += 1
+            else:
+                self.coalesced += 1
+        return await asyncio.shield(pending)
+
+    async def _afetch(self, key: bytes, slot: tuple, call: Callable[[], Awaitable[str]]) -> str:
+        try:
+            text = await call()
+            self.put(key, text)
+            return text
+        finally:
+            with self._lock:
+                self._ainflight.pop(slot, None)
+
+    # ------------------------------------------------------------------
+    def stats(self) -> Dict[str, float]:
+        lookups = self.lookups
+        return {
+            "items": len(self._entries),
+            "lookups": lookups,
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "upstream_calls": self.upstream_calls,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "upstream_rate": self.upstream_calls / lookups if lookups else 0.0,
+        }
+
+
+_lock = threading.Lock()
+_cache: CompletionCache | None = None
+
+
+def get_completion_cache() -> CompletionCache | None:
+    """Cache partagé par le processus (None si LYRA_LLM_CACHE_SIZE vaut 0)."""
+    global _cache
+    size = int(os.getenv("LYRA_LLM_CACHE_SIZE", "0"))
+    if size <= 0:
+        return None
+    if _cache is None:
+        with _lock:
+            if _cache is None:
+                ttl = float(os.getenv("LYRA_LLM_CACHE_TTL", "300"))
+                _cache = CompletionCache(size, ttl=ttl if ttl > 0 else None)
+    return _cache
@@ -8,15 +8,34 @@ Nouveauté  v1.3
 •  La réponse **texte** du LLM est renvoyée sous la clé `reply`.
 •  `styled_output` contient cette même réponse passée à la couche émotionnelle.
 •  `critrix_alert` casté en `bool` natif (JSON‑safe).
+•  Les modules sont intégrés par `LyraNetwork` (état vectorisé, mêmes trajectoires).
+•  `astep` : pas asynchrone (LLM via client async, calcul CPU sur un pool borné).
+•  `astream` : même pas, réponse stylisée émise fragment par fragment.
+•  `memory_dir` : journal persisté sur disque, rouvert (et temps repris) au redémarrage.
+•  `step(prompt, reply=…)` : pas avec une réponse LLM déjà obtenue (traitement par lots).
+•  Étapes chronométrées (`lyra.metrics`) : emotion, llm, encode, journal.decay,
+   dynamics.*, memory_query, styling, step — histogrammes Prometheus sur /metrics.
+•  `events` : chaque pas émet un événement `step` (prompt, sortie stylisée, états
+   CRITRIX, EchoFuse et journal) vers le flux d'événements (`lyra.events`).
+•  `advance(until_t)` : avance sans prompt, le gros de l'intervalle en forme close ;
+   `realtime` : le temps simulé suit l'horloge murale entre deux prompts.
+•  `integrator` : "euler" (défaut), "rk4" ou "adaptive" (voir `lyra.integrators`).
 """
 
+import asyncio
+import math
 import os
-from typing import Dict, Callable
+import time
+from typing import AsyncIterator, Dict, List, Tuple
 
 from lyra.modules.llm_bridge import AutoGenesisCoreLLM
 from lyra.modules.journal import JournalOubli
 from lyra.modules.critrix import CRITRIX
 from lyra.modules.echofuse import EchoFuse
+from lyra.events import EventLog, get_event_log
+from lyra.metrics import CRITRIX_ALERTS, STEPS, timed
+from lyra.network import LyraNetwork
+from lyra.workers import run_cpu
 from lyra.transfer_functions import identity, sigmoid
 from lyra.modules.noyau_emotionnel import NoyauEmotionnel, ContexteDynamique
 
@@ -24,9 +43,18 @@ from lyra.modules.noyau_emotionnel import NoyauEmotionnel, ContexteDynamique
 class LyraCoreMinimal:
     """Orchestrateur principal utilisé par l'API FastAPI."""
 
-    def __init__(self, dt: float = 0.1):
+    def __init__(self, dt: float = 0.1, memory_dir: str | None = None,
+                 session_id: str | None = None, events: EventLog | None = None,
+                 integrator: str = "euler", realtime: float = 0.0):
+        """`realtime` : secondes simulées par seconde d'horloge entre deux pas (0 : désactivé)."""
         self.t = 0.0
         self.dt = dt
+        self.memory_dir = memory_dir
+        self.session_id = session_id
+        self.events = events or get_event_log()
+        self.realtime = realtime
+        self._wall = time.monotonic()
+        self._clock = 0.0  # temps simulé visé par l'horloge murale
 
         # -------- Noyau émotionnel --------
         ctx = ContexteDynamique(objectif="Exploration sensible")
@@ -38,7 +66,12 @@ class LyraCoreMinimal:
             {"model": os.getenv("OPENAI_MODEL", "gpt-3.5-turbo"), "dt": dt},
         )
 
-        self.journal = JournalOubli("journal", {"lambda": 0.4, "threshold": 0.01, "dt": dt})
+        journal_params = {"lambda": 0.4, "threshold": 0.01, "dt": dt}
+        if memory_dir:
+            journal_params["persist_dir"] = os.path.join(memory_dir, "journal")
+        self.journal = JournalOubli("journal", journal_params)
+        if len(self.journal.store):
+            self.t = self.journal.resume_time + dt
         self.journal.add_neighbor("autogenesis", rho=1.0, delta=0.0, gfunc=identity)
 
         self.critrix = CRITRIX("critrix", {"theta_C": 0.8, "gamma": 1.2, "eta_C": 0.3, "dt": dt})
@@ -52,42 +85,188 @@ class LyraCoreMinimal:
             "critrix": self.critrix,
             "echo": self.echo,
         }
+        # autogenesis n'est jamais intégré : c'est une source pilotée par prompt_llm
+        self.network = LyraNetwork(self.modules.values(), integrator=integrator)
 
     # ---------------------------------------------------------
-    def _ext_inputs(self) -> Dict[str, Callable[[float], float]]:
-        """Mapping name → callable(t) donnant l'état au temps t‑δ."""
-        return {name: (lambda t, m=mod: m.state) for name, mod in self.modules.items()}
+    def step(self, user_prompt: str = "", reply: str | None = None, query_vec=None) -> Dict:
+        """Avance la simulation d'un pas et renvoie un dict JSON‑safe.
 
-    # ---------------------------------------------------------
-    def step(self, user_prompt: str = "") -> Dict:
-        """Avance la simulation d'un pas et renvoie un dict JSON‑safe."""
+        `reply` : réponse LLM déjà obtenue (pas d'appel) ; `query_vec` : prompt pré‑encodé.
+        """
 
-        # 1) Réaction émotionnelle et génération LLM
-        if user_prompt:
+        with timed("step"):
+            self.catch_up()
+            # 1) Réaction émotionnelle et génération LLM
+            if user_prompt:
+                with timed("emotion"):
+                    self.noyau.reagir(user_prompt)
+                if reply is None:
+                    self.autogenesis.prompt_llm(user_prompt)
+                else:
+                    self.autogenesis.apply_reply(reply)
+            return self._advance(user_prompt, query_vec)
+
+    async def astep(self, user_prompt: str = "") -> Dict:
+        """Variante asynchrone de `step` : n'occupe jamais la boucle d'événements."""
+        with timed("step"):
+            if self.realtime:
+                await run_cpu(self.catch_up)
+            if user_prompt:
+                with timed("emotion"):
+                    self.noyau.reagir(user_prompt)
+                await self.autogenesis.aprompt_llm(user_prompt)
+            return await run_cpu(self._advance, user_prompt)
+
+    async def astream(self, user_prompt: str) -> AsyncIterator[Tuple[str, object]]:
+        """Pas en flux : ("token", texte stylisé)* au fil du LLM, puis ("state", résultat).
+
+        La concaténation des tokens vaut `styled_output` : comme la réponse
+        enregistrée (`apply_reply`), le texte stylisé ignore les blancs de tête et
+        retient ceux de fin tant qu'aucun texte ne les suit. L'encodage du prompt
+        démarre dès l'appel et la dynamique des modules dès que l'état du LLM est
+        fixé (réponse saturée), sinon à la fin du flux. Si le client se
+        déconnecte, le core n'est rendu qu'une fois la dynamique terminée.
+        """
+        if self.realtime:
+            await run_cpu(self.catch_up)
+        with timed("emotion"):
             self.noyau.reagir(user_prompt)
-            self.autogenesis.prompt_llm(user_prompt)
+        flux = self.noyau.flux_style()
+        query_vec = asyncio.ensure_future(run_cpu(self.journal.encode_query, user_prompt))
+
+        async def dynamics():
+            await run_cpu(self._dynamics, user_prompt, await query_vec)
+
+        running = None
+        streamed, received = flux.ouvrir(), ""
+        started, held = False, ""  # held : blancs de fin, stylisés seulement si du texte suit
+        try:
+            if streamed:
+                yield "token", streamed
+            async for piece in self.autogenesis.astream_llm(user_prompt):
+                received += piece
+                if running is None and self.autogenesis.state_settled(received):
+                    running = asyncio.ensure_future(dynamics())
+                if not started:
+                    piece = piece.lstrip()
+                    if not piece:
+                        continue
+                    started = True
+                body = piece.rstrip()
+                if not body:
+                    held += piece
+                    continue
+                piece, held = held + body, piece[len(body):]
+                styled = flux.pousser(piece)
+                if styled:
+                    streamed += styled
+                    yield "token", styled
+            llm_text = self.autogenesis.get_last_text() or "(silence)"
+            if not started:
+                styled = flux.pousser(llm_text)
+                streamed += styled
+                yield "token", styled
+            tail = flux.fermer()
+            if running is None:
+                running = asyncio.ensure_future(dynamics())
+            complete = self.noyau.exprimer(llm_text)
+            tail += complete[len(streamed + tail):] if complete.startswith(streamed + tail) else ""
+            if tail:
+                yield "token", tail
+            await running
+        finally:
+            if running is None:
+                query_vec.cancel()
+            elif not running.done():  # déconnexion : la dynamique modifie encore le core
+                await asyncio.shield(running)
+        yield "state", self._result(llm_text, complete, user_prompt)
+
+    def _advance(self, user_prompt: str, query_vec=None) -> Dict:
+        """Dynamique des modules, recherche mémoire et stylisation (travail CPU)."""
+        self._dynamics(user_prompt, query_vec)
+
+        # 3) Construction de la réponse
+        llm_text = self.autogenesis.get_last_text() or "(silence)"
+        with timed("styling"):
+            styled_text = self.noyau.exprimer(llm_text)
+        return self._result(llm_text, styled_text, user_prompt)
 
+    def _dynamics(self, user_prompt: str, query_vec=None):
+        """Mise à jour des modules puis avance du temps (`query_vec` : prompt pré‑encodé)."""
         # 2) Mise à jour des modules
-        self.journal.step(self.t, self._ext_inputs())
         self.critrix.inject_tau_in(abs(self.autogenesis.state))
-        self.critrix.step(self.t, self._ext_inputs())
+        with timed("dynamics.journal_critrix"):
+            self.network.step(self.t, ("journal", "critrix"))
 
         if user_prompt:
-            sim = self.journal.query_similar(user_prompt, top_k=1)
+            with timed("memory_query"):
+                if query_vec is None:
+                    sim = self.journal.query_similar(user_prompt, top_k=1)
+                else:
+                    sim = self.journal.query_vector(query_vec, top_k=1)
             if sim:
                 _t0, val, meta, score = sim[0]
                 self.echo.add_neighbor("journal", rho=score, delta=0.0, gfunc=identity)
 
-        self.echo.step(self.t, self._ext_inputs())
-
-        # 3) Construction de la réponse
-        llm_text = self.autogenesis.get_last_text() or "(silence)"
-        styled_text = self.noyau.exprimer(llm_text)
+        with timed("dynamics.echo"):
+            self.network.step(self.t, ("echo",))
 
         # 4) Avance du temps
         self.t += self.dt
 
-        return {
+    def advance(self, until_t: float) -> int:
+        """Avance sans prompt jusqu'à `until_t` (temps simulé) ; renvoie le nombre de pas.
+
+        Équivaut à autant de pas `step("")`, sans résultat ni événement. Les pas
+        sont faits un à un jusqu'à ce que le journal soit en régime
+        (`JournalOubli.steady`, au plus ~max_length pas) ; le reste de l'intervalle
+        est sauté en forme close : traces décalées, CRITRIX et EchoFuse sommés
+        (`LyraNetwork.advance`). Le coût ne dépend plus de la durée de l'absence.
+        """
+        steps = int(math.floor((until_t - self.t) / self.dt + 1e-9))
+        if steps <= 0:
+            return 0
+        with timed("advance"):
+            done = 0
+            while done < steps and not self.journal.steady(self.t, self.dt):
+                self._dynamics("")
+                done += 1
+            if done < steps:
+                # entrées figées : le journal en régime a la même somme à chaque pas,
+                # EchoFuse peut donc être avancé après lui sur tout l'intervalle
+                self.critrix.inject_tau_in(abs(self.autogenesis.state))
+                until = self.t + (steps - done) * self.dt
+                self.network.advance(self.t, until, ("journal", "critrix"))
+                self.t = self.network.advance(self.t, until, ("echo",))
+        return steps
+
+    def catch_up(self) -> int:
+        """Mode `realtime` : simule le temps écoulé à l'horloge depuis le dernier appel."""
+        if not self.realtime:
+            return 0
+        now = time.monotonic()
+        elapsed, self._wall = now - self._wall, now
+        self._clock = max(self._clock, self.t) + elapsed * self.realtime
+        return self.advance(self._clock)
+
+    def trace_texts(self, reply: str) -> List[str]:
+        """Textes que le journal encodera si `reply` est la réponse du prochain pas.
+
+        Sert à pré‑encoder un lot en un seul appel (voir `lyra.batch`) ; une
+        prévision manquée ne coûte qu'un encodage au moment du pas.
+        """
+        state = self.autogenesis.reply_state(reply)
+        texts = []
+        for j, (rho, delta, gfunc) in self.journal.neighbors.items():
+            if j == "autogenesis" and delta == 0:
+                signal = rho * gfunc(state)
+                if abs(signal) > self.journal.threshold:
+                    texts.append(self.journal.trace_text(j, signal))
+        return texts
+
+    def _result(self, llm_text: str, styled_text: str, user_prompt: str = "") -> Dict:
+        result = {
             "timestamp": self._iso_now(),
             "reply": llm_text,
             "styled_output": styled_text,
@@ -95,6 +274,35 @@ class LyraCoreMinimal:
             "noyau_state": self.noyau.etats.copy(),
             "t": round(self.t, 2),
         }
+        STEPS.inc()
+        if result["critrix_alert"]:
+            CRITRIX_ALERTS.inc()
+        if self.events is not None:
+            self.events.emit(
+                "step", self.session_id,
+                t=self.t,
+                prompt=user_prompt,
+                reply=llm_text,
+                styled_output=styled_text,
+                noyau=result["noyau_state"],
+                critrix=self.critrix.get_status(),
+                echo=self.echo.get_status(),
+                journal=self.journal.get_status(),
+            )
+        return result
+
+    # ---------------------------------------------------------
+    def memory_estimate(self) -> int:
+        """Estimation (octets) de la mémoire propre au core, hors ressources partagées."""
+        store = self.journal.store
+        traces = store.nbytes + 256 * len(store)
+        return 16 * 1024 + traces + self.network.history.nbytes()
+
+    def close(self):
+        """Ferme le journal persisté (compactage attendu, tampons vidés) ; sans effet en mémoire."""
+        close = getattr(self.journal.store, "close", None)
+        if close is not None:
+            close()
 
     # ---------------------------------------------------------
     @staticmethod
@@ -0,0 +1,103 @@
+"""DelayLine — historique borné des états passés, lu à t − δ.
+
+Anneau de `capacity` échantillons (t, valeur) par colonne : une colonne par
+module (un module seul utilise width=1, LyraNetwork une colonne par module lié).
+La mémoire reste constante quelle que soit la durée de la simulation.
+
+Sémantique de lecture (identique pour le chemin module par module et LyraNetwork) :
+    • tq ≥ dernier échantillon → valeur vivante (état courant du module),
+    • sinon interpolation linéaire entre les deux échantillons encadrant tq,
+      bornée au plus ancien échantillon conservé.
+"""
+
+import math
+
+import numpy as np
+
+
+def capacity_for(horizon: float, dt: float) -> int:
+    """Nombre d'échantillons nécessaires pour couvrir un délai `horizon` au pas `dt`."""
+    if horizon <= 0 or dt <= 0:
+        return 2
+    return int(math.ceil(horizon / dt)) + 2
+
+
+class DelayLine:
+    """⏳ Ligne à retard en anneau, vectorisée sur ses colonnes."""
+
+    def __init__(self, width: int = 1, capacity: int = 2):
+        self.width = width
+        self.capacity = max(2, int(capacity))
+        self.times = np.full((self.capacity, width), np.inf)
+        self.values = np.zeros((self.capacity, width))
+        self.head = np.zeros(width, dtype=np.intp)
+        self.count = np.zeros(width, dtype=np.intp)
+        self.last_t = np.full(width, -np.inf)
+
+    def reserve(self, capacity: int):
+        """Agrandit l'anneau (jamais ne le réduit) en conservant l'historique."""
+        capacity = int(capacity)
+        if capacity <= self.capacity:
+            return
+        cols = np.arange(self.width)
+        rows = np.arange(self.capacity)[:, None]
+        order = (self.head - self.count + rows) % self.capacity
+        valid = rows < self.count
+        times = np.full((capacity, self.width), np.inf)
+        values = np.zeros((capacity, self.width))
+        times[: self.capacity] = np.where(valid, self.times[order, cols], np.inf)
+        values[: self.capacity] = np.where(valid, self.values[order, cols], 0.0)
+        self.times, self.values, self.capacity = times, values, capacity
+        self.head = self.count % capacity
+
+    def clear(self, cols=None):
+        cols = slice(None) if cols is None else cols
+        self.times[:, cols] = np.inf
+        self.head[cols] = 0
+        self.count[cols] = 0
+        self.last_t[cols] = -np.inf
+
+    def push(self, t: float, cols, values):
+        """Enregistre l'état des colonnes `cols` au temps t.
+
+        Le premier enregistrement à un instant donné fait foi ; un retour dans
+        le passé (t < dernier échantillon) efface l'historique de la colonne.
+        """
+        cols = np.atleast_1d(cols)
+        values = np.atleast_1d(values)
+        back = self.last_t[cols] > t
+        if back.any():
+            self.clear(cols[back])
+        fresh = self.last_t[cols] < t
+        if not fresh.all():
+            cols, values = cols[fresh], values[fresh]
+        h = self.head[cols]
+        self.times[h, cols] = t
+        self.values[h, cols] = values
+        self.head[cols] = (h + 1) % self.capacity
+        self.count[cols] = np.minimum(self.count[cols] + 1, self.capacity)
+        self.last_t[cols] = t
+
+    def read(self, cols, tq, live) -> np.ndarray:
+        """Valeurs des colonnes `cols` aux instants `tq` (`live` : états courants)."""
+        cols = np.atleast_1d(cols)
+        tq = np.broadcast_to(np.asarray(tq, dtype=float), cols.shape)
+        out = np.array(live, dtype=float, copy=True).reshape(cols.shape)
+        past = tq < self.last_t[cols]
+        if not past.any():
+            return out
+        c, q = cols[past], tq[past]
+        n = self.count[c]
+        k = (self.times[:, c] <= q).sum(axis=0)
+        oldest = self.head[c] - n
+        lo = (oldest + np.maximum(k - 1, 0)) % self.capacity
+        hi = (oldest + np.minimum(k, n - 1)) % self.capacity
+        t0, t1 = self.times[lo, c], self.times[hi, c]
+        v0, v1 = self.values[lo, c], self.values[hi, c]
+        span = np.where(hi != lo, t1 - t0, 1.0)
+        w = np.where(hi != lo, (q - t0) / span, 0.0)
+        out[past] = v0 + (v1 - v0) * w
+        return out
+
+    def nbytes(self) -> int:
+        return self.times.nbytes + self.values.nbytes
@@ -0,0 +1,219 @@
+"""Cache d'embeddings adressé par contenu.
+
+Clé : empreinte BLAKE2b (16 octets) de « modèle \\0 texte ». Deux niveaux :
+    • mémoire : LRU borné à `max_items` vecteurs,
+    • disque (facultatif) : matrice float32 mappée en mémoire (`vectors.f32`)
+      et journal des clés (`keys.bin`, 16 octets par ligne), en ajout seul.
+      Le niveau disque survit aux redémarrages ; il est rouvert sans recopie.
+      Plusieurs processus peuvent partager le répertoire (workers uvicorn,
+      `lyra.serve`, `lyra.replay`) : la ligne d'un vecteur est la position de sa
+      clé dans `keys.bin`, attribuée sous verrou `flock`, et les clés ajoutées
+      par les autres processus sont relues à la demande.
+
+Compteurs `hits` (mémoire / disque) et `misses` exposés par `stats()`.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows : un seul processus par répertoire de cache
+    fcntl = None
+
+KEY_SIZE = 16
+
+
+def content_key(model_name: str, text: str) -> bytes:
+    return hashlib.blake2b(f"{model_name}\0{text}".encode("utf-8"), digest_size=KEY_SIZE).digest()
+
+
+class DiskTier:
+    """💾 Niveau disque : lignes float32 d'une matrice mappée, indexées par clé."""
+
+    def __init__(self, path: str, dim: int, max_items: int = 1_000_000, grow: int = 4096):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.dim = dim
+        self.max_items = max_items
+        self.grow = grow
+        self._keys_path = os.path.join(path, "keys.bin")
+        self._vectors_path = os.path.join(path, "vectors.f32")
+        self._check_dim(os.path.join(path, "meta.json"))
+        self.rows: Dict[bytes, int] = {}
+        self._seen = 0  # lignes de keys.bin déjà indexées dans `rows`
+        self._matrix = None
+        self._open()
+
+    def _check_dim(self, meta_path: str):
+        if os.path.exists(meta_path):
+            with open(meta_path) as fh:
+                stored = json.load(fh)["dim"]
+            if stored != self.dim:
+                raise ValueError(f"Embedding cache at {self.path} holds dim {stored}, not {self.dim}")
+        else:
+            with open(meta_path, "w") as fh:
+                json.dump({"dim": self.dim}, fh)
+
+    def _open(self):
+        self._keys = open(self._keys_path, "ab", buffering=0)  # O_APPEND, une écriture par clé
+        with self._locked():
+            with open(self._keys_path, "rb") as fh:
+                keys = fh.read()
+            stored = self._stored()
+            # une écriture interrompue laisse au plus une clé sans vecteur : on l'ignore
+            count = min(len(keys) // KEY_SIZE, stored)
+            self.rows = {keys[i * KEY_SIZE:(i + 1) * KEY_SIZE]: i for i in range(count)}
+            self._seen = count
+            self._keys.truncate(count * KEY_SIZE)
+            self._remap(max(stored, count + self.grow))
+
+    def _stored(self) -> int:
+        return os.path.getsize(self._vectors_path) // (4 * self.dim) if os.path.exists(self._vectors_path) else 0
+
+    def _remap(self, capacity: int):
+        if self._matrix is not None:
+            self._matrix.flush()
+        mode = "r+" if os.path.exists(self._vectors_path) else "w+"
+        capacity = max(capacity, self._stored())  # fichier éventuellement agrandi par un autre processus
+        self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode=mode, shape=(capacity, self.dim))
+
+    @contextmanager
+    def _locked(self):
+        """Verrou inter‑processus (flock sur keys.bin)."""
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(self._keys.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._keys.fileno(), fcntl.LOCK_UN)
+
+    def _refresh(self) -> int:
+        """Indexe les clés ajoutées par d'autres processus ; retourne le nombre de lignes de keys.bin."""
+        count = os.fstat(self._keys.fileno()).st_size // KEY_SIZE
+        if count > self._seen:
+            with open(self._keys_path, "rb") as fh:
+                fh.seek(self._seen * KEY_SIZE)
+                keys = fh.read((count - self._seen) * KEY_SIZE)
+            for i in range(len(keys) // KEY_SIZE):
+                self.rows.setdefault(keys[i * KEY_SIZE:(i + 1) * KEY_SIZE], self._seen + i)
+            self._seen += len(keys) // KEY_SIZE
+        return self._seen
+
+    def __len__(self):
+        return len(self.rows)
+
+    def get(self, key: bytes):
+        row = self.rows.get(key)
+        if row is None:
+            self._refresh()
+            row = self.rows.get(key)
+            if row is None:
+                return None
+        if row >= self._matrix.shape[0]:
+            self._remap(row + 1)
+        return self._matrix[row]
+
+    def put(self, key: bytes, vector: np.ndarray):
+        if key in self.rows:
+            return
+        with self._locked():
+            row = self._refresh()
+            if key in self.rows or row >= self.max_items:
+                return
+            if row >= self._matrix.shape[0]:
+                self._remap(row + self.grow)
+            self._matrix[row] = vector  # vecteur écrit avant de publier sa clé
+            self._keys.write(key)
+            self._seen = row + 1
+            self.rows[key] = row
+
+    def close(self):
+        self._matrix.flush()
+        self._keys.close()
+
+
+class EmbeddingCache:
+    """🗃️ Cache LRU d'embeddings, avec niveau disque facultatif.
+
+    Args:
+        max_items: Taille du LRU en mémoire.
+        disk_path: Répertoire du niveau disque (None = désactivé).
+        disk_max_items: Nombre maximal de vecteurs sur disque.
+    """
+
+    def __init__(self, max_items: int = 50_000, disk_path: str | None = None, disk_max_items: int = 1_000_000):
+        self.max_items = max_items
+        self.disk_path = disk_path
+        self.disk_max_items = disk_max_items
+        self.disk: DiskTier | None = None
+        self._memory: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key: bytes):
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return vector
+            if self._open_disk() is not None:
+                vector = self.disk.get(key)
+                if vector is not None:
+                    vector = np.array(vector)
+                    self._store(key, vector)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return vector
+            self.misses += 1
+            return None
+
+    def put(self, key: bytes, vector: np.ndarray):
+        with self._lock:
+            self._store(key, vector)
+            if self.disk_path is not None:
+                if self._open_disk(dim=int(np.size(vector))) is not None:
+                    self.disk.put(key, vector)
+
+    def _store(self, key: bytes, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def _open_disk(self, dim: int | None = None) -> DiskTier | None:
+        """Ouvre le niveau disque : existant (dimension lue) ou à créer (`dim`)."""
+        if self.disk is None and self.disk_path is not None:
+            meta_path = os.path.join(self.disk_path, "meta.json")
+            if os.path.exists(meta_path):
+                with open(meta_path) as fh:
+                    dim = json.load(fh)["dim"]
+            if dim is not None:
+                self.disk = DiskTier(self.disk_path, dim=dim, max_items=self.disk_max_items)
+        return self.disk
+
+    def __len__(self):
+        return len(self._memory)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "memory_items": len(self._memory),
+            "disk_items": len(self.disk) if self.disk is not None else 0,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
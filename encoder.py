@@ -0,0 +1,262 @@
+"""Encodeur de phrases partagé par tout le processus, avec micro‑batching.
+
+Le modèle sentence-transformers est chargé une seule fois, au premier encodage,
+puis réutilisé par chaque JournalOubli / VectorSonde (et donc par toutes les
+sessions de l'API). Les demandes concurrentes sont regroupées par un thread
+dédié en micro‑lots : au plus `max_batch` textes, après au plus `max_wait_ms`
+d'attente, encodés en un seul appel `model.encode(list)`.
+
+Chaque texte passe d'abord par un cache d'embeddings adressé par contenu
+(`lyra.embedding_cache`) : seuls les textes jamais vus atteignent le modèle.
+
+Réglages : LYRA_ENCODER_MAX_BATCH (défaut 32), LYRA_ENCODER_MAX_WAIT_MS (défaut 2),
+LYRA_EMBEDDING_CACHE_SIZE (défaut 50000, 0 = sans cache), LYRA_EMBEDDING_CACHE_DIR
+(niveau disque persistant, désactivé par défaut), LYRA_ENCODER_BACKEND
+("sentence-transformers" par défaut, "stub" : encodeur local déterministe, sans
+modèle ni réseau — benchmarks et essais hors ligne).
+"""
+
+import functools
+import hashlib
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+from lyra.embedding_cache import EmbeddingCache, content_key
+from lyra.metrics import timed
+
+DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+def _load_sentence_transformer(model_name: str):
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+class StubSentenceModel:
+    """🧪 Modèle local déterministe : somme normalisée d'un vecteur pseudo‑aléatoire par mot.
+
+    Même interface que `SentenceTransformer` pour ce qu'en utilise l'encodeur ;
+    deux textes partageant des mots ont des vecteurs proches.
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    @functools.lru_cache(maxsize=65536)
+    def _word(self, word: str) -> np.ndarray:
+        seed = int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "big")
+        return np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+
+    def encode(self, texts: str | Sequence[str], **_ignored) -> np.ndarray:
+        single = isinstance(texts, str)
+        matrix = np.zeros((1 if single else len(texts), self.dim), dtype=np.float32)
+        for row, text in zip(matrix, [texts] if single else texts):
+            for word in text.lower().split():
+                row += self._word(word)
+            norm = np.linalg.norm(row)
+            if norm > 0:
+                row /= norm
+        return matrix[0] if single else matrix
+
+
+def _load_model(model_name: str):
+    backend = os.getenv("LYRA_ENCODER_BACKEND", "sentence-transformers")
+    if backend == "stub":
+        return StubSentenceModel()
+    if backend == "sentence-transformers":
+        return _load_sentence_transformer(model_name)
+    raise ValueError(f"Unknown LYRA_ENCODER_BACKEND: {backend!r}")
+
+
+class EncoderService:
+    """🔤 Encodeur partagé : chargement paresseux et regroupement des requêtes.
+
+    `encode` accepte un texte (→ vecteur) ou une liste (→ matrice), comme
+    `SentenceTransformer.encode`.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, max_batch: int = 32, max_wait_ms: float = 2.0,
+                 loader: Callable[[str], object] = _load_model,
+                 cache: EmbeddingCache | None = None):
+        if max_batch < 1:
+            raise ValueError("max_batch must be >= 1")
+        self.model_name = model_name
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._loader = loader
+        self.cache = cache
+        self._model = None
+        self._load_lock = threading.Lock()
+        self._reset_worker()
+        self.batches = 0
+        self.items = 0
+
+    def _reset_worker(self):
+        """File et thread neufs (construction, ou processus enfant après fork)."""
+        self._queue: "queue.Queue[tuple[str, Future]]" = queue.Queue()
+        self._worker: threading.Thread | None = None
+        self._worker_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    @property
+    def model(self):
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    self._model = self._loader(self.model_name)
+        return self._model
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    @property
+    def dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "loaded": self.loaded,
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch": self.items / self.batches if self.batches else 0.0,
+            "queue_depth": self.queue_depth(),
+            **({"cache_" + k: v for k, v in self.cache.stats().items()} if self.cache else {}),
+        }
+
+    # ------------------------------------------------------------------
+    def _cached(self, text: str):
+        return self.cache.get(content_key(self.model_name, text)) if self.cache is not None else None
+
+    def encode(self, texts: str | Sequence[str], **_ignored) -> np.ndarray:
+        """Encode via le cache puis la file de micro‑lots (bloquant pour l'appelant)."""
+        with timed("encode"):
+            if isinstance(texts, str):
+                vector = self._cached(texts)
+                return vector if vector is not None else self.submit(texts).result()
+            texts = list(texts)
+            if not texts:
+                return np.zeros((0, self.dimension), dtype=np.float32)
+            pending = [self._cached(t) for t in texts]
+            pending = [self.submit(t) if v is None else v for t, v in zip(texts, pending)]
+            return np.stack([p.result() if isinstance(p, Future) else p for p in pending])
+
+    def encode_many(self, texts: Sequence[str]) -> np.ndarray:
+        """Encode une liste en un seul appel modèle (hors file) pour les textes absents du cache."""
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        with timed("encode"):
+            found = [self._cached(t) for t in texts]
+            missing = list(dict.fromkeys(t for t, v in zip(texts, found) if v is None))
+            fresh = dict(zip(missing, self._encode_batch(missing))) if missing else {}
+            return np.stack([v if v is not None else fresh[t] for t, v in zip(texts, found)])
+
+    def _encode_batch(self, texts: List[str]) -> List[np.ndarray]:
+        """Un appel modèle pour des textes distincts ; résultats inscrits au cache."""
+        with timed("encode.model"):
+            matrix = np.asarray(self.model.encode(texts, batch_size=len(texts)))
+        self.batches += 1
+        self.items += len(texts)
+        vectors = [np.array(row) for row in matrix]
+        if self.cache is not None:
+            for text, vector in zip(texts, vectors):
+                self.cache.put(content_key(self.model_name, text), vector)
+        return vectors
+
+    def submit(self, text: str) -> Future:
+        """Ajoute un texte à la file ; le Future reçoit son vecteur."""
+        future: Future = Future()
+        self._ensure_worker()
+        self._queue.put((text, future))
+        return future
+
+    # ------------------------------------------------------------------
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="lyra-encoder", daemon=True)
+                self._worker.start()
+
+    def _collect(self) -> List[tuple]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            unique = list(dict.fromkeys(text for text, _ in batch))
+            try:
+                vectors = dict(zip(unique, self._encode_batch(unique)))
+            except Exception as exc:  # le modèle a échoué : chaque appelant reçoit l'erreur
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+            for text, future in batch:
+                future.set_result(vectors[text])
+
+
+_lock = threading.Lock()
+_encoders: Dict[str, EncoderService] = {}
+
+
+def _after_fork_in_child():
+    # le modèle chargé avant le fork est partagé (copie sur écriture) ; le thread de
+    # micro-lots, lui, n'existe pas dans l'enfant : il repart d'une file vide
+    global _lock
+    _lock = threading.Lock()
+    for encoder in _encoders.values():
+        encoder._load_lock = threading.Lock()
+        encoder._reset_worker()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def encoders() -> List[EncoderService]:
+    """Services d'encodage déjà créés dans ce processus."""
+    return list(_encoders.values())
+
+
+def get_encoder(model_name: str = DEFAULT_MODEL) -> EncoderService:
+    """Retourne le service d'encodage partagé pour `model_name` (modèle chargé au premier usage)."""
+    encoder = _encoders.get(model_name)
+    if encoder is None:
+        with _lock:
+            encoder = _encoders.get(model_name)
+            if encoder is None:
+                cache_size = int(os.getenv("LYRA_EMBEDDING_CACHE_SIZE", "50000"))
+                cache_dir = os.getenv("LYRA_EMBEDDING_CACHE_DIR")
+                if cache_dir:
+                    cache_dir = os.path.join(cache_dir, model_name.replace("/", "__"))
+                encoder = EncoderService(
+                    model_name,
+                    max_batch=int(os.getenv("LYRA_ENCODER_MAX_BATCH", "32")),
+                    max_wait_ms=float(os.getenv("LYRA_ENCODER_MAX_WAIT_MS", "2")),
+                    cache=EmbeddingCache(cache_size, disk_path=cache_dir) if cache_size > 0 else None,
+                )
+                _encoders[model_name] = encoder
+    return encoder
@@ -0,0 +1,315 @@
+"""LyraEnsemble — simulation en lot de milliers de jeux de paramètres.
+
+Reproduit la dynamique de `LyraCoreMinimal.step` (JournalOubli → CRITRIX → EchoFuse)
+sous forme de tableaux de forme (M,), un membre par jeu de paramètres, tous avancés
+au même pas. Le LLM et l'encodeur sont remplacés par un signal de pilotage
+(`EnsembleDrive`) enregistré ou synthétique :
+    • llm_state  : état d'AutoGenesisCoreLLM après chaque pas (len(texte)/200 borné à 1),
+    • prompted   : présence d'un prompt au pas k,
+    • similarity : score renvoyé par JournalOubli.query_similar (top‑1).
+
+Sert à explorer attracteurs et transitions de phase (cf. « Cadre de Modulation
+Dynamique », §3) : trajectoires tau_c par membre et franchissements d'alerte CRITRIX.
+Les grands balayages sont découpés entre les processus d'un pool (`run_sweep`).
+"""
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+# Paramètres balayables et valeurs par défaut de LyraCoreMinimal
+DEFAULT_PARAMS: Dict[str, float] = {
+    "theta_C": 0.8,       # CRITRIX
+    "gamma": 1.2,
+    "eta_C": 0.3,
+    "lambda": 0.4,        # JournalOubli
+    "threshold": 0.01,
+    "max_length": 100,
+    "alpha": 0.2,         # EchoFuse
+    "rho_journal": 1.0,   # autogenesis → journal (identity)
+    "rho_echo": 0.6,      # autogenesis → echo (sigmoid)
+}
+
+
+class EnsembleDrive:
+    """🎼 Signaux de pilotage : remplacent le LLM et l'encodeur.
+
+    Chaque signal est de forme (T,) (commun à tous les membres) ou (T, M).
+    """
+
+    def __init__(self, llm_state, prompted=None, similarity=None):
+        self.llm_state = np.asarray(llm_state, dtype=float)
+        n_steps = self.llm_state.shape[0]
+        self.prompted = np.ones(n_steps, dtype=bool) if prompted is None else np.asarray(prompted, dtype=bool)
+        self.similarity = np.zeros(n_steps) if similarity is None else np.asarray(similarity, dtype=float)
+        if self.prompted.shape[0] != n_steps or self.similarity.shape[0] != n_steps:
+            raise ValueError("Drive signals must share the same number of steps")
+
+    def __len__(self):
+        return self.llm_state.shape[0]
+
+    @classmethod
+    def from_replies(cls, prompts: Sequence[str], replies: Sequence[str], similarity=None):
+        """Construit le pilotage depuis un enregistrement (prompt, réponse LLM) par pas.
+
+        Un prompt vide ne déclenche pas le LLM : l'état précédent est conservé.
+        """
+        if len(prompts) != len(replies):
+            raise ValueError("prompts and replies must have the same length")
+        state, states, prompted = 0.0, [], []
+        for prompt, reply in zip(prompts, replies):
+            asked = bool(prompt.strip())
+            if asked:
+                state = min(len(reply.strip()) / 200.0, 1.0)
+            states.append(state)
+            prompted.append(asked)
+        return cls(states, prompted, similarity)
+
+    @classmethod
+    def synthetic(cls, n_steps: int, prompt_rate: float = 0.3, mean_length: float = 150.0,
+                  similarity_range=(0.0, 0.5), seed: int | None = None):
+        """Pilotage aléatoire : prompts de Bernoulli, longueurs de réponse exponentielles."""
+        rng = np.random.default_rng(seed)
+        prompted = rng.random(n_steps) < prompt_rate
+        lengths = rng.exponential(mean_length, n_steps)
+        state = np.where(prompted, np.minimum(lengths / 200.0, 1.0), np.nan)
+        # l'état d'AutoGenesis est maintenu entre deux prompts
+        idx = np.where(prompted, np.arange(n_steps), 0)
+        np.maximum.accumulate(idx, out=idx)
+        held = np.where(np.isnan(state[idx]), 0.0, state[idx])
+        similarity = rng.uniform(*similarity_range, n_steps)
+        return cls(held, prompted, similarity)
+
+    def members(self, start: int, stop: int) -> "EnsembleDrive":
+        """Restreint les signaux (T, M) aux membres [start, stop)."""
+        pick = lambda a: a[:, start:stop] if a.ndim == 2 else a
+        return EnsembleDrive(pick(self.llm_state), pick(self.prompted), pick(self.similarity))
+
+
+class EnsembleResult:
+    """Trajectoires et franchissements d'alerte d'un ensemble.
+
+    Attributes:
+        params (dict): {nom: tableau (M,)} des paramètres de chaque membre.
+        tau_c (np.ndarray): Tension CRITRIX, forme (T, M).
+        alert (np.ndarray): Alerte CRITRIX, forme (T, M).
+        final (dict): États finaux {critrix, journal, echo, traces}, formes (M,).
+    """
+
+    def __init__(self, params: Dict[str, np.ndarray], tau_c: np.ndarray, alert: np.ndarray,
+                 final: Dict[str, np.ndarray]):
+        self.params = params
+        self.tau_c = tau_c
+        self.alert = alert
+        self.final = final
+
+    @property
+    def first_alert(self) -> np.ndarray:
+        """Indice du premier pas en alerte pour chaque membre (−1 si jamais)."""
+        hit = self.alert.any(axis=0)
+        return np.where(hit, self.alert.argmax(axis=0), -1)
+
+    @property
+    def alert_crossings(self) -> np.ndarray:
+        """Nombre de passages non‑alerte → alerte pour chaque membre."""
+        rising = self.alert[1:] & ~self.alert[:-1]
+        return rising.sum(axis=0) + self.alert[0]
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "members": int(self.tau_c.shape[1]),
+            "steps": int(self.tau_c.shape[0]),
+            "alerting_fraction": float((self.first_alert >= 0).mean()),
+            "mean_final_tau_c": float(self.tau_c[-1].mean()),
+        }
+
+    @staticmethod
+    def concatenate(parts: List["EnsembleResult"]) -> "EnsembleResult":
+        return EnsembleResult(
+            {k: np.concatenate([p.params[k] for p in parts]) for k in parts[0].params},
+            np.concatenate([p.tau_c for p in parts], axis=1),
+            np.concatenate([p.alert for p in parts], axis=1),
+            {k: np.concatenate([p.final[k] for p in parts]) for k in parts[0].final},
+        )
+
+
+class LyraEnsemble:
+    """🌌 M cores Lyra avancés en parallèle, un jeu de paramètres par membre.
+
+    Args:
+        params: {nom: valeur ou tableau (M,)} ; les noms absents prennent
+            leur valeur de DEFAULT_PARAMS.
+        dt: Pas de temps commun.
+    """
+
+    def __init__(self, params: Dict[str, Sequence[float] | float], dt: float = 0.1):
+        unknown = set(params) - set(DEFAULT_PARAMS)
+        if unknown:
+            raise ValueError(f"Unknown ensemble parameters: {sorted(unknown)}")
+        sizes = {np.size(v) for v in params.values() if np.ndim(v) > 0}
+        if len(sizes) > 1:
+            raise ValueError("All parameter arrays must have the same length")
+        self.size = sizes.pop() if sizes else 1
+        self.params = {
+            name: np.broadcast_to(np.asarray(params.get(name, default), dtype=float), (self.size,)).copy()
+            for name, default in DEFAULT_PARAMS.items()
+        }
+        self.dt = dt
+        self.reset()
+
+    def reset(self):
+        M = self.size
+        L = int(self.params["max_length"].max()) + 1
+        self.t = 0.0
+        # JournalOubli : traces dans l'ordre d'arrivée, ajoutées en colonne trace_end ;
+        # les trous laissés par l'oubli sont tassés quand une ligne est pleine.
+        L = 2 * L
+        self.trace_end = np.zeros(M, dtype=np.intp)
+        self.trace_lo = 0
+        self.trace_value = np.zeros((M, L))
+        self.trace_time = np.zeros((M, L))
+        self.trace_alive = np.zeros((M, L), dtype=bool)
+        self.journal = np.zeros(M)
+        # CRITRIX
+        self.tau_c = np.zeros(M)
+        self.critrix = np.zeros(M)
+        self.alert = np.zeros(M, dtype=bool)
+        # EchoFuse : voisin « journal » absent tant qu'aucune similarité n'a été trouvée
+        self.echo = np.zeros(M)
+        self.rho_similar = np.zeros(M)
+        self.has_similar = np.zeros(M, dtype=bool)
+
+    # ------------------------------------------------------------------
+    def _journal_step(self, t: float, llm_state: np.ndarray):
+        p = self.params
+        # Seule la fenêtre [lo, max(trace_end)) peut contenir des traces vivantes
+        lo, hi = self.trace_lo, int(self.trace_end.max())
+        # valeur courante en forme close v0·exp(−λ(t − t0)), comme JournalOubli
+        alive = self.trace_alive[:, lo:hi]
+        alive &= np.abs(self._current(t, slice(lo, hi))) > p["threshold"][:, None]
+        newest_first = np.cumsum(alive[:, ::-1], axis=1)[:, ::-1]
+        alive &= newest_first <= p["max_length"][:, None]
+
+        signal = p["rho_journal"] * llm_state
+        rows = np.nonzero(np.abs(signal) > p["threshold"])[0]
+        full = rows[self.trace_end[rows] == self.trace_value.shape[1]]
+        if len(full):
+            self._compact(full)
+            lo = 0
+        cols = self.trace_end[rows]
+        self.trace_value[rows, cols] = signal[rows]
+        self.trace_time[rows, cols] = t
+        self.trace_alive[rows, cols] = True
+        self.trace_end[rows] += 1
+
+        hi = int(self.trace_end.max())
+        used = self.trace_alive[:, lo:hi].any(axis=0)
+        self.trace_lo = lo + int(used.argmax()) if used.any() else hi
+        window = slice(self.trace_lo, hi)
+        self.journal = np.where(self.trace_alive[:, window], self._current(t, window), 0.0).sum(axis=1)
+
+    def _current(self, t: float, window: slice) -> np.ndarray:
+        decay = np.exp(-self.params["lambda"][:, None] * (t - self.trace_time[:, window]))
+        return self.trace_value[:, window] * decay
+
+    def _compact(self, rows: np.ndarray):
+        """Tasse à gauche les traces vivantes des lignes `rows`, dans l'ordre d'arrivée."""
+        alive = self.trace_alive[rows]
+        order = np.argsort(~alive, axis=1, kind="stable")
+        for name in ("trace_value", "trace_time", "trace_alive"):
+            arr = getattr(self, name)
+            arr[rows] = np.take_along_axis(arr[rows], order, axis=1)
+        self.trace_end[rows] = alive.sum(axis=1)
+
+    def _critrix_step(self, llm_state: np.ndarray):
+        p = self.params
+        tau_in = np.abs(llm_state)
+        excitation = p["gamma"] * np.maximum(0, tau_in - p["theta_C"])
+        self.tau_c = np.clip(self.tau_c + (excitation - p["eta_C"] * self.tau_c) * self.dt, 0.0, 10.0)
+        coherence = 1.0 / (1.0 + np.abs(tau_in - self.tau_c))
+        self.alert = (self.tau_c > p["theta_C"]) & (coherence < 0.4)
+        self.critrix = np.clip(self.critrix - self.tau_c * self.dt, -10, 10)
+
+    def _echo_step(self, llm_state: np.ndarray, prompted: np.ndarray, similarity: np.ndarray):
+        p = self.params
+        found = prompted & self.trace_alive.any(axis=1)
+        self.rho_similar = np.where(found, similarity, self.rho_similar)
+        self.has_similar |= found
+        coupling = p["rho_echo"] * (1 / (1 + np.exp(-llm_state)))
+        coupling = coupling + np.where(self.has_similar, self.rho_similar * self.journal, 0.0)
+        # EchoFuse : résonance intrinsèque (δ = 0, donc exp(−δ) = 1) + couplage du pas
+        dx = -p["alpha"] * self.echo + coupling + coupling
+        self.echo = np.clip(self.echo + dx * self.dt, -10, 10)
+
+    def step(self, llm_state, prompted, similarity):
+        """Avance tous les membres d'un pas (signaux scalaires ou de forme (M,))."""
+        llm_state = np.broadcast_to(np.asarray(llm_state, dtype=float), (self.size,))
+        prompted = np.broadcast_to(np.asarray(prompted, dtype=bool), (self.size,))
+        similarity = np.broadcast_to(np.asarray(similarity, dtype=float), (self.size,))
+        self._journal_step(self.t, llm_state)
+        self._critrix_step(llm_state)
+        self._echo_step(llm_state, prompted, similarity)
+        self.t += self.dt
+
+    def run(self, drive: EnsembleDrive) -> EnsembleResult:
+        n_steps = len(drive)
+        tau_c = np.empty((n_steps, self.size))
+        alert = np.empty((n_steps, self.size), dtype=bool)
+        for k in range(n_steps):
+            self.step(drive.llm_state[k], drive.prompted[k], drive.similarity[k])
+            tau_c[k] = self.tau_c
+            alert[k] = self.alert
+        final = {
+            "critrix": self.critrix.copy(),
+            "journal": self.journal.copy(),
+            "echo": self.echo.copy(),
+            "traces": self.trace_alive.sum(axis=1),
+        }
+        return EnsembleResult({k: v.copy() for k, v in self.params.items()}, tau_c, alert, final)
+
+
+# ----------------------------------------------------------------------
+# Balayages
+# ----------------------------------------------------------------------
+def grid(**axes: Sequence[float]) -> Dict[str, np.ndarray]:
+    """Produit cartésien de valeurs : grid(theta_C=[...], gamma=[...]) → {nom: (M,)}."""
+    names = list(axes)
+    combos = np.array(list(itertools.product(*(axes[n] for n in names))), dtype=float)
+    return {n: combos[:, i] for i, n in enumerate(names)}
+
+
+def _run_chunk(params: Dict[str, np.ndarray], drive: EnsembleDrive, dt: float) -> EnsembleResult:
+    return LyraEnsemble(params, dt=dt).run(drive)
+
+
+def run_sweep(params: Dict[str, np.ndarray], drive: EnsembleDrive, dt: float = 0.1,
+              chunk_size: int = 4096, workers: int | None = None) -> EnsembleResult:
+    """Simule un balayage, découpé en paquets de `chunk_size` membres sur un pool de processus."""
+    size = max((np.size(v) for v in params.values()), default=1)
+    bounds = [(i, min(i + chunk_size, size)) for i in range(0, size, chunk_size)]
+    chunks = [
+        ({k: (np.asarray(v)[a:b] if np.ndim(v) else v) for k, v in params.items()}, drive.members(a, b))
+        for a, b in bounds
+    ]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(chunks) == 1:
+        parts = [_run_chunk(p, d, dt) for p, d in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            parts = list(pool.map(_run_chunk, *zip(*chunks), itertools.repeat(dt)))
+    return EnsembleResult.concatenate(parts)
+
+
+# 🧪 Test local : carte d'alerte theta_C × gamma sur un pilotage synthétique
+if __name__ == "__main__":
+    import time
+
+    drive = EnsembleDrive.synthetic(2000, prompt_rate=0.5, mean_length=220.0, seed=0)
+    sweep = grid(theta_C=np.linspace(0.1, 1.0, 40), gamma=np.linspace(0.2, 3.0, 50), eta_C=[0.1, 0.3])
+    start = time.perf_counter()
+    result = run_sweep(sweep, drive, chunk_size=1000)
+    print(f"{result.tau_c.shape[1]} membres × {len(drive)} pas en {time.perf_counter() - start:.2f}s")
+    print(result.summary())
@@ -0,0 +1,244 @@
+"""Flux d'événements structurés, écrits hors du chemin des requêtes.
+
+`EventLog.emit` ne fait que déposer un dict dans une file bornée ; un thread
+d'écriture la vide par lots (au plus `batch_size` événements, au moins toutes
+les `flush_interval` secondes) vers un puits :
+    • JsonlSink   : une ligne JSON par événement (fichier en ajout),
+    • SqliteSink  : table `events(id, ts, type, session, data)`, un commit par lot.
+
+Si la file est pleine (puits trop lent), l'événement est compté dans `dropped`
+au lieu de bloquer la requête. Configuration : LYRA_EVENTS
+("jsonl:/chemin", "sqlite:/chemin" ; sans préfixe, .db/.sqlite → SQLite, sinon
+JSONL), LYRA_EVENTS_BATCH (défaut 256), LYRA_EVENTS_QUEUE (défaut 10000).
+"""
+
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import weakref
+from datetime import datetime
+from typing import Dict, List
+
+
+def _json_default(obj):
+    # scalaires NumPy (np.float64, np.bool_…) et autres valeurs non JSON
+    return obj.item() if hasattr(obj, "item") else str(obj)
+
+
+def _dumps(event: Dict) -> str:
+    return json.dumps(event, ensure_ascii=False, default=_json_default)
+
+
+class JsonlSink:
+    """📜 Événements ajoutés à un fichier JSONL."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fh = None
+
+    def write(self, events: List[Dict]):
+        if self._fh is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._fh = open(self.path, "a", encoding="utf-8")
+        self._fh.write("".join(_dumps(e) + "\n" for e in events))
+        self._fh.flush()
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def detach(self):
+        """Oublie le fichier hérité du parent après un fork (rouvert au prochain lot)."""
+        self._fh = None
+
+
+class SqliteSink:
+    """🗃️ Événements insérés dans une base SQLite (connexion propre au thread d'écriture)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db = None
+
+    def write(self, events: List[Dict]):
+        if self._db is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS events ("
+                "id INTEGER PRIMARY KEY, ts TEXT, type TEXT, session TEXT, data TEXT)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS events_session ON events(session, ts)")
+        with self._db:
+            self._db.executemany(
+                "INSERT INTO events (ts, type, session, data) VALUES (?, ?, ?, ?)",
+                [(e.get("ts"), e.get("type"), e.get("session"), _dumps(e)) for e in events],
+            )
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def detach(self):
+        """Une connexion SQLite ne franchit pas un fork : l'enfant ouvre la sienne."""
+        self._db = None
+
+
+class EventLog:
+    """🛰️ File d'événements vidée par lots vers un puits par un thread d'arrière-plan.
+
+    Args:
+        sink: Objet exposant `write(events)` et `close()`.
+        batch_size: Nombre maximal d'événements par écriture.
+        flush_interval: Attente maximale (s) avant d'écrire un lot incomplet.
+        max_queue: Taille de la file ; au-delà, les événements sont abandonnés.
+    """
+
+    def __init__(self, sink, batch_size: int = 256, flush_interval: float = 1.0, max_queue: int = 10000):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._max_queue = max_queue
+        self.emitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.write_errors = 0
+        self._closed = False
+        self._start()
+        _logs.add(self)
+
+    def _start(self):
+        self._queue: "queue.Queue[Dict | None]" = queue.Queue(maxsize=self._max_queue)
+        self._thread = threading.Thread(target=self._run, name="lyra-events", daemon=True)
+        self._thread.start()
+
+    def emit(self, type: str, session: str | None = None, **fields) -> bool:
+        """Dépose un événement (sans jamais bloquer) ; False s'il a été abandonné."""
+        event = {"ts": datetime.utcnow().isoformat(), "type": type, "session": session, **fields}
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.emitted += 1
+        return True
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch, stop = [], first is None
+            if not stop:
+                batch.append(first)
+            while len(batch) < self.batch_size and not stop:
+                try:
+                    event = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if event is None:
+                    stop = True
+                else:
+                    batch.append(event)
+            if batch:
+                try:
+                    self.sink.write(batch)
+                    self.written += len(batch)
+                except Exception:
+                    self.write_errors += 1  # lot perdu ; l'écriture reprend au suivant
+            for _ in range(len(batch) + stop):
+                self._queue.task_done()
+            if stop:
+                self.sink.close()
+                return
+
+    def flush(self):
+        """Attend que tous les événements déjà émis soient écrits."""
+        self._queue.join()
+
+    def close(self):
+        """Écrit les événements en attente puis ferme le puits."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "emitted": self.emitted,
+            "written": self.written,
+            "pending": self._queue.qsize(),
+            "dropped": self.dropped,
+            "write_errors": self.write_errors,
+        }
+
+
+_logs: "weakref.WeakSet[EventLog]" = weakref.WeakSet()
+
+
+def _after_fork_in_child():
+    # chaque processus enfant écrit avec son propre thread (même fichier, en ajout)
+    for log in list(_logs):
+        if not log._closed:
+            if hasattr(log.sink, "detach"):
+                log.sink.detach()
+            log._start()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def open_sink(spec: str):
+    """Puits décrit par "jsonl:/chemin", "sqlite:/chemin" ou un simple chemin."""
+    kind, sep, path = spec.partition(":")
+    if not sep or kind not in ("jsonl", "sqlite"):
+        kind, path = ("sqlite" if spec.endswith((".db", ".sqlite")) else "jsonl"), spec
+    return SqliteSink(path) if kind == "sqlite" else JsonlSink(path)
+
+
+_lock = threading.Lock()
+_log: EventLog | None = None
+
+
+def get_event_log() -> EventLog | None:
+    """Journal d'événements partagé par le processus (None si LYRA_EVENTS n'est pas défini)."""
+    global _log
+    spec = os.getenv("LYRA_EVENTS")
+    if not spec:
+        return None
+    if _log is None:
+        with _lock:
+            if _log is None:
+                _log = EventLog(
+                    open_sink(spec),
+                    batch_size=int(os.getenv("LYRA_EVENTS_BATCH", "256")),
+                    max_queue=int(os.getenv("LYRA_EVENTS_QUEUE", "10000")),
+                )
+                atexit.register(_log.close)
+    return _log
+
+
+if __name__ == "__main__":
+    # 🧪 Test local : 10 000 événements vers JSONL et SQLite
+    import tempfile
+    import time
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for spec in (f"{tmp}/events.jsonl", f"sqlite:{tmp}/events.db"):
+            log = EventLog(open_sink(spec), max_queue=100000)
+            start = time.perf_counter()
+            for i in range(10000):
+                log.emit("step", session="demo", t=i * 0.1, alert=bool(i % 7 == 0))
+            emit_ms = 1000 * (time.perf_counter() - start)
+            log.close()
+            print(f"{spec.split('/')[-1]} : {log.stats()} — émission {emit_ms:.1f} ms")
+            assert log.written == 10000
@@ -0,0 +1,122 @@
+"""Intégrateurs numériques du réseau de modules (`LyraNetwork(integrator=…)`).
+
+    • "euler"    : x ← x + dt·f(t, x), le pas de `LyraModule.step` (défaut, les
+                   trajectoires de référence en dépendent) ;
+    • "rk4"      : Runge–Kutta classique d'ordre 4, pas fixe dt ;
+    • "adaptive" : Dormand–Prince 5(4) à erreur contrôlée — l'intervalle demandé
+                   est parcouru en sous‑pas dont la taille suit la raideur locale.
+
+Chaque intégrateur reçoit f(t, y) → dy/dt sur un tableau 1‑D et renvoie le
+nouvel état ; les bornes d'état (±10) sont appliquées par l'appelant, et par
+`Adaptive` après chaque sous‑pas accepté.
+"""
+
+from typing import Callable
+
+import numpy as np
+
+INTEGRATORS = ("euler", "rk4", "adaptive")
+
+Rates = Callable[[float, np.ndarray], np.ndarray]
+
+
+def euler(f: Rates, t: float, y: np.ndarray, h: float, k1: np.ndarray | None = None) -> np.ndarray:
+    return y + h * (f(t, y) if k1 is None else k1)
+
+
+def rk4(f: Rates, t: float, y: np.ndarray, h: float, k1: np.ndarray | None = None) -> np.ndarray:
+    if k1 is None:
+        k1 = f(t, y)
+    k2 = f(t + 0.5 * h, y + 0.5 * h * k1)
+    k3 = f(t + 0.5 * h, y + 0.5 * h * k2)
+    k4 = f(t + h, y + h * k3)
+    return y + (h / 6.0) * (k1 + 2.0 * k2 + 2.0 * k3 + k4)
+
+
+# Tableau de Butcher de Dormand–Prince (ordre 5, estimateur d'ordre 4, FSAL)
+_C = (0.0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1.0, 1.0)
+_A = (
+    (),
+    (1 / 5,),
+    (3 / 40, 9 / 40),
+    (44 / 45, -56 / 15, 32 / 9),
+    (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+    (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+    (35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84),
+)
+_E = (71 / 57600, 0.0, -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40)
+
+
+class Adaptive:
+    """🧭 Dormand–Prince 5(4) : sous‑pas acceptés si l'erreur estimée reste sous tolérance.
+
+    La taille du dernier sous‑pas accepté est retenue d'un appel à l'autre :
+    une dynamique lisse est franchie en quelques sous‑pas, une transitoire
+    raide en autant qu'il faut.
+    """
+
+    def __init__(self, rtol: float = 1e-6, atol: float = 1e-9, max_substeps: int = 100_000,
+                 bounds: tuple = (-10.0, 10.0)):
+        self.rtol = rtol
+        self.atol = atol
+        self.max_substeps = max_substeps
+        self.bounds = bounds
+        self.h: float | None = None  # dernier sous‑pas accepté
+        self.substeps = 0  # sous‑pas acceptés (cumul)
+        self.rejected = 0
+
+    def integrate(self, f: Rates, t: float, y: np.ndarray, span: float,
+                  k1: np.ndarray | None = None) -> np.ndarray:
+        """Intègre de t à t + span ; `k1` : f(t, y) si déjà évalué."""
+        end = t + span
+        h = min(self.h or span, span)
+        y = np.array(y, dtype=float)
+        k = [f(t, y) if k1 is None else k1] + [None] * 6
+        for _ in range(self.max_substeps):
+            last = t + h >= end
+            if last:
+                h = end - t
+            for s in range(1, 7):
+                k[s] = f(t + _C[s] * h, y + h * sum(a * k[j] for j, a in enumerate(_A[s]) if a))
+            y5 = y + h * sum(a * k[j] for j, a in enumerate(_A[6]) if a)
+            err = h * sum(e * k[j] for j, e in enumerate(_E) if e)
+            scale = self.atol + self.rtol * np.maximum(np.abs(y), np.abs(y5))
+            norm = float(np.sqrt(np.mean((err / scale) ** 2))) if len(y) else 0.0
+            factor = 5.0 if norm == 0 else min(5.0, max(0.2, 0.9 * norm ** -0.2))
+            if norm <= 1.0:
+                t = end if last else t + h
+                clipped = np.clip(y5, *self.bounds)
+                k[0] = k[6] if np.array_equal(clipped, y5) else f(t, clipped)  # FSAL
+                y = clipped
+                self.substeps += 1
+                if last:
+                    return y  # dernier sous‑pas tronqué : on garde la taille précédente
+                h = self.h = h * factor
+            else:
+                self.rejected += 1
+                h = self.h = h * factor
+        raise RuntimeError(f"adaptive integrator: more than {self.max_substeps} substeps over {span}")
+
+
+STEPPERS = {"euler": euler, "rk4": rk4}
+
+
+# 🧪 Test local : oscillateur amorti x'' = −x − 0.1·x', erreur à t = 10
+if __name__ == "__main__":
+    def f(t, y):
+        return np.array([y[1], -y[0] - 0.1 * y[1]])
+
+    def reference(t):
+        w = np.sqrt(1 - 0.0025)
+        return np.exp(-0.05 * t) * (np.cos(w * t) + 0.05 / w * np.sin(w * t))
+
+    for name, stepper in STEPPERS.items():
+        y, t = np.array([1.0, 0.0]), 0.0
+        for _ in range(100):
+            y = stepper(f, t, y, 0.1)
+            t += 0.1
+        print(f"{name:>8} : 100 pas, erreur={abs(y[0] - reference(10.0)):.2e}")
+    adaptive = Adaptive(rtol=1e-8, atol=1e-10)
+    y = adaptive.integrate(f, 0.0, np.array([1.0, 0.0]), 10.0)
+    print(f"adaptive : {adaptive.substeps} sous‑pas ({adaptive.rejected} rejetés), "
+          f"erreur={abs(y[0] - reference(10.0)):.2e}")
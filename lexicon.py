@@ -0,0 +1,139 @@
+"""Lexique compilé : recherche de milliers de termes en un seul passage.
+
+Un `Lexicon` associe des termes à des étiquettes (émotion, thème, interdit…)
+et les compile en automate d'Aho‑Corasick. `matches(texte)` parcourt le texte
+(en minuscules) une seule fois et renvoie, par étiquette, les termes présents
+comme sous‑chaînes — même sémantique que `terme.lower() in texte.lower()`,
+mais en O(longueur du texte + occurrences) quelle que soit la taille du lexique.
+
+Fichiers de lexique (`Lexicon.from_file`) :
+    • .json : {"etiquette": ["terme", ...], ...}
+    • texte : une entrée « etiquette<TAB>terme » par ligne, `#` pour commenter.
+"""
+
+import json
+from collections import deque
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+class Lexicon:
+    """🔎 Termes étiquetés, compilés en automate d'Aho‑Corasick à la première recherche."""
+
+    def __init__(self, entries: Dict[str, Iterable[str]] | None = None):
+        self.entries: List[Tuple[str, str]] = []  # (étiquette, terme d'origine)
+        self._automaton = None
+        for label, terms in (entries or {}).items():
+            self.extend(label, terms)
+
+    def add(self, label: str, term: str):
+        if term:
+            self.entries.append((label, term))
+            self._automaton = None
+
+    def extend(self, label: str, terms: Iterable[str]):
+        for term in terms:
+            self.add(label, term)
+
+    def terms(self, label: str) -> List[str]:
+        return [term for lab, term in self.entries if lab == label]
+
+    def __len__(self):
+        return len(self.entries)
+
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_file(cls, path: str) -> "Lexicon":
+        lexicon = cls()
+        with open(path, encoding="utf-8") as fh:
+            if path.endswith(".json"):
+                for label, terms in json.load(fh).items():
+                    lexicon.extend(label, terms)
+                return lexicon
+            for line in fh:
+                line = line.rstrip("\n")
+                if not line.strip() or line.lstrip().startswith("#"):
+                    continue
+                label, sep, term = line.partition("\t")
+                if not sep:
+                    raise ValueError(f"{path}: expected 'label<TAB>term', got {line!r}")
+                lexicon.add(label.strip(), term.strip())
+        return lexicon
+
+    # ------------------------------------------------------------------
+    def _compile(self):
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[int]] = [[]]  # entrées se terminant exactement sur ce nœud
+        for k, (_label, term) in enumerate(self.entries):
+            node = 0
+            for ch in term.lower():
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    out.append([])
+                node = nxt
+            out[node].append(k)
+        fail = [0] * len(goto)
+        link = [-1] * len(goto)  # plus proche suffixe (via fail) qui termine une entrée
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                target = goto[f].get(ch, 0)
+                fail[child] = target if target != child else 0
+                link[child] = fail[child] if out[fail[child]] else link[fail[child]]
+                queue.append(child)
+        self._automaton = (goto, fail, out, link)
+
+    def hits(self, text: str) -> Set[int]:
+        """Indices (dans `entries`) des termes présents dans `text`."""
+        if self._automaton is None:
+            self._compile()
+        goto, fail, out, link = self._automaton
+        found: Set[int] = set()
+        node = 0
+        for ch in text.lower():
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            o = node if out[node] else link[node]
+            while o > 0:
+                found.update(out[o])
+                o = link[o]
+        return found
+
+    def matches(self, text: str) -> Dict[str, List[str]]:
+        """{étiquette: [termes présents]} — termes dans l'ordre du lexique."""
+        result: Dict[str, List[str]] = {}
+        for k in sorted(self.hits(text)):
+            label, term = self.entries[k]
+            result.setdefault(label, []).append(term)
+        return result
+
+    def labels(self, text: str) -> Set[str]:
+        """Étiquettes ayant au moins un terme présent dans `text`."""
+        return {self.entries[k][0] for k in self.hits(text)}
+
+
+if __name__ == "__main__":
+    # 🧪 Test local : équivalence avec la recherche naïve `terme in texte`
+    import random
+    import time
+
+    rng = random.Random(0)
+    alphabet = "abcdeéè "
+    lexicon = Lexicon()
+    for label in ("colere", "joie", "interdit"):
+        lexicon.extend(label, {"".join(rng.choice(alphabet) for _ in range(rng.randint(2, 7))) for _ in range(2000)})
+    texts = ["".join(rng.choice(alphabet) for _ in range(300)) for _ in range(50)]
+    for text in texts:
+        naive = {k for k, (_l, term) in enumerate(lexicon.entries) if term.lower() in text.lower()}
+        assert lexicon.hits(text) == naive
+    start = time.perf_counter()
+    for text in texts:
+        lexicon.matches(text)
+    print(f"{len(lexicon)} termes, {1000 * (time.perf_counter() - start) / len(texts):.2f} ms par texte ✔")
@@ -0,0 +1,387 @@
+"""Backends LLM interchangeables sous AutoGenesisCoreLLM.
+
+    • `OpenAIHTTPBackend` (défaut) : API Chat Completions via httpx —
+      connexions HTTP réutilisées (pool borné), délais configurables,
+      relances à attente exponentielle « full jitter » (erreurs réseau, 429, 5xx,
+      en respectant Retry-After), plafond de requêtes simultanées et seaux à
+      jetons sur les requêtes/minute et les tokens/minute.
+    • `StubBackend` : réponses locales déterministes (fonction du prompt) avec
+      latence configurable, pour tester la charge de toute la chaîne hors ligne.
+
+Un backend expose `complete`, `acomplete` et `astream` sur une requête au format
+Chat Completions ({"model", "messages", "temperature", "max_tokens"}) et lève
+`LLMError` quand la requête échoue définitivement.
+
+Sélection par variables d'environnement (`get_backend`) :
+LYRA_LLM_BACKEND (openai | stub), LYRA_LLM_BASE_URL, LYRA_LLM_TIMEOUT (s),
+LYRA_LLM_MAX_RETRIES, LYRA_LLM_MAX_CONNECTIONS, LYRA_LLM_RPM, LYRA_LLM_TPM,
+LYRA_STUB_LATENCY_MS.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import AsyncIterator
+
+from lyra.config import OPENAI_API_KEY
+
+
+class LLMError(Exception):
+    """Échec définitif d'une requête LLM (après relances)."""
+
+
+class TokenBucket:
+    """🪣 Seau à jetons : `rate` jetons/s, au plus `capacity` en réserve."""
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, amount: float) -> float:
+        """Prélève `amount` jetons (à crédit) ; retourne l'attente nécessaire (s)."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= min(amount, self.capacity)
+            return max(0.0, -self.tokens / self.rate)
+
+    def acquire(self, amount: float = 1.0):
+        wait = self._reserve(amount)
+        if wait:
+            time.sleep(wait)
+
+    async def aacquire(self, amount: float = 1.0):
+        wait = self._reserve(amount)
+        if wait:
+            await asyncio.sleep(wait)
+
+
+def estimate_tokens(request: dict) -> int:
+    """Estimation grossière (≈ 4 caractères par token) : prompt + max_tokens."""
+    prompt = sum(len(m.get("content", "")) for m in request.get("messages", ()))
+    return prompt // 4 + int(request.get("max_tokens", 0))
+
+
+class LLMBackend(ABC):
+    """🔌 Interface commune des backends."""
+
+    name = "base"
+
+    @abstractmethod
+    def complete(self, request: dict) -> str:
+        ...
+
+    @abstractmethod
+    async def acomplete(self, request: dict) -> str:
+        ...
+
+    @abstractmethod
+    def astream(self, request: dict) -> AsyncIterator[str]:
+        ...
+
+    def warm_up(self):
+        """Prépare les ressources (imports, clients) avant la première requête."""
+
+    def close(self):
+        pass
+
+    async def aclose(self):
+        self.close()
+
+
+class StubBackend(LLMBackend):
+    """🧪 Backend local déterministe : même prompt ⇒ même réponse.
+
+    Args:
+        latency: Délai avant la réponse (s).
+        token_delay: Délai entre deux fragments en streaming (s).
+        words: Nombre de mots de la réponse (None = selon max_tokens, plafonné à 60).
+    """
+
+    name = "stub"
+    VOCABULARY = ("lumière", "écho", "mémoire", "souffle", "onde", "calme", "trace", "seuil",
+                  "douceur", "vertige", "rivage", "élan", "silence", "fragment", "nuance", "éveil")
+
+    def __init__(self, latency: float = 0.05, token_delay: float = 0.0, words: int | None = None):
+        self.latency = latency
+        self.token_delay = token_delay
+        self.words = words
+        self.calls = 0
+
+    def reply(self, request: dict) -> str:
+        prompt = request["messages"][-1]["content"]
+        seed = int.from_bytes(hashlib.blake2b(prompt.encode("utf-8"), digest_size=8).digest(), "big")
+        rng = random.Random(seed)
+        count = self.words or min(60, max(1, int(request.get("max_tokens", 150)) // 3))
+        return " ".join(rng.choice(self.VOCABULARY) for _ in range(count)).capitalize() + "."
+
+    def complete(self, request: dict) -> str:
+        self.calls += 1
+        time.sleep(self.latency)
+        return self.reply(request)
+
+    async def acomplete(self, request: dict) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return self.reply(request)
+
+    async def astream(self, request: dict) -> AsyncIterator[str]:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        words = self.reply(request).split(" ")
+        for i, word in enumerate(words):
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            yield word if i == 0 else " " + word
+
+
+class OpenAIHTTPBackend(LLMBackend):
+    """🌐 API Chat Completions sur httpx : pool, délais, relances, débit borné.
+
+    Args:
+        api_key: Clé API (défaut : OPENAI_API_KEY puis lyra.config).
+        base_url: Racine de l'API.
+        timeout: Délai de lecture (s) ; connexion bornée à 5 s.
+        max_retries: Relances après la première tentative.
+        backoff: Attente de base (s) ; la k‑ième relance attend U(0, min(backoff_max, backoff·2^k)).
+        backoff_max: Plafond d'attente entre deux tentatives (s).
+        max_connections: Taille du pool (et plafond de requêtes simultanées).
+        requests_per_minute: Seau à jetons sur les requêtes (None = illimité).
+        tokens_per_minute: Seau à jetons sur les tokens estimés (None = illimité).
+    """
+
+    name = "openai"
+    RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+    def __init__(self, api_key: str | None = None, base_url: str = "https://api.openai.com/v1",
+                 timeout: float = 60.0, max_retries: int = 3, backoff: float = 0.5, backoff_max: float = 8.0,
+                 max_connections: int = 20, requests_per_minute: float | None = None,
+                 tokens_per_minute: float | None = None):
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY", OPENAI_API_KEY)
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.max_connections = max_connections
+        # budgets par minute : rafale possible jusqu'au budget, puis débit lissé
+        self.request_bucket = TokenBucket(requests_per_minute / 60.0, requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute / 60.0, tokens_per_minute) if tokens_per_minute else None
+        self._client = None
+        self._aclient = None
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._aslots: asyncio.Semaphore | None = None
+        self.retries = 0
+
+    # ------------------------------------------------------------------
+    def _options(self) -> dict:
+        import httpx
+        return dict(
+            base_url=self.base_url,
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            timeout=httpx.Timeout(self.timeout, connect=5.0),
+            limits=httpx.Limits(max_connections=self.max_connections,
+                                max_keepalive_connections=self.max_connections),
+        )
+
+    def warm_up(self):
+        self.client
+        self.aclient
+
+    @property
+    def client(self):
+        if self._client is None:
+            import httpx
+            self._client = httpx.Client(**self._options())
+        return self._client
+
+    @property
+    def aclient(self):
+        if self._aclient is None:
+            import httpx
+            self._aclient = httpx.AsyncClient(**self._options())
+            self._aslots = asyncio.Semaphore(self.max_connections)
+        return self._aclient
+
+    def _delay(self, attempt: int, response=None) -> float:
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
+
+    def _retryable(self, exc_or_response) -> bool:
+        import httpx
+        if isinstance(exc_or_response, httpx.Response):
+            return exc_or_response.status_code in self.RETRY_STATUS
+        return isinstance(exc_or_response, httpx.TransportError)
+
+    @staticmethod
+    def _error(response) -> LLMError:
+        try:
+            detail = response.json()["error"]["message"]
+        except Exception:
+            detail = response.text[:200]
+        return LLMError(f"HTTP {response.status_code}: {detail}")
+
+    @staticmethod
+    def _content(response) -> str:
+        """Texte d'une réponse 200 ; un corps inattendu lève LLMError."""
+        try:
+            content = response.json()["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError, ValueError) as exc:
+            raise LLMError(f"Malformed completion body: {type(exc).__name__}: {exc}") from exc
+        if not isinstance(content, str):
+            raise LLMError(f"Malformed completion body: content is {type(content).__name__}")
+        return content
+
+    @staticmethod
+    def _delta(data: str) -> str:
+        """Texte d'un événement SSE (vide pour un fragment sans choix, ex. usage final)."""
+        try:
+            choices = json.loads(data)["choices"]
+            return (choices[0]["delta"].get("content") or "") if choices else ""
+        except (KeyError, IndexError, TypeError, ValueError, AttributeError) as exc:
+            raise LLMError(f"Malformed stream event: {type(exc).__name__}: {exc}") from exc
+
+    # ------------------------------------------------------------------
+    def complete(self, request: dict) -> str:
+        import httpx
+        if self.request_bucket:
+            self.request_bucket.acquire()
+        if self.token_bucket:
+            self.token_bucket.acquire(estimate_tokens(request))
+        for attempt in range(self.max_retries + 1):
+            last = attempt == self.max_retries
+            try:
+                with self._slots:
+                    response = self.client.post("/chat/completions", json=request)
+            except httpx.TransportError as exc:
+                if last:
+                    raise LLMError(f"{type(exc).__name__}: {exc}") from exc
+                response = None
+            else:
+                if response.status_code == 200:
+                    return self._content(response)
+                if last or not self._retryable(response):
+                    raise self._error(response)
+            self.retries += 1
+            time.sleep(self._delay(attempt, response))
+        raise LLMError("unreachable")
+
+    async def acomplete(self, request: dict) -> str:
+        import httpx
+        if self.request_bucket:
+            await self.request_bucket.aacquire()
+        if self.token_bucket:
+            await self.token_bucket.aacquire(estimate_tokens(request))
+        client = self.aclient
+        for attempt in range(self.max_retries + 1):
+            last = attempt == self.max_retries
+            try:
+                async with self._aslots:
+                    response = await client.post("/chat/completions", json=request)
+            except httpx.TransportError as exc:
+                if last:
+                    raise LLMError(f"{type(exc).__name__}: {exc}") from exc
+                response = None
+            else:
+                if response.status_code == 200:
+                    return self._content(response)
+                if last or not self._retryable(response):
+                    raise self._error(response)
+            self.retries += 1
+            await asyncio.sleep(self._delay(attempt, response))
+        raise LLMError("unreachable")
+
+    async def astream(self, request: dict) -> AsyncIterator[str]:
+        """Fragments SSE ; relance seulement tant qu'aucun fragment n'a été émis."""
+        import httpx
+        if self.request_bucket:
+            await self.request_bucket.aacquire()
+        if self.token_bucket:
+            await self.token_bucket.aacquire(estimate_tokens(request))
+        client = self.aclient
+        for attempt in range(self.max_retries + 1):
+            last = attempt == self.max_retries
+            emitted = False
+            response = None
+            try:
+                async with self._aslots:
+                    async with client.stream("POST", "/chat/completions", json={**request, "stream": True}) as response:
+                        if response.status_code != 200:
+                            await response.aread()
+                            if last or not self._retryable(response):
+                                raise self._error(response)
+                        else:
+                            async for line in response.aiter_lines():
+                                if not line.startswith("data:"):
+                                    continue
+                                data = line[5:].strip()
+                                if data == "[DONE]":
+                                    return
+                                piece = self._delta(data)
+                                if piece:
+                                    emitted = True
+                                    yield piece
+                            return
+            except httpx.TransportError as exc:
+                if last or emitted:
+                    raise LLMError(f"{type(exc).__name__}: {exc}") from exc
+            self.retries += 1
+            await asyncio.sleep(self._delay(attempt, response))
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def aclose(self):
+        self.close()
+        if self._aclient is not None:
+            await self._aclient.aclose()
+            self._aclient = None
+
+
+def _env_float(name: str) -> float | None:
+    value = os.getenv(name)
+    return float(value) if value else None
+
+
+_lock = threading.Lock()
+_backend: LLMBackend | None = None
+
+
+def get_backend() -> LLMBackend:
+    """Backend partagé par le processus (choisi par LYRA_LLM_BACKEND)."""
+    global _backend
+    if _backend is None:
+        with _lock:
+            if _backend is None:
+                kind = os.getenv("LYRA_LLM_BACKEND", "openai")
+                if kind == "stub":
+                    _backend = StubBackend(latency=float(os.getenv("LYRA_STUB_LATENCY_MS", "50")) / 1000.0)
+                elif kind == "openai":
+                    _backend = OpenAIHTTPBackend(
+                        base_url=os.getenv("LYRA_LLM_BASE_URL", "https://api.openai.com/v1"),
+                        timeout=float(os.getenv("LYRA_LLM_TIMEOUT", "60")),
+                        max_retries=int(os.getenv("LYRA_LLM_MAX_RETRIES", "3")),
+                        max_connections=int(os.getenv("LYRA_LLM_MAX_CONNECTIONS", "20")),
+                        requests_per_minute=_env_float("LYRA_LLM_RPM"),
+                        tokens_per_minute=_env_float("LYRA_LLM_TPM"),
+                    )
+                else:
+                    raise ValueError(f"Unknown LYRA_LLM_BACKEND: {kind!r}")
+    return _backend
+
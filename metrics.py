@@ -0,0 +1,240 @@
+"""Métriques du processus au format d'exposition Prometheus (sans dépendance).
+
+Trois sortes de séries :
+    • Histogram : durées par étape du chemin chaud (`timed("llm")`…),
+    • Counter   : compteurs incrémentés sur le chemin chaud,
+    • Callback  : valeurs lues seulement au moment du scrape (taille des files,
+      traces du journal, hits de cache) — aucun coût sur les requêtes.
+
+`timed(stage)` enregistre la durée dans `lyra_stage_seconds{stage=…}` et, si un
+relevé est ouvert dans le contexte courant (`collect_timings()`), l'y cumule :
+c'est la ventilation par requête renvoyée par /lyra?timings=true. Le contexte
+suit les `await` et le pool CPU (`lyra.workers.run_cpu` le propage). Les étapes
+peuvent s'imbriquer (`encode` est compris dans `dynamics.journal_critrix`).
+
+Coût d'une mesure : deux lectures d'horloge, une recherche de seau et une
+addition sous verrou — de l'ordre de la microseconde.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Sequence
+
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """📊 Histogramme à seaux fixes, une série par combinaison d'étiquettes."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[tuple, List] = {}  # étiquettes → [comptes par seau…, somme, total]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = []
+        with self._lock:
+            snapshot = {k: list(v) for k, v in self._series.items()}
+        for labels, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(series[-2])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {series[-1]}")
+        return lines
+
+
+class Counter:
+    """➕ Compteur monotone (une série par combinaison d'étiquettes)."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, *labels: str):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in sorted(values.items())]
+
+
+class Callback:
+    """🔭 Série lue au scrape : `fn()` renvoie un nombre ou {valeurs d'étiquettes: nombre}."""
+
+    def __init__(self, name: str, help: str, fn: Callable[[], float | Dict[tuple, float]],
+                 kind: str = "gauge", labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+
+    def render(self) -> List[str]:
+        try:
+            values = self.fn()
+        except Exception:  # une source indisponible ne casse pas le scrape
+            return []
+        if not isinstance(values, dict):
+            values = {(): values}
+        return [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in sorted(values.items())]
+
+
+class Registry:
+    """🗂️ Ensemble de métriques rendu au format texte Prometheus 0.0.4."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics[metric.name] = metric  # ré-enregistrer un nom remplace la série
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "lyra_stage_seconds", "Durée des étapes du pipeline Lyra (s).", labelnames=("stage",)))
+STEPS = REGISTRY.register(Counter("lyra_steps_total", "Pas de simulation effectués."))
+CRITRIX_ALERTS = REGISTRY.register(Counter("lyra_critrix_alerts_total", "Pas terminés en alerte CRITRIX."))
+LLM_ERRORS = REGISTRY.register(Counter("lyra_llm_errors_total", "Appels LLM en échec."))
+
+_timings: ContextVar[Dict[str, float] | None] = ContextVar("lyra_timings", default=None)
+
+
+class timed:
+    """Chronomètre une étape : `with timed("llm"): …` (aussi autour d'un `await`)."""
+
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        STAGE_SECONDS.observe(elapsed, self.stage)
+        breakdown = _timings.get()
+        if breakdown is not None:
+            breakdown[self.stage] = breakdown.get(self.stage, 0.0) + elapsed
+        return False
+
+
+class collect_timings:
+    """Relevé par requête : `with collect_timings() as t: …` puis t = {étape: secondes}."""
+
+    def __enter__(self) -> Dict[str, float]:
+        self.breakdown: Dict[str, float] = {}
+        self._token = _timings.set(self.breakdown)
+        return self.breakdown
+
+    def __exit__(self, *exc):
+        _timings.reset(self._token)
+        return False
+
+
+def process_memory(pid: int | str = "self") -> Dict[str, int]:
+    """Mémoire d'un processus (octets) d'après /proc/<pid>/smaps_rollup (Linux ; {} ailleurs).
+
+    rss : pages résidentes ; pss : part proportionnelle (pages partagées divisées
+    entre les processus qui les mappent) ; private : pages propres au processus —
+    ce qu'un worker de plus coûte réellement.
+    """
+    fields = {"Rss": "rss", "Pss": "pss", "Shared_Clean": "shared_clean", "Shared_Dirty": "shared_dirty",
+              "Private_Clean": "private_clean", "Private_Dirty": "private_dirty"}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as fh:
+            lines = fh.readlines()
+    except OSError:
+        return {}
+    memory = {}
+    for line in lines:
+        key, _, rest = line.partition(":")
+        if key in fields:
+            memory[fields[key]] = int(rest.split()[0]) * 1024
+    memory["private"] = memory.get("private_clean", 0) + memory.get("private_dirty", 0)
+    return memory
+
+
+def timings_ms(breakdown: Dict[str, float]) -> Dict[str, float]:
+    return {stage: round(1000 * seconds, 3) for stage, seconds in breakdown.items()}
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+if __name__ == "__main__":
+    # 🧪 Test local : coût d'une mesure et rendu
+    n = 200_000
+    start = time.perf_counter()
+    for _ in range(n):
+        with timed("bench"):
+            pass
+    print(f"timed() : {1e6 * (time.perf_counter() - start) / n:.2f} µs par mesure")
+    with collect_timings() as breakdown:
+        with timed("outer"):
+            with timed("inner"):
+                time.sleep(0.002)
+    print(timings_ms(breakdown))
+    REGISTRY.register(Callback("lyra_demo_queue_depth", "Démo.", lambda: {("a",): 3}, labelnames=("q",)))
+    print("\n".join(line for line in render().splitlines() if "bench" not in line)[:1200])
@@ -6,6 +6,8 @@ import numpy as np
 class CRITRIX(LyraModule):
     """🧃 Module critique dialectique : détecte les tensions excessives tout en évaluant leur valeur poétique."""
 
+    stateful_intrinsic = True  # intrinsic intègre tau_c (Euler) à chaque appel
+
     def __init__(self, name, params, neighbors=None):
         super().__init__(name, params, neighbors)
         self.is_over_threshold = False
@@ -32,6 +34,50 @@ class CRITRIX(LyraModule):
 
         return self.last_output
 
+    def jump(self, t: float, steps: int, dt: float, exact: bool = False) -> bool:
+        """Saut en forme close, tau_in et voisins figés (tau_c suit toujours son pas d'Euler).
+
+        tau_k = E + rᵏ(tau_0 − E), r = 1 − η·dt, E = γ·max(0, tau_in − θ)/η, plafonné
+        à 10 ; l'état reçoit dt·Σ(c − tau_k). Refusé si c − tau_k change de signe
+        en chemin (l'état pourrait toucher une borne puis repartir).
+        """
+        tau_in = self.params.get("tau_in", 0.0)
+        theta_C = self.params.get("theta_C", 1.0)
+        gamma = self.params.get("gamma", 1.0)
+        eta_C = self.params.get("eta_C", 0.2)
+        h = self.params.get("dt", 0.1)
+        r = 1.0 - eta_C * h
+        if not 0 <= r < 1:
+            return False
+        tau0 = float(self.tau_c)
+        target = gamma * max(0, tau_in - theta_C) / eta_C
+
+        def geometric_sum(k):  # Σ_{i=1..k} tau_i, sans plafond
+            return k * target + (tau0 - target) * r * (1 - r ** k) / (1 - r)
+
+        free = steps  # pas avant que tau_c n'atteigne le plafond
+        if target > 10:
+            if tau0 >= 10 or r == 0:
+                free = 0
+            else:  # premier k tel que E + rᵏ(tau_0 − E) ≥ 10
+                first = int(np.ceil(np.log((target - 10) / (target - tau0)) / np.log(r)))
+                free = min(max(first - 1, 0), steps)
+        total = geometric_sum(free) + 10.0 * (steps - free)
+        tau_n = 10.0 if free < steps else target + r ** steps * (tau0 - target)
+        tau_1 = min(target + r * (tau0 - target), 10.0)
+
+        c = self.coupling(t)
+        x0 = float(self.state)
+        x = x0 + h * (steps * c - total)
+        if (c - tau_1) * (c - tau_n) < 0:
+            return False
+        self.tau_c = float(np.clip(tau_n, 0.0, 10.0))
+        self.coherence_score = 1.0 / (1.0 + abs(tau_in - self.tau_c))
+        self.is_over_threshold = (self.tau_c > theta_C and self.coherence_score < 0.4)
+        self.last_output = -self.tau_c
+        self.state = float(np.clip(x, -10, 10))
+        return True
+
     def inject_tau_in(self, value: float):
         self.params["tau_in"] = value
 
@@ -16,8 +16,8 @@ class EchoFuse(LyraModule):
         self.resonance_sum = 0.0  # reset à chaque cycle
 
         for j, (rho, delta, gfunc) in self.neighbors.items():
-            # signal du voisin j à t - delta
-            delayed_input = self.input_cache.get((j, t - delta), None)
+            # signal du voisin j à t - delta, lu dans son historique
+            delayed_input = self.read_input(j, t - delta)
             if delayed_input is None:
                 continue
             modulated = rho * np.exp(-delta) * gfunc(delayed_input)
@@ -25,6 +25,22 @@ class EchoFuse(LyraModule):
 
         return -alpha * self.state + self.resonance_sum
 
+    def jump(self, t: float, steps: int, dt: float, exact: bool = False) -> bool:
+        """Résonance amortie à entrées figées : x → x* = F/α, F = résonance + couplage.
+
+        Euler : x_n = x* + (1 − α·dt)ⁿ(x₀ − x*) ; exact : x* + e^(−α·n·dt)(x₀ − x*).
+        La convergence est monotone : le passage par les bornes ±10 reste exact.
+        """
+        alpha = self.params.get("alpha", 0.2)
+        r = 1.0 - alpha * dt
+        if alpha <= 0 or (not exact and not 0 <= r < 1):
+            return False
+        self.intrinsic(t)  # recalcule resonance_sum aux entrées courantes
+        target = (self.resonance_sum + self.coupling(t)) / alpha
+        decay = np.exp(-alpha * steps * dt) if exact else r ** steps
+        self.state = float(np.clip(target + decay * (float(self.state) - target), -10, 10))
+        return True
+
     def get_status(self) -> dict:
         """Retourne l’état du module pour l’orchestrateur"""
         return {
@@ -1,7 +1,14 @@
 # lyra/modules/journal.py
 
+import heapq
+import math
+
 from lyra.base import LyraModule
-from sentence_transformers import SentenceTransformer
+from lyra.ann import IVFIndex
+from lyra.encoder import DEFAULT_MODEL, get_encoder
+from lyra.metrics import timed
+from lyra.persistent_store import PersistentVectorStore
+from lyra.vector_store import VectorStore
 import numpy as np
 
 class JournalOubli(LyraModule):
@@ -10,15 +17,75 @@ class JournalOubli(LyraModule):
     • Chaque signal stocke : (timestamp, value, vector, meta)
     • Double indexation : texte lisible (meta['text_form']) + vecteur
     • Le vecteur reste auxiliaire : aucune logique centrale ne dépend de la similarité
+    • Traces rangées en colonnes (`VectorStore`) : décroissance et recherche vectorisées
+    • params["ann"] = {...} : index IVF approché (ex. {"nprobe": 8}) pour les longues mémoires
+    • params["persist_dir"] : traces persistées sur disque et rouvertes au redémarrage
+
+    Évaporation paresseuse : une trace garde sa valeur de capture v0 et vaut
+    v0·exp(−λ(t − t0)) quand on la lit. L'état (somme des traces, λ commun) est
+    tenu à jour incrémentalement ; un tas des instants de passage sous le seuil
+    retire les traces oubliées. Un pas coûte O(nouvelles traces + oublis).
+
+    Entrées figées, la mémoire atteint un régime où chaque pas ne fait que la
+    décaler de dt (même capture ajoutée, plus ancienne retirée) : `jump` y saute
+    n pas en décalant les instants des traces.
     """
 
     def __init__(self, name, params, neighbors=None):
         super().__init__(name, params, neighbors)
-        self.memory = []  # [(timestamp, value, vector, meta)]
+        ann = self.params.get("ann")
+        index = IVFIndex(**ann) if ann is not None else None
+        persist_dir = self.params.get("persist_dir")
+        self.store = PersistentVectorStore(persist_dir, index=index) if persist_dir else VectorStore(index=index)
         self.decay_lambda = self.params.get("lambda", 0.5)
         self.threshold = self.params.get("threshold", 0.01)
         self.max_length = self.params.get("max_length", 100)
-        self.encoder = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+        self.encoder = get_encoder(self.params.get("encoder_model", DEFAULT_MODEL))
+        self._expiry = []  # tas de (instant d'oubli, id de trace)
+        self._anchor = 0.0  # instant auquel `state` est exprimé
+        if len(self.store):
+            self._restore()
+
+    def _restore(self):
+        """Reconstruit l'état et le tas d'oubli depuis les traces rouvertes."""
+        store = self.store
+        rows = store.live_rows()
+        self._anchor = float(store.times[rows[-1]])
+        self.state = float(self._values(rows).sum())
+        if self.decay_lambda > 0 and self.threshold > 0:
+            expires = store.times[rows] + np.log(np.abs(store.values[rows]) / self.threshold) / self.decay_lambda
+            self._expiry = list(zip(expires.tolist(), store.ids[rows].tolist()))
+            heapq.heapify(self._expiry)
+
+    @property
+    def resume_time(self) -> float:
+        """Instant de la dernière capture rouverte (0 pour une mémoire neuve)."""
+        return self._anchor
+
+    @property
+    def memory(self):
+        """Vue compatible : [(timestamp, value, vector, meta)] dans l'ordre d'insertion."""
+        rows = self.store.live_rows()
+        values = self._values(rows)
+        return [(float(self.store.times[i]), float(v), self.store.vector(i), self.store.meta[i])
+                for i, v in zip(rows, values)]
+
+    def _values(self, rows):
+        """Valeurs courantes (à l'instant d'ancrage) des lignes `rows`."""
+        store = self.store
+        return store.values[rows] * np.exp(-self.decay_lambda * (self._anchor - store.times[rows]))
+
+    def _expires_at(self, t0: float, value: float) -> float:
+        """Instant où |value|·exp(−λ(t − t0)) repasse sous le seuil."""
+        if self.decay_lambda <= 0 or self.threshold <= 0:
+            return math.inf
+        return t0 + math.log(abs(value) / self.threshold) / self.decay_lambda
+
+    def _forget(self, rows):
+        self.state -= float(self._values(rows).sum())
+        self.store.delete(self.store.ids[rows])
+        if not len(self.store):
+            self.state = 0.0  # plus de trace : on efface la dérive d'arrondi
 
     # ---------------------------------------------------------------------
     # Dynamiques principales
@@ -28,29 +95,86 @@ class JournalOubli(LyraModule):
 
     def step(self, t: float, ext_inputs: dict) -> float:
         """Met à jour la mémoire (décroissance + capture de nouveaux signaux)."""
-        # 1. Décroissance exponentielle
-        decayed = []
-        for timestamp, value, vector, meta in self.memory:
-            age = t - timestamp
-            new_value = value * np.exp(-self.decay_lambda * age)
-            if abs(new_value) > self.threshold:
-                decayed.append((timestamp, new_value, vector, meta))
-        self.memory = decayed[-self.max_length:]
+        self.ext_inputs = ext_inputs
+        self.record(t)
+        store = self.store
+
+        # 1. Décroissance exponentielle : réancrage de la somme, puis oubli
+        with timed("journal.decay"):
+            self.state *= math.exp(-self.decay_lambda * (t - self._anchor))
+            self._anchor = t
+            while self._expiry and self._expiry[0][0] <= t:
+                _, trace_id = heapq.heappop(self._expiry)
+                row = store.row(trace_id)
+                if row >= 0:
+                    self._forget([row])
+            excess = len(store) - self.max_length
+            if excess > 0:
+                self._forget(store.live_rows()[:excess])
 
         # 2. Capture des signaux entrants depuis les voisins
+        for j, signal in self._signals(t, ext_inputs):
+            text_form = self.trace_text(j, signal)
+            vector = self.encoder.encode(text_form)
+            meta = {"source": j, "text_form": text_form}
+            trace_id = store.add(t, signal, vector, meta)
+            self.state += float(signal)
+            expires = self._expires_at(t, signal)
+            if expires < math.inf:
+                heapq.heappush(self._expiry, (expires, trace_id))
+
+        return self.state
+
+    def _signals(self, t: float, ext_inputs: dict):
+        """Signaux captés au temps t : [(source, signal)] au‑dessus du seuil."""
+        signals = []
         for j, (rho, delta, gfunc) in self.neighbors.items():
             if j not in ext_inputs:
                 continue
             delayed_input = ext_inputs[j](t - delta)
             signal = rho * gfunc(delayed_input)
             if abs(signal) > self.threshold:
-                text_form = f"{self.name}:{j}:{signal:.3f}"
-                vector = self.encoder.encode(text_form)
-                meta = {"source": j, "text_form": text_form}
-                self.memory.append((t, signal, vector, meta))
+                signals.append((j, signal))
+        return signals
 
-        self.state = sum(v for (_, v, _, _) in self.memory)
-        return self.state
+    def steady(self, t: float, dt: float) -> bool:
+        """Vrai si les pas à t, t + dt…, entrées figées, ne font que décaler la mémoire.
+
+        Mémoire vide sans capture, ou faite des seules captures successives (pas dt)
+        du signal courant, dont la plus ancienne sort au prochain pas (longueur
+        maximale ou passage sous le seuil).
+        """
+        signals = self._signals(t, self.ext_inputs)
+        store = self.store
+        if not len(store):
+            return not signals
+        if len(signals) != 1:
+            return False
+        signal = signals[0][1]
+        rows = store.live_rows()
+        oldest, newest = rows[0], rows[-1]
+        if store.values[oldest] != signal or store.times[newest] != self._anchor:
+            return False
+        if len(rows) <= self.max_length and self._expires_at(store.times[oldest], signal) > t:
+            return False
+        gaps = np.diff(np.append(store.times[rows], t))
+        return bool(np.all(store.values[rows] == signal)
+                    and np.abs(gaps - dt).max() <= 1e-9 * max(1.0, abs(t)))
+
+    def jump(self, t: float, steps: int, dt: float, exact: bool = False) -> bool:
+        """En régime (`steady`), n pas reviennent à décaler traces et échéances de n·dt."""
+        if not self.steady(t, dt):
+            return False
+        if len(self.store):
+            offset = steps * dt
+            self.store.shift_times(offset)
+            self._expiry = [(expires + offset, trace_id) for expires, trace_id in self._expiry]
+            self._anchor += offset
+        return True
+
+    def trace_text(self, source: str, signal: float) -> str:
+        """Forme texte (encodée) d'une trace captée depuis `source`."""
+        return f"{self.name}:{source}:{signal:.3f}"
 
     # ---------------------------------------------------------------------
     # Interfaces externes
@@ -66,22 +190,42 @@ class JournalOubli(LyraModule):
         • Utilise une similarité cosinus simple (0..1).
         • Retour : [(timestamp, value, meta, score)] triés décroissant.
         """
-        if not self.memory:
+        if not len(self.store):
             return []
-        q_vec = self.encoder.encode(text)
-        if np.linalg.norm(q_vec) == 0:
-            return []
-        sims = []
-        for timestamp, value, vec, meta in self.memory:
-            denom = (np.linalg.norm(q_vec) * np.linalg.norm(vec)) or 1e-8
-            score = float(np.dot(q_vec, vec) / denom)
-            sims.append((timestamp, value, meta, score))
-        sims.sort(key=lambda x: x[3], reverse=True)
-        return sims[:top_k]
+        return self.query_vector(self.encode_query(text), top_k)
+
+    def query_similar_many(self, texts, top_k: int = 5):
+        """`query_similar` pour plusieurs textes : un lot d'encodage, un produit matriciel."""
+        if not len(self.store) or not texts:
+            return [[] for _ in texts]
+        return self.query_vectors(self.encoder.encode(list(texts)), top_k)
+
+    def encode_query(self, text: str):
+        """Vecteur de requête pour `query_vector` (calculable à l'avance)."""
+        return self.encoder.encode(text)
+
+    def query_vector(self, q_vec, top_k: int = 5):
+        """Comme `query_similar`, à partir d'un vecteur déjà encodé."""
+        return self.query_vectors(np.asarray(q_vec)[None, :], top_k)[0]
+
+    def query_vectors(self, q_vecs, top_k: int = 5):
+        """Comme `query_vector`, pour une matrice de requêtes (une liste de résultats par ligne)."""
+        q_vecs = np.atleast_2d(q_vecs)
+        if not len(self.store):
+            return [[] for _ in q_vecs]
+        store = self.store
+        indices, scores = store.search_many(q_vecs, top_k)
+        empty = np.linalg.norm(q_vecs, axis=1) == 0
+        return [
+            [] if empty[b] else
+            [(float(store.times[i]), float(self._values(i)), store.meta[i], float(s))
+             for i, s in zip(indices[b], scores[b]) if i >= 0]
+            for b in range(len(q_vecs))
+        ]
 
     def get_status(self):
         return {
             "module": self.name,
-            "active_traces": len(self.memory),
+            "active_traces": len(self.store),
             "state": self.state
         }
@@ -1,27 +1,35 @@
 # lyra/modules/llm_bridge.py
-"""AutoGenesisCoreLLM – passerelle OpenAI pour Lyra.
+"""AutoGenesisCoreLLM – passerelle LLM pour Lyra.
 
-- Charge la clé via variable d'environnement `OPENAI_API_KEY` ou via `lyra.config.OPENAI_API_KEY`.
+- Délègue les appels à un backend interchangeable (`lyra.llm_backends`) :
+  API OpenAI en HTTP (pool, délais, relances, débit borné) ou stub local.
+- La clé est lue par le backend : `OPENAI_API_KEY` ou `lyra.config.OPENAI_API_KEY`.
 - Utilise `OPENAI_MODEL` comme modèle par défaut (configurable).
 - Convertit la longueur (tokens) de la réponse en un signal numérique `state` ∈ [0, 1].
   (simple mais suffisant pour pilotage initial ; pourra être raffiné plus tard.)
+- `aprompt_llm` : variante asynchrone (client async) qui ne bloque pas la boucle d'événements.
+- `astream_llm` : génère les fragments de la réponse au fur et à mesure (stream=True).
+- Cache de complétions facultatif (`lyra.completion_cache`) : réponses identiques
+  servies sans appel amont, appels concurrents identiques regroupés en un seul.
 - Aucune dépendance circulaire.
 """
 
-import os, openai
+from typing import AsyncIterator
 from lyra.base import LyraModule
-from lyra.config import OPENAI_API_KEY, OPENAI_MODEL
-
-# Initialise la clé – priorité à la variable d'environnement (plus sûre)
-openai.api_key = os.getenv("OPENAI_API_KEY", OPENAI_API_KEY)
+from lyra.completion_cache import completion_key, get_completion_cache
+from lyra.config import OPENAI_MODEL
+from lyra.llm_backends import LLMError, get_backend
+from lyra.metrics import LLM_ERRORS, timed
 
 class AutoGenesisCoreLLM(LyraModule):
-    """Module génératif branché sur l'API OpenAI."""
+    """Module génératif branché sur un backend LLM (OpenAI par défaut)."""
 
     def __init__(self, name: str, params: dict | None = None, neighbors: dict | None = None):
         params = params or {}
         super().__init__(name, params, neighbors)
         self.model = params.get("model", OPENAI_MODEL)
+        self.backend = params.get("backend") or get_backend()
+        self.cache = params.get("cache", get_completion_cache())
         self.last_text: str = ""
 
     # ------------------------------------------------------------------
@@ -30,8 +38,50 @@ class AutoGenesisCoreLLM(LyraModule):
         return 0.0
 
     # ------------------------------------------------------------------
+    def _request(self, user_prompt: str) -> dict:
+        return dict(
+            model=self.model,
+            messages=[{"role": "user", "content": user_prompt}],
+            temperature=0.8,
+            max_tokens=150,
+        )
+
+    def _complete(self, request: dict) -> str:
+        with timed("llm"):
+            try:
+                if self.cache is None:
+                    return self.backend.complete(request)
+                return self.cache.get_or_call(completion_key(request), lambda: self.backend.complete(request))
+            except LLMError:
+                LLM_ERRORS.inc()
+                raise
+
+    async def _acomplete(self, request: dict) -> str:
+        with timed("llm"):
+            try:
+                if self.cache is None:
+                    return await self.backend.acomplete(request)
+                return await self.cache.aget_or_call(completion_key(request), lambda: self.backend.acomplete(request))
+            except LLMError:
+                LLM_ERRORS.inc()
+                raise
+
+    @staticmethod
+    def reply_state(text: str) -> float:
+        """Amplitude associée à une réponse : proportionnelle à la longueur (soft capped)."""
+        return min(len(text.strip()) / 200.0, 1.0)
+
+    def apply_reply(self, text: str):
+        """Enregistre une réponse du modèle et met à jour self.state."""
+        self.last_text = text.strip()
+        self.state = self.reply_state(self.last_text)
+
+    async def agenerate(self, user_prompt: str) -> str:
+        """Texte de la réponse, sans toucher à l'état (lève LLMError en cas d'échec)."""
+        return await self._acomplete(self._request(user_prompt.strip()))
+
     def prompt_llm(self, user_prompt: str):
-        """Interroge le modèle OpenAI, met à jour self.state.
+        """Interroge le modèle, met à jour self.state.
 
         `state` est mappé sur [0,1] via len(text)/max_len.
         """
@@ -40,21 +90,66 @@ class AutoGenesisCoreLLM(LyraModule):
             return
 
         try:
-            resp = openai.ChatCompletion.create(
-                model=self.model,
-                messages=[{"role": "user", "content": user_prompt}],
-                temperature=0.8,
-                max_tokens=150,
-            )
-        except openai.error.OpenAIError as exc:
+            text = self._complete(self._request(user_prompt))
+        except LLMError as exc:
             # logge l'erreur ; garde l'état précédent
-            self.last_text = f"[OpenAIError] {exc}"
+            self.last_text = f"[LLMError] {exc}"
+            return
+
+        self.apply_reply(text)
+
+    async def aprompt_llm(self, user_prompt: str):
+        """Comme `prompt_llm`, via le client asynchrone (aucun blocage de la boucle)."""
+        user_prompt = user_prompt.strip()
+        if not user_prompt:
+            return
+
+        try:
+            text = await self._acomplete(self._request(user_prompt))
+        except LLMError as exc:
+            self.last_text = f"[LLMError] {exc}"
+            return
+
+        self.apply_reply(text)
+
+    async def astream_llm(self, user_prompt: str) -> AsyncIterator[str]:
+        """Produit les fragments de la réponse dès leur arrivée.
+
+        `state` passe à 1.0 dès que le texte reçu atteint la saturation
+        (voir `state_settled`), puis est fixé définitivement en fin de flux.
+        """
+        user_prompt = user_prompt.strip()
+        if not user_prompt:
+            return
+
+        request = self._request(user_prompt)
+        cached = self.cache.lookup(completion_key(request)) if self.cache is not None else None
+        if cached is not None:
+            self.apply_reply(cached)
+            yield cached
+            return
+
+        received = ""
+        try:
+            async for piece in self.backend.astream(request):
+                received += piece
+                if self.state != 1.0 and self.state_settled(received):
+                    self.state = 1.0
+                yield piece
+        except LLMError as exc:
+            LLM_ERRORS.inc()
+            self.last_text = f"[LLMError] {exc}"
+            yield self.last_text
             return
 
-        self.last_text = resp.choices[0].message.content.strip()
+        if self.cache is not None:
+            self.cache.put(completion_key(request), received)
+        self.apply_reply(received)
 
-        # mapping : amplitude proportionnelle à la longueur (soft capped)
-        self.state = min(len(self.last_text) / 200.0, 1.0)
+    @staticmethod
+    def state_settled(received: str) -> bool:
+        """Vrai si l'état final est déjà déterminé par le début de la réponse."""
+        return len(received.strip()) >= 200
 
     # ------------------------------------------------------------------
     def get_last_text(self) -> str:
@@ -1,10 +1,21 @@
 # lyra/modules/noyau_emotionnel.py
-"""Noyau émotionnel et composantes contextuelles pour Lyra (v1.1).
+"""Noyau émotionnel et composantes contextuelles pour Lyra (v1.2).
    ContexteDynamique now has default arguments for tonalite, themes, interdits, ressources.
+   v1.2 : la stylisation peut s'appliquer au fil d'un flux de fragments (FluxStylise).
+   v1.3 : émotions, thèmes et interdits sont détectés par un lexique compilé
+          (lyra.lexicon), en un seul passage sur le texte ; lexiques chargeables
+          depuis un fichier.
+   v1.4 : historiques bornés (anneaux `deque`) : `journal` garde les
+          `taille_journal` dernières entrées, `MemoireContextuelle` ses
+          `taille_max` derniers fragments. La trace complète va au flux
+          d'événements (lyra.events).
 """
 
+from collections import deque
 from datetime import datetime
-from typing import List, Dict
+from typing import Callable, List, Dict, Sequence, Tuple
+
+from lyra.lexicon import Lexicon
 
 # ----------------------------------------------------------------------
 class ContexteDynamique:
@@ -12,18 +23,47 @@ class ContexteDynamique:
                  themes: List[str] | None = None,
                  interdits: List[str] | None = None,
                  ressources: List[str] | None = None):
+        self._lexique: Lexicon | None = None
         self.objectif = objectif
         self.tonalite = tonalite
-        self.themes = themes or []
-        self.interdits = interdits or []
+        self.themes = themes or ()
+        self.interdits = interdits or ()
         self.ressources = ressources or []
 
+    @property
+    def themes(self) -> Tuple[str, ...]:
+        return self._themes
+
+    @themes.setter
+    def themes(self, termes: Sequence[str]):
+        self._themes = tuple(termes)  # copie figée : le lexique compilé reste à jour
+        self._lexique = None
+
+    @property
+    def interdits(self) -> Tuple[str, ...]:
+        return self._interdits
+
+    @interdits.setter
+    def interdits(self, termes: Sequence[str]):
+        self._interdits = tuple(termes)
+        self._lexique = None
+
+    def charger(self, chemin: str):
+        """Ajoute les termes étiquetés « theme » et « interdit » d'un fichier de lexique."""
+        lexique = Lexicon.from_file(chemin)
+        self.themes = (*self.themes, *lexique.terms("theme"))
+        self.interdits = (*self.interdits, *lexique.terms("interdit"))
+
+    def lexique(self) -> Lexicon:
+        """Thèmes et interdits compilés, recompilés à chaque affectation de `themes` ou `interdits`."""
+        if self._lexique is None:
+            self._lexique = Lexicon({"theme": self._themes, "interdit": self._interdits})
+        return self._lexique
+
     def analyser(self, message: str) -> List[str]:
-        deviations = []
-        for interdit in self.interdits:
-            if interdit.lower() in message.lower():
-                deviations.append(f"Contient un interdit : {interdit}")
-        if self.themes and not any(t.lower() in message.lower() for t in self.themes):
+        trouves = self.lexique().matches(message)
+        deviations = [f"Contient un interdit : {interdit}" for interdit in trouves.get("interdit", [])]
+        if self.themes and "theme" not in trouves:
             deviations.append("Ne correspond pas aux thèmes principaux.")
         return deviations
 
@@ -31,13 +71,11 @@ class ContexteDynamique:
 class MemoireContextuelle:
     def __init__(self, noyau: "NoyauEmotionnel", taille_max: int = 10):
         self.noyau = noyau
-        self.traces: List[tuple[datetime, str]] = []
+        self.traces: deque[tuple[datetime, str]] = deque(maxlen=taille_max)
         self.taille_max = taille_max
 
     def enregistrer(self, fragment: str):
         self.traces.append((datetime.now(), fragment))
-        if len(self.traces) > self.taille_max:
-            self.traces.pop(0)
 
     def introspecter(self) -> str:
         etat = "\n".join(f"  - {k}: {round(v, 2)}" for k, v in self.noyau.etats.items())
@@ -45,8 +83,77 @@ class MemoireContextuelle:
         return f"=== État actuel ===\n{etat}\n=== Fragments récents ===\n{recent}"
 
 # ----------------------------------------------------------------------
+# Couches de style : (préfixe, transformation, suffixe) ou troncature.
+# La sortie d'une couche est l'entrée de la suivante ; les préfixes et suffixes
+# d'une couche traversent donc les transformations des couches extérieures.
+_identite: Callable[[str], str] = lambda s: s
+_ENROBAGES: Dict[str, Tuple[str, Callable[[str], str], str]] = {
+    "douceur": ("~ ", str.lower, " ~"),
+    "sarcasme": ("Oh, super. ", _identite, " (vraiment.)"),
+    "colere": ("[", str.upper, "...]"),
+    "melancolie": ("(soupir) ", _identite, "..."),
+    "joie": ("!!! ", str.upper, " !!!"),
+    "absurde": ("", _identite, " 💥 avec des nouilles mentales."),
+}
+_TRONCATURE = ("minimalisme", 20, "…")
+
+
+class FluxStylise:
+    """Stylisation incrémentale : ouvrir(), pousser(fragment)*, fermer().
+
+    La concaténation des sorties est identique à `NoyauEmotionnel._styliser`
+    appliqué au message complet.
+    """
+
+    def __init__(self, couches: List[tuple]):
+        self.couches = couches
+        self._budgets = [c[1] if c[0] == "tronquer" else None for c in couches]
+
+    def _propager(self, k: int, texte: str) -> str:
+        for i in range(k, len(self.couches)):
+            if not texte:
+                break
+            couche = self.couches[i]
+            if couche[0] == "tronquer":
+                texte = texte[: self._budgets[i]]
+                self._budgets[i] -= len(texte)
+            else:
+                texte = couche[2](texte)
+        return texte
+
+    def ouvrir(self) -> str:
+        sortie = ""
+        for k in range(len(self.couches) - 1, -1, -1):
+            if self.couches[k][0] == "enrober":
+                sortie += self._propager(k + 1, self.couches[k][1])
+        return sortie
+
+    def pousser(self, fragment: str) -> str:
+        return self._propager(0, fragment)
+
+    def fermer(self) -> str:
+        sortie = ""
+        for k, couche in enumerate(self.couches):
+            suffixe = couche[3] if couche[0] == "enrober" else couche[2]
+            sortie += self._propager(k + 1, suffixe)
+        return sortie
+
+
+# ----------------------------------------------------------------------
+# Lexique émotionnel par défaut ; NoyauEmotionnel(lexique=...) accepte un
+# Lexicon ou le chemin d'un fichier de lexique (étiquette = émotion).
+LEXIQUE_EMOTIONS = Lexicon({
+    "colere": ["nul", "idiot", "inutile"],
+    "melancolie": ["vide", "triste", "fatigué"],
+    "joie": ["génial", "super", "youpi"],
+    "absurde": ["absurde", "nonsense", "bizarre"],
+    "douceur": ["merci", "joli", "tendresse"],
+})
+
+
 class NoyauEmotionnel:
-    def __init__(self, sensibilite: float = 0.5, contexte: ContexteDynamique | None = None):
+    def __init__(self, sensibilite: float = 0.5, contexte: ContexteDynamique | None = None,
+                 lexique: Lexicon | str | None = None, taille_journal: int = 1000):
         self.etats: Dict[str, float] = {
             "douceur": 0.3,
             "sarcasme": 0.1,
@@ -58,7 +165,8 @@ class NoyauEmotionnel:
         }
         self.sensibilite = sensibilite
         self.contexte = contexte
-        self.journal: List[str] = []
+        self.lexique = Lexicon.from_file(lexique) if isinstance(lexique, str) else (lexique or LEXIQUE_EMOTIONS)
+        self.journal: deque[str] = deque(maxlen=taille_journal)
         self.memoire = MemoireContextuelle(self)
 
     def ajuster(self, emotion: str, valeur: float):
@@ -75,16 +183,8 @@ class NoyauEmotionnel:
 
     def reagir(self, fragment: str):
         self.memoire.enregistrer(fragment)
-        contenu = fragment.lower()
-        mots = {
-            "colere": ["nul", "idiot", "inutile"],
-            "melancolie": ["vide", "triste", "fatigué"],
-            "joie": ["génial", "super", "youpi"],
-            "absurde": ["absurde", "nonsense", "bizarre"],
-            "douceur": ["merci", "joli", "tendresse"],
-        }
-        for emo, liste in mots.items():
-            if any(m in contenu for m in liste):
+        for emo in self.lexique.labels(fragment):
+            if emo in self.etats:
                 self.etats[emo] += 0.2 * self.sensibilite
         self._normaliser()
 
@@ -98,28 +198,27 @@ class NoyauEmotionnel:
             critiques.append("Fragment trop court.")
         return critiques
 
-    def _styliser(self, message: str) -> str:
+    def _couches_style(self) -> List[tuple]:
+        """Couches de style dominantes, de la plus intérieure à la plus extérieure."""
         poids = self.etats.copy()
         total = sum(poids.values()) or 1.0
-        rendu = message
+        couches = []
         for emo, part in sorted(poids.items(), key=lambda x: -x[1]):
             if part / total < 0.1:
                 continue
-            if emo == "douceur":
-                rendu = f"~ {rendu.lower()} ~"
-            elif emo == "sarcasme":
-                rendu = f"Oh, super. {rendu} (vraiment.)"
-            elif emo == "colere":
-                rendu = f"[{rendu.upper()}...]"
-            elif emo == "melancolie":
-                rendu = f"(soupir) {rendu}..."
-            elif emo == "joie":
-                rendu = f"!!! {rendu.upper()} !!!"
-            elif emo == "absurde":
-                rendu = f"{rendu} 💥 avec des nouilles mentales."
-            elif emo == "minimalisme":
-                rendu = f"{rendu[:20]}…"
-        return rendu
+            if emo in _ENROBAGES:
+                couches.append(("enrober",) + _ENROBAGES[emo])
+            elif emo == _TRONCATURE[0]:
+                couches.append(("tronquer",) + _TRONCATURE[1:])
+        return couches
+
+    def flux_style(self) -> FluxStylise:
+        """Stylisation au fil de l'eau, figée sur les états émotionnels actuels."""
+        return FluxStylise(self._couches_style())
+
+    def _styliser(self, message: str) -> str:
+        flux = self.flux_style()
+        return flux.ouvrir() + flux.pousser(message) + flux.fermer()
 
     def exprimer(self, message: str) -> str:
         critiques = self._evaluer(message)
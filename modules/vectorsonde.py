@@ -1,7 +1,10 @@
 # lyra/modules/vectorsonde.py
 
 from lyra.base import LyraModule
-from sentence_transformers import SentenceTransformer
+from lyra.ann import IVFIndex
+from lyra.encoder import DEFAULT_MODEL, get_encoder
+from lyra.persistent_store import PersistentVectorStore
+from lyra.vector_store import VectorStore
 import numpy as np
 
 class VectorSonde(LyraModule):
@@ -9,10 +12,18 @@ class VectorSonde(LyraModule):
 
     def __init__(self, name, params, neighbors=None):
         super().__init__(name, params, neighbors)
-        self.encoder = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
-        self.vectors = []  # [(timestamp, vector, metadata)]
+        self.encoder = get_encoder(self.params.get("encoder_model", DEFAULT_MODEL))
+        ann = self.params.get("ann")  # ex. {"nprobe": 8} : recherche approchée (IVF)
+        index = IVFIndex(**ann) if ann is not None else None
+        persist_dir = self.params.get("persist_dir")  # mémoire rouverte au redémarrage
+        self.store = PersistentVectorStore(persist_dir, index=index) if persist_dir else VectorStore(index=index)
         self.max_length = self.params.get("max_length", 100)
 
+    @property
+    def vectors(self):
+        """Vue compatible : [(timestamp, vector, metadata)]."""
+        return [(t, vec, meta) for (t, _v, vec, meta) in self.store.rows()]
+
     def intrinsic(self, t: float) -> float:
         """Pas de dynamique intrinsèque : mémoire vectorielle passive."""
         return 0.0
@@ -20,21 +31,24 @@ class VectorSonde(LyraModule):
     def encode_and_store(self, t: float, text: str, meta=None):
         """Encode un texte et le stocke avec timestamp et métadonnées."""
         vec = self.encoder.encode(text)
-        self.vectors.append((t, vec, meta))
-        self.vectors = self.vectors[-self.max_length:]
+        self.store.add(t, 0.0, vec, meta)
+        self.store.keep_last(self.max_length)
 
     def query(self, text: str, top_k=5):
         """Interroge la mémoire par similarité vectorielle."""
-        if not self.vectors:
-            return []
-        query_vec = self.encoder.encode(text)
-        similarities = [(t, meta, np.dot(query_vec, v) / (np.linalg.norm(query_vec) * np.linalg.norm(v)))
-                        for (t, v, meta) in self.vectors]
-        similarities.sort(key=lambda x: x[2], reverse=True)
-        return similarities[:top_k]
+        return self.query_many([text], top_k)[0]
+
+    def query_many(self, texts, top_k=5):
+        """Interroge la mémoire pour plusieurs textes en un seul produit matriciel."""
+        if not len(self.store) or not texts:
+            return [[] for _ in texts]
+        indices, scores = self.store.search_many(np.atleast_2d(self.encoder.encode(list(texts))), top_k)
+        store = self.store
+        return [[(float(store.times[i]), store.meta[i], float(s)) for i, s in zip(row, row_scores) if i >= 0]
+                for row, row_scores in zip(indices, scores)]
 
     def get_status(self):
         return {
             "module": self.name,
-            "stored_vectors": len(self.vectors)
+            "stored_vectors": len(self.store)
         }
@@ -0,0 +1,413 @@
+"""LyraNetwork — moteur vectorisé pour réseaux de LyraModule.
+
+Compile un ensemble de modules et leurs arêtes (rho, delta, gfunc) en :
+    • un vecteur d'état `x` (chaque module y est lié : `module.state` lit/écrit x),
+    • une matrice de couplage creuse au format COO (dst, src, rho),
+    • des fonctions de transfert groupées : un appel vectorisé par gfunc distincte,
+    • une ligne à retard commune (`DelayLine`, une colonne par module) pour t − δ.
+
+Un pas reproduit les trajectoires du chemin module par module (`LyraModule.step`
+appelé dans l'ordre) : les modules sont répartis en étages tels que chacun voit
+l'état déjà mis à jour des modules qui le précèdent et l'état ancien de ceux qui
+le suivent. Les modules sans `intrinsic_batch` sont évalués un par un, ceux qui
+redéfinissent `step` (ex. JournalOubli) sont appelés tels quels, seuls dans leur étage.
+
+Intégrateur au choix (`lyra.integrators`) : "euler" (défaut, le pas de
+`LyraModule.step`), "rk4" ou "adaptive" (Dormand–Prince, sous‑pas contrôlés).
+Pour rk4/adaptive, un étage est intégré comme un système : ses membres se
+voient mutuellement aux états intermédiaires, le reste du réseau est figé ; un
+module à `intrinsic` avec état propre (CRITRIX) n'est évalué qu'une fois par pas.
+
+`advance(t, until_t)` enchaîne les pas d'un intervalle en un appel : saut en
+forme close pour les modules qui en ont une (`LyraModule.jump`), intégration
+adaptative d'un seul tenant, sinon pas successifs.
+
+Les paramètres (dt, batch_params) sont lus à la compilation ; `invalidate()` force
+une recompilation, automatique dès qu'un `add_neighbor` modifie la topologie.
+"""
+
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from lyra.base import LyraModule
+from lyra.delay import DelayLine, capacity_for
+from lyra.integrators import INTEGRATORS, STEPPERS, Adaptive
+
+
+def vectorize_gfunc(gfunc: Callable) -> Callable[[np.ndarray], np.ndarray]:
+    """Retourne une version de `gfunc` applicable à un tableau 1‑D.
+
+    `gfunc` est conservée telle quelle si elle accepte déjà les tableaux avec la
+    même sémantique que sur scalaires ; sinon elle est enveloppée (frompyfunc).
+    """
+    if getattr(gfunc, "ufunc_safe", False):  # bibliothèque lyra.transfer_functions
+        return gfunc
+    probe = np.array([-2.0, -0.5, 0.0, 0.25, 0.75, 3.0])
+    try:
+        with np.errstate(all="ignore"):
+            out = np.asarray(gfunc(probe), dtype=float)
+            ref = np.array([gfunc(v) for v in probe], dtype=float)
+        if out.shape == probe.shape and np.allclose(out, ref, equal_nan=True):
+            return gfunc
+    except (TypeError, ValueError):
+        pass
+    ufunc = np.frompyfunc(gfunc, 1, 1)
+    return lambda x: ufunc(x).astype(float)
+
+
+class _Stage:
+    """Groupe de modules intégrés simultanément (aucune dépendance interne)."""
+
+    def __init__(self, net: "LyraNetwork", members: List[LyraModule]):
+        self.stepper = None
+        if len(members) == 1 and net._has_custom_step(members[0]):
+            self.stepper = members[0]
+            return
+
+        index = net.index
+        self.idx = np.array([index[m.name] for m in members], dtype=np.intp)
+        self.dt = np.array([m.params.get("dt", 0.1) for m in members], dtype=float)
+        self.adaptive = Adaptive(net.rtol, net.atol) if net.integrator == "adaptive" else None
+        if net.integrator != "euler" and np.ptp(self.dt) > 0:
+            raise ValueError(f"Integrator {net.integrator!r} requires a common dt within a stage")
+
+        # Dynamique propre : groupes vectorisés par classe, sinon appel individuel
+        by_cls: Dict[type, List[int]] = {}
+        self.fallback: List[Tuple[int, LyraModule]] = []
+        for pos, m in enumerate(members):
+            if type(m).intrinsic_batch is not None:
+                by_cls.setdefault(type(m), []).append(pos)
+            else:
+                self.fallback.append((pos, m))
+        self.stateful = [pos for pos, m in self.fallback if m.stateful_intrinsic]
+        self.batches = []
+        for cls, positions in by_cls.items():
+            params = {
+                key: np.array([members[p].params.get(key, default) for p in positions], dtype=float)
+                for key, default in cls.batch_params.items()
+            }
+            self.batches.append((cls.intrinsic_batch, np.array(positions, dtype=np.intp), params))
+
+        # Couplage : arêtes triées par module puis par ordre des voisins
+        dst, src, rho, delta, gfuncs = [], [], [], [], []
+        for pos, m in enumerate(members):
+            for j, (r, d, g) in m.neighbors.items():
+                if j not in index:
+                    continue
+                dst.append(pos)
+                src.append(index[j])
+                rho.append(r)
+                delta.append(d)
+                gfuncs.append(g)
+        self.dst = np.array(dst, dtype=np.intp)
+        self.src = np.array(src, dtype=np.intp)
+        self.rho = np.array(rho, dtype=float)
+        self.delta = np.array(delta, dtype=float)
+        # Arêtes retardées lues dans l'historique ; un module qui se lit lui‑même
+        # le fait après avoir inscrit son état, comme dans LyraModule.step.
+        delayed = self.delta != 0
+        own = self.src == self.idx[self.dst] if len(self.dst) else delayed
+        self.delayed_other = np.nonzero(delayed & ~own)[0]
+        self.delayed_own = np.nonzero(delayed & own)[0]
+        groups: Dict[int, List[int]] = {}
+        for e, g in enumerate(gfuncs):
+            groups.setdefault(id(g), []).append(e)
+        self.groups = [
+            (net._vectorized(gfuncs[edges[0]]), np.array(edges, dtype=np.intp))
+            for edges in groups.values()
+        ]
+
+    def rates(self, net: "LyraNetwork", t: float, xs: np.ndarray, frozen=None,
+              push: bool = False, trial: bool = False) -> np.ndarray:
+        """dx/dt des membres aux états `xs`.
+
+        push : inscrit `xs` dans l'historique (une fois par pas, comme LyraModule.step) ;
+        trial : `xs` est un état d'essai, visible des membres le temps de l'évaluation ;
+        frozen : dérivées déjà évaluées des modules `stateful_intrinsic`.
+        """
+        x = net.x
+        if trial:
+            saved = x[self.idx]
+            x[self.idx] = xs
+        try:
+            dx = np.empty(len(self.idx))
+            for pos, m in self.fallback:
+                dx[pos] = frozen[pos] if frozen is not None and pos in frozen else m.intrinsic(t)
+            inputs = x[self.src]
+            if len(self.delayed_other):
+                inputs[self.delayed_other] = net._read(self.src[self.delayed_other], t - self.delta[self.delayed_other])
+            if push:
+                net.history.push(t, self.idx, xs)
+            if len(self.delayed_own):
+                inputs[self.delayed_own] = net._read(self.src[self.delayed_own], t - self.delta[self.delayed_own])
+            for fn, positions, params in self.batches:
+                dx[positions] = fn(t, xs[positions], params)
+            if len(self.dst):
+                w = np.empty(len(self.dst))
+                for g, edges in self.groups:
+                    w[edges] = g(inputs[edges])
+                w *= self.rho
+                np.add.at(dx, self.dst, w)
+        finally:
+            if trial:
+                x[self.idx] = saved
+        return dx
+
+    def run(self, net: "LyraNetwork", t: float):
+        if self.stepper is not None:
+            self.stepper.step(t, net.ext_inputs)
+            return
+        x = net.x
+        xs = x[self.idx]
+        dx = self.rates(net, t, xs, push=True)
+        if net.integrator == "euler":
+            x[self.idx] = np.clip(xs + dx * self.dt, -10, 10)
+            return
+        frozen = {pos: dx[pos] for pos in self.stateful}
+
+        def f(tt, y):
+            return self.rates(net, tt, y, frozen, trial=True)
+
+        h = float(self.dt[0])
+        if self.adaptive is not None:
+            x[self.idx] = self.adaptive.integrate(f, t, xs, h, k1=dx)
+        else:
+            x[self.idx] = np.clip(STEPPERS[net.integrator](f, t, xs, h, k1=dx), -10, 10)
+
+    def integrate_span(self, net: "LyraNetwork", t: float, span: float):
+        """Intègre les membres de t à t + span d'un seul tenant (intégrateur adaptatif)."""
+        xs = net.x[self.idx]
+        adaptive = self.adaptive or Adaptive(net.rtol, net.atol)
+        net.x[self.idx] = adaptive.integrate(lambda tt, y: self.rates(net, tt, y, trial=True), t, xs, span)
+
+
+class LyraNetwork:
+    """🕸️ Réseau mycélien compilé : un pas = quelques opérations sur tableaux.
+
+    Attributes:
+        modules (dict): {name: LyraModule}, dans l'ordre d'intégration.
+        x (np.ndarray): Vecteur d'état partagé par les modules liés.
+        index (dict): {name: position dans x}.
+        history (DelayLine): États passés, dimensionnés d'après les plus grands délais.
+        integrator (str): "euler", "rk4" ou "adaptive" (tolérances rtol, atol).
+    """
+
+    def __init__(self, modules: Iterable[LyraModule], integrator: str = "euler",
+                 rtol: float = 1e-6, atol: float = 1e-9):
+        if integrator not in INTEGRATORS:
+            raise ValueError(f"Unknown integrator: {integrator!r} (expected one of {INTEGRATORS})")
+        self.integrator = integrator
+        self.rtol = rtol
+        self.atol = atol
+        self.modules: Dict[str, LyraModule] = {}
+        for m in modules:
+            if not isinstance(m, LyraModule):
+                raise ValueError("LyraNetwork only accepts LyraModule instances")
+            if m.name in self.modules:
+                raise ValueError(f"Duplicate module name: {m.name}")
+            if m._network is not None:
+                raise ValueError(f"Module {m.name} is already bound to a network")
+            self.modules[m.name] = m
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.modules)}
+        self.x = np.array([float(m.state) for m in self.modules.values()], dtype=float)
+        self.history = DelayLine(width=len(self.x))
+        self.ext_inputs: Dict[str, Callable[[float], float]] = {
+            name: (lambda t, i=i: self.state_at(i, t)) for name, i in self.index.items()
+        }
+        for i, m in enumerate(self.modules.values()):
+            m._network, m._index = self, i
+            m.ext_inputs = self.ext_inputs
+        self._gfunc_cache: Dict[int, Tuple[Callable, Callable]] = {}
+        self._plans: Dict[Tuple[str, ...], List[_Stage]] = {}
+        self._signature = None
+
+    # ------------------------------------------------------------------
+    # Compilation
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _has_custom_step(m: LyraModule) -> bool:
+        return type(m).step is not LyraModule.step
+
+    def _vectorized(self, gfunc: Callable) -> Callable:
+        cached = self._gfunc_cache.get(id(gfunc))
+        if cached is None or cached[0] is not gfunc:
+            cached = (gfunc, vectorize_gfunc(gfunc))
+            self._gfunc_cache[id(gfunc)] = cached
+        return cached[1]
+
+    def invalidate(self):
+        """Oublie les plans compilés (à appeler après modification des params)."""
+        self._plans.clear()
+        self._signature = None
+
+    def _reserve_history(self):
+        horizon = np.zeros(len(self.x))
+        for m in self.modules.values():
+            for j, (_rho, delta, _g) in m.neighbors.items():
+                if j in self.index:
+                    horizon[self.index[j]] = max(horizon[self.index[j]], delta)
+        capacity = max(
+            (capacity_for(h, m.params.get("dt", 0.1)) for h, m in zip(horizon, self.modules.values())),
+            default=2,
+        )
+        self.history.reserve(capacity)
+
+    def _levels(self, order: Sequence[LyraModule]) -> List[List[LyraModule]]:
+        """Répartit `order` en étages reproduisant la mise à jour séquentielle.
+
+        Pour une arête i ← j : si j précède i, i doit être dans un étage
+        ultérieur ; si j suit i, j ne doit pas être mis à jour avant i.
+        """
+        rank = {m.name: k for k, m in enumerate(order)}
+        readers: Dict[str, List[str]] = {}
+        for m in order:
+            for j in m.neighbors:
+                readers.setdefault(j, []).append(m.name)
+
+        level: Dict[str, int] = {}
+        floor, top = 0, -1
+        for k, m in enumerate(order):
+            if self._has_custom_step(m):
+                lv = top + 1
+                floor = lv + 1
+            else:
+                lv = floor
+                for j in m.neighbors:
+                    if j in level:
+                        lv = max(lv, level[j] + 1)
+                for r in readers.get(m.name, ()):
+                    if rank[r] < k:
+                        lv = max(lv, level[r])
+            level[m.name] = lv
+            top = max(top, lv)
+
+        stages: List[List[LyraModule]] = [[] for _ in range(top + 1)]
+        for m in order:
+            stages[level[m.name]].append(m)
+        return [s for s in stages if s]
+
+    def _plan(self, names: Tuple[str, ...]) -> List[_Stage]:
+        signature = sum(m.topology_version for m in self.modules.values())
+        if signature != self._signature:
+            self._plans.clear()
+            self._signature = signature
+        plan = self._plans.get(names)
+        if plan is None:
+            self._reserve_history()
+            unknown = [n for n in names if n not in self.modules]
+            if unknown:
+                raise ValueError(f"Unknown modules: {unknown}")
+            order = [self.modules[n] for n in names]
+            plan = [_Stage(self, members) for members in self._levels(order)]
+            self._plans[names] = plan
+        return plan
+
+    # ------------------------------------------------------------------
+    # Simulation
+    # ------------------------------------------------------------------
+    def step(self, t: float, names: Sequence[str] | None = None) -> np.ndarray:
+        """Avance d'un pas les modules `names` (tous par défaut), dans cet ordre.
+
+        Les autres modules du réseau restent des sources : lus, jamais intégrés.
+        """
+        key = tuple(names) if names is not None else tuple(self.modules)
+        for stage in self._plan(key):
+            stage.run(self, t)
+        return self.x
+
+    def advance(self, t: float, until_t: float, names: Sequence[str] | None = None) -> float:
+        """Enchaîne les pas des modules `names` de t jusqu'à until_t ; renvoie l'instant suivant.
+
+        Équivaut à step(t), step(t + dt)… pour tous les instants ≤ until_t (dt
+        commun aux modules). Si aucun module intégré n'en lit un autre, chacun
+        saute l'intervalle en forme close quand il le peut (`LyraModule.jump`) ;
+        avec l'intégrateur "adaptive", les autres sont intégrés d'un seul tenant.
+        Le dernier pas reste un pas ordinaire, qui réinscrit l'historique.
+        """
+        key = tuple(names) if names is not None else tuple(self.modules)
+        self._plan(key)
+        dts = {self.modules[n].params.get("dt", 0.1) for n in key}
+        if len(dts) > 1:
+            raise ValueError("advance requires a common dt")
+        dt = dts.pop() if dts else 0.1
+        steps = int(np.floor((until_t - t) / dt + 1e-9))
+        remaining = max(steps, 0)
+        if steps > 1:
+            integrated = set(key)
+            pending = list(key)
+            if not any(integrated & set(self.modules[n].neighbors) for n in key):
+                exact = self.integrator != "euler"
+                pending = [n for n in key if not self.modules[n].jump(t, steps - 1, dt, exact)]
+            if pending and self.integrator == "adaptive" and self._continuous(pending):
+                _Stage(self, [self.modules[n] for n in pending]).integrate_span(self, t, (steps - 1) * dt)
+                pending = []
+            if len(pending) < len(key):
+                skipped = [self.index[n] for n in key if n not in pending]
+                self.history.clear(np.array(skipped, dtype=np.intp))
+                if pending:
+                    for _ in range(steps - 1):
+                        self.step(t, pending)
+                        t += dt
+                else:
+                    t += (steps - 1) * dt
+                remaining = 1
+        for _ in range(remaining):
+            self.step(t, key)
+            t += dt
+        return t
+
+    def _continuous(self, names: Sequence[str]) -> bool:
+        """Vrai si `names` forme un système d'EDO intégrable d'un tenant (sans retard interne)."""
+        for n in names:
+            m = self.modules[n]
+            if self._has_custom_step(m) or m.stateful_intrinsic:
+                return False
+            if any(j in names and delta != 0 for j, (_r, delta, _g) in m.neighbors.items()):
+                return False
+        return True
+
+    def _read(self, cols: np.ndarray, tq: np.ndarray) -> np.ndarray:
+        return self.history.read(cols, tq, self.x[cols])
+
+    def state_at(self, i: int, t: float) -> float:
+        """État du module d'indice i au temps t (voir `LyraModule.state_at`)."""
+        return self.history.read(i, t, self.x[i])[0]
+
+    def states(self) -> Dict[str, float]:
+        return {name: float(self.x[i]) for name, i in self.index.items()}
+
+    def release(self):
+        """Délie les modules : chacun reprend son état courant en propre."""
+        for m in self.modules.values():
+            value = float(self.x[m._index])
+            m._network, m._index = None, -1
+            m.state = value
+            m.ext_inputs = {}
+        self.invalidate()
+
+
+# 🧪 Test local : même démo que lyra.base, chemin vectorisé vs module par module
+if __name__ == "__main__":
+    from lyra.base import PoeticModule, delayed_inputs
+
+    def identity(x): return x
+
+    def build():
+        m1 = PoeticModule("metaphor", {"state0": 1.0, "alpha": 0.2, "dt": 0.1})
+        m2 = PoeticModule("pun", {"state0": 0.5, "alpha": 0.15, "dt": 0.1})
+        m1.add_neighbor("pun", rho=0.5, delta=0.1, gfunc=identity)
+        m2.add_neighbor("metaphor", rho=0.3, delta=0.2, gfunc=identity)
+        return m1, m2
+
+    a1, a2 = build()
+    ext_inputs = delayed_inputs([a1, a2])
+    b1, b2 = build()
+    net = LyraNetwork([b1, b2])
+
+    for t in np.arange(0, 10, 0.1):
+        a1.step(t, ext_inputs)
+        a2.step(t, ext_inputs)
+        net.step(t)
+        print(f"t={t:.1f}, metaphor={b1.state:.2f}, pun={b2.state:.2f}, "
+              f"écart={max(abs(a1.state - b1.state), abs(a2.state - b2.state)):.1e}")
@@ -0,0 +1,313 @@
+"""PersistentVectorStore — VectorStore adossé au disque, rouvert sans recopie.
+
+Chaque colonne du store est un fichier mappé en mémoire ; les lectures
+(recherche, valeurs, horodatages) se font directement sur les pages du fichier.
+Un worker redémarré rouvre sa mémoire en quelques millisecondes, sans
+réencoder ni recharger les traces en objets Python.
+
+Répertoire :
+    CURRENT               nom de la génération active (remplacé atomiquement)
+    gen-000001/
+        header.json       {"dim", "dtype"}
+        vectors.f32       embeddings normalisés (capacité × dim)
+        ids.i8 times.f8 values.f8 norms.f8 alive.u1   colonnes
+        meta.jsonl        métadonnées JSON, une ligne par trace (ajout seul)
+        meta.off          (offset, longueur) de chaque ligne de meta.jsonl
+
+Écritures en ajout seul : une ligne est validée quand son entrée `meta.off` est
+écrite (en dernier) ; une écriture interrompue est ignorée à la réouverture.
+Les suppressions posent des pierres tombales (`alive`). Le compactage recopie
+les traces vivantes dans une nouvelle génération sur un thread de fond ; le
+thread propriétaire l'installe à sa prochaine écriture (rattrapage des traces
+ajoutées ou oubliées entre‑temps), puis l'ancienne génération est supprimée.
+"""
+
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+
+from lyra.vector_store import VectorStore
+
+
+class _Generation:
+    """Fichiers mappés d'une génération du store."""
+
+    def __init__(self, path: str, dim: int, dtype, capacity: int = 64):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        header = os.path.join(path, "header.json")
+        if not os.path.exists(header):
+            with open(header, "w") as fh:
+                json.dump({"dim": dim, "dtype": self.dtype.name}, fh)
+        self.columns = {
+            "matrix": ("vectors.f32", self.dtype, (dim,)),
+            "ids": ("ids.i8", np.int64, ()),
+            "times": ("times.f8", np.float64, ()),
+            "values": ("values.f8", np.float64, ()),
+            "norms": ("norms.f8", np.float64, ()),
+            "alive": ("alive.u1", np.bool_, ()),
+            "meta_pos": ("meta.off", np.int64, (2,)),
+        }
+        ids_path = os.path.join(path, "ids.i8")
+        existing = os.path.getsize(ids_path) // 8 if os.path.exists(ids_path) else 0
+        self.meta_file = open(os.path.join(path, "meta.jsonl"), "a+b")
+        self.capacity = 0
+        self.remap(max(existing, capacity))
+
+    @classmethod
+    def open(cls, path: str) -> "_Generation":
+        with open(os.path.join(path, "header.json")) as fh:
+            header = json.load(fh)
+        return cls(path, header["dim"], header["dtype"])
+
+    def remap(self, capacity: int):
+        """Étend les fichiers à `capacity` lignes et les remappe."""
+        for name, (filename, dtype, shape) in self.columns.items():
+            path = os.path.join(self.path, filename)
+            nbytes = capacity * np.dtype(dtype).itemsize * int(np.prod(shape))
+            if not os.path.exists(path) or os.path.getsize(path) < nbytes:
+                with open(path, "ab") as fh:
+                    fh.truncate(nbytes)
+            setattr(self, name, np.memmap(path, dtype=dtype, mode="r+", shape=(capacity,) + shape))
+        self.capacity = capacity
+
+    def used(self) -> int:
+        """Nombre de lignes validées (entrée `meta.off` écrite)."""
+        empty = self.meta_pos[:, 1] == 0
+        return int(empty.argmax()) if empty.any() else self.capacity
+
+    def read_meta(self, i: int) -> bytes:
+        offset, length = self.meta_pos[i]
+        return os.pread(self.meta_file.fileno(), int(length), int(offset))
+
+    def write_meta(self, i: int, raw: bytes):
+        offset = self.meta_file.seek(0, os.SEEK_END)
+        self.meta_file.write(raw)
+        self.meta_file.flush()
+        self.meta_pos[i] = (offset, len(raw))
+
+    def copy_rows(self, src: "_Generation", rows: np.ndarray, start: int):
+        """Recopie les lignes `rows` de `src` à partir de la ligne `start`."""
+        stop = start + len(rows)
+        for name in ("matrix", "ids", "times", "values", "norms", "alive"):
+            getattr(self, name)[start:stop] = getattr(src, name)[rows]
+        for i, row in enumerate(rows, start):
+            self.write_meta(i, src.read_meta(row))
+
+    def flush(self):
+        for name in self.columns:
+            getattr(self, name).flush()
+        self.meta_file.flush()
+
+    def close(self):
+        self.flush()
+        self.meta_file.close()
+
+
+class _MetaColumn:
+    """Colonne `meta` paresseuse : décodée ligne par ligne depuis meta.jsonl."""
+
+    def __init__(self, store: "PersistentVectorStore"):
+        self.store = store
+
+    def __len__(self):
+        return self.store.size
+
+    def __getitem__(self, i):
+        return json.loads(self.store._gen.read_meta(int(i)))
+
+    def append(self, meta):
+        raw = json.dumps(meta, ensure_ascii=False, default=str).encode("utf-8") + b"\n"
+        self.store._gen.write_meta(self.store.size, raw)
+
+
+class PersistentVectorStore(VectorStore):
+    """💾 VectorStore persistant : colonnes mappées, compactage en arrière‑plan.
+
+    Args:
+        path: Répertoire du store (créé si besoin, rouvert s'il existe).
+        capacity: Capacité initiale d'une nouvelle génération.
+        dtype: Type flottant de la matrice.
+        index: Index approché facultatif, reconstruit à la réouverture.
+    """
+
+    def __init__(self, path: str, capacity: int = 64, dtype=np.float32, index=None):
+        super().__init__(capacity=capacity, dtype=dtype, index=index)
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.meta = _MetaColumn(self)
+        self._gen: _Generation | None = None
+        self._lock = threading.Lock()
+        self._compactor: threading.Thread | None = None
+        self._pending = None  # (génération compactée, lignes recopiées, taille au lancement)
+        current = self._current()
+        if current is not None:
+            self._bind(_Generation.open(os.path.join(path, current)))
+            self.size = self._gen.used()
+            self.dead = int(self.size - self.alive[:self.size].sum())
+            self.dim = self._gen.dim
+            self.next_id = int(self.ids[self.size - 1]) + 1 if self.size else 0
+            if self.index is not None and len(self):
+                live = self.live_rows()
+                self.index.add(self.ids[live], self.matrix[live])
+
+    # ------------------------------------------------------------------
+    def _current(self) -> str | None:
+        pointer = os.path.join(self.path, "CURRENT")
+        if not os.path.exists(pointer):
+            return None
+        with open(pointer) as fh:
+            return fh.read().strip()
+
+    def _set_current(self, name: str):
+        tmp = os.path.join(self.path, "CURRENT.tmp")
+        with open(tmp, "w") as fh:
+            fh.write(name)
+        os.replace(tmp, os.path.join(self.path, "CURRENT"))
+
+    def _next_generation(self) -> str:
+        current = self._current()
+        number = int(current.split("-")[1]) + 1 if current else 1
+        return f"gen-{number:06d}"
+
+    def _bind(self, gen: _Generation):
+        self._gen = gen
+        self._capacity = gen.capacity
+        for name in ("matrix", "ids", "times", "values", "norms", "alive"):
+            setattr(self, name, getattr(gen, name))
+
+    def _init_matrix(self, dim: int):
+        self.dim = int(dim)
+        name = self._next_generation()
+        self._bind(_Generation(os.path.join(self.path, name), self.dim, self.dtype, self._capacity))
+        self._set_current(name)
+
+    def _grow(self, needed: int):
+        capacity = self._capacity
+        while capacity < needed:
+            capacity *= 2
+        if capacity != self._capacity:
+            self._gen.remap(capacity)
+            self._bind(self._gen)
+
+    # ------------------------------------------------------------------
+    def add(self, t: float, value: float, vector, meta=None) -> int:
+        self._install()
+        return super().add(t, value, vector, meta)
+
+    def delete(self, ids) -> int:
+        self._install()
+        return super().delete(ids)
+
+    def keep(self, mask: np.ndarray):
+        """Pierres tombales sur les lignes où `mask` est faux (compactage différé)."""
+        drop = self.alive[:self.size] & ~np.asarray(mask, dtype=bool)
+        self.delete(self.ids[:self.size][drop])
+
+    def load(self, ids, times, values, matrix, norms, meta):
+        self._install()
+        super().load(ids, times, values, matrix, norms, meta)
+
+    def _load_meta(self, meta):
+        for i, m in enumerate(meta):  # une ligne de meta.jsonl par trace, comme `add`
+            self._gen.write_meta(i, json.dumps(m, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+
+    def shift_times(self, offset: float):
+        if self._compactor is not None:  # la copie en cours ignorerait le décalage
+            self._compactor.join()
+        self._install()
+        super().shift_times(offset)
+
+    def clear(self):
+        self.close()
+        shutil.rmtree(self.path, ignore_errors=True)
+        self.__init__(self.path, self._capacity, self.dtype, self.index)
+        if self.index is not None:
+            self.index.reset()
+
+    def flush(self):
+        if self._gen is not None:
+            self._gen.flush()
+
+    def close(self):
+        """Attend un éventuel compactage, l'installe et vide les tampons."""
+        if self._compactor is not None:
+            self._compactor.join()
+        self._install()
+        if self._gen is not None:
+            self._gen.close()
+
+    # ------------------------------------------------------------------
+    def compact(self, wait: bool = False):
+        """Lance le compactage sur un thread de fond (installé à la prochaine écriture)."""
+        with self._lock:
+            if self._gen is None or self._compactor is not None:
+                return
+            snapshot = self.size
+            kept = np.flatnonzero(self.alive[:snapshot])
+            self._compactor = threading.Thread(
+                target=self._build, args=(self._gen, kept, snapshot), name="lyra-compact", daemon=True)
+            self._compactor.start()
+        if wait:
+            self._compactor.join()
+            self._install()
+
+    def _build(self, source: _Generation, kept: np.ndarray, snapshot: int):
+        name = self._next_generation()
+        target = _Generation(os.path.join(self.path, name), source.dim, source.dtype,
+                             max(64, 2 * len(kept)))
+        target.copy_rows(source, kept, 0)
+        with self._lock:
+            self._pending = (name, target, kept, snapshot)
+
+    def _install(self):
+        """Bascule sur la génération compactée, en rattrapant les écritures récentes."""
+        with self._lock:
+            if self._pending is None:
+                return
+            name, target, kept, snapshot = self._pending
+            self._pending = None
+            self._compactor = None
+        source = self._gen
+        # traces oubliées pendant le compactage, puis traces ajoutées depuis
+        target.alive[:len(kept)] = source.alive[kept]
+        recent = np.arange(snapshot, self.size)
+        size = len(kept) + len(recent)
+        if size > target.capacity:
+            target.remap(max(size, 2 * target.capacity))
+        target.copy_rows(source, recent, len(kept))
+        target.flush()
+        self._set_current(name)
+        self._bind(target)
+        self.size = size
+        self.dead = int(size - self.alive[:size].sum())
+        source.close()
+        shutil.rmtree(source.path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    # 🧪 Test local : écriture, réouverture, compactage
+    import tempfile
+    import time
+
+    path = tempfile.mkdtemp()
+    rng = np.random.default_rng(0)
+    store = PersistentVectorStore(path)
+    for i in range(10_000):
+        store.add(0.1 * i, float(i), rng.normal(size=384), {"i": i})
+    store.delete(np.arange(0, 10_000, 3))
+    store.close()
+
+    start = time.perf_counter()
+    reopened = PersistentVectorStore(path)
+    print(f"réouverture : {1000 * (time.perf_counter() - start):.1f} ms,", len(reopened), "traces")
+    q = reopened.vector(reopened.live_rows()[5])
+    idx, _ = reopened.search(q, top_k=1)
+    print("plus proche :", reopened.meta[idx[0]])
+    reopened.compact(wait=True)
+    print("après compactage :", reopened.size, "lignes,", reopened.dead, "mortes,", os.listdir(path))
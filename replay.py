@@ -0,0 +1,291 @@
+"""Rejeu hors ligne de sessions enregistrées, réparti sur les cœurs CPU.
+
+Source : le flux d'événements `step` de `lyra.events` (JSONL ou SQLite : session,
+prompt, reply, ts), ou tout JSONL de lignes {"session", "prompt", "reply"[, "ts"]}.
+Chaque session est rejouée dans un `LyraCoreMinimal` neuf, réponses enregistrées
+à la place des appels LLM (`step(prompt, reply=…)`) : aucun appel réseau, le
+débit n'est borné que par le CPU. Les sessions sont réparties sur un pool de
+processus (fork après chargement des poids de l'encodeur, comme `lyra.serve`),
+les plus longues d'abord.
+
+Sortie : un fichier .npz en colonnes, une ligne par pas — session, step, ts, t,
+styled_output, critrix_*, echo_*, journal_*, noyau_<émotion>, step_ms (durée CPU
+du pas) — plus `meta` (JSON : source, paramètres, débit).
+
+    python -m lyra.replay run events.jsonl --out base.npz --workers 8
+    python -m lyra.replay run events.db --out new.npz --param critrix.gamma=1.5
+    python -m lyra.replay diff base.npz new.npz
+
+`--param module.clé=valeur` modifie un paramètre de module avant le rejeu
+(contrôle de non‑régression d'un réglage) ; `--realtime k` rejoue aussi les
+silences entre prompts (`LyraCoreMinimal.advance`, k secondes simulées par
+seconde enregistrée). `diff` sort avec le code 1 si une colonne diffère.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from lyra.integrators import INTEGRATORS
+
+# Attributs lus par JournalOubli à la construction plutôt qu'à chaque pas
+_JOURNAL_ATTRS = {"lambda": "decay_lambda", "threshold": "threshold", "max_length": "max_length"}
+_IGNORED_IN_DIFF = ("ts", "step_ms")
+
+
+# ----------------------------------------------------------------------
+# Lecture du journal enregistré
+# ----------------------------------------------------------------------
+def _rows(path: str):
+    if path.endswith((".db", ".sqlite")):
+        db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            for (data,) in db.execute("SELECT data FROM events WHERE type = 'step' ORDER BY id"):
+                yield json.loads(data)
+        finally:
+            db.close()
+        return
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+
+
+def load_sessions(path: str, sessions: Sequence[str] | None = None,
+                  limit: int | None = None) -> Dict[str, List[Dict]]:
+    """{session: [{"prompt", "reply", "ts"}…]} dans l'ordre d'enregistrement."""
+    wanted = set(sessions) if sessions else None
+    out: Dict[str, List[Dict]] = {}
+    for event in _rows(path):
+        if event.get("type", "step") != "step" or "reply" not in event:
+            continue
+        session = event.get("session") or "default"
+        if wanted is not None and session not in wanted:
+            continue
+        steps = out.setdefault(session, [])
+        if limit is None or len(steps) < limit:
+            steps.append({"prompt": event.get("prompt", ""), "reply": event["reply"], "ts": event.get("ts")})
+    return out
+
+
+def _seconds(ts: str | None) -> float | None:
+    return datetime.fromisoformat(ts).timestamp() if ts else None
+
+
+def parse_params(specs: Sequence[str]) -> List[Tuple[str, str, object]]:
+    """["critrix.gamma=1.5"] → [("critrix", "gamma", 1.5)] (valeur JSON, sinon texte)."""
+    params = []
+    for spec in specs:
+        target, sep, raw = spec.partition("=")
+        module, dot, key = target.partition(".")
+        if not sep or not dot:
+            raise ValueError(f"Invalid --param {spec!r} (expected module.key=value)")
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            value = raw
+        params.append((module, key, value))
+    return params
+
+
+# ----------------------------------------------------------------------
+# Rejeu d'une session (dans un processus du pool)
+# ----------------------------------------------------------------------
+def _core(session_id: str, options: Dict):
+    from lyra.core_pipeline import LyraCoreMinimal
+    from lyra.modules.journal import JournalOubli
+
+    core = LyraCoreMinimal(dt=options["dt"], session_id=session_id, integrator=options["integrator"])
+    for module, key, value in options["params"]:
+        if module not in core.modules:
+            raise ValueError(f"Unknown module in --param: {module}")
+        m = core.modules[module]
+        m.params[key] = value
+        if isinstance(m, JournalOubli) and key in _JOURNAL_ATTRS:
+            setattr(m, _JOURNAL_ATTRS[key], value)
+    core.network.invalidate()
+    return core
+
+
+def _prefetch(core, steps: List[Dict]) -> Dict[str, np.ndarray]:
+    """Un seul lot d'encodage : prompts de la session et traces que le journal captera."""
+    encoder = core.journal.encoder
+    texts = [step["prompt"] for step in steps if step["prompt"]]
+    if encoder.cache is not None:
+        texts += [text for step in steps for text in core.trace_texts(step["reply"])]
+    unique = list(dict.fromkeys(texts))
+    return dict(zip(unique, encoder.encode_many(unique))) if unique else {}
+
+
+def replay_session(session_id: str, steps: List[Dict], options: Dict) -> Dict[str, np.ndarray]:
+    """Rejoue `steps` dans un core neuf ; renvoie les colonnes de la session."""
+    core = _core(session_id, options)
+    vectors = _prefetch(core, steps)
+    realtime = options["realtime"]
+    columns: Dict[str, list] = {}
+    clock, previous = 0.0, None
+    for i, step in enumerate(steps):
+        start = time.perf_counter()
+        if realtime:
+            now = _seconds(step["ts"])
+            if previous is not None and now is not None:
+                clock = max(clock, core.t) + max(now - previous, 0.0) * realtime
+                core.advance(clock)
+            previous = now
+        result = core.step(step["prompt"], reply=step["reply"], query_vec=vectors.get(step["prompt"]))
+        elapsed = time.perf_counter() - start
+        row = {
+            "step": i,
+            "ts": step["ts"] or "",
+            "t": core.t,
+            "styled_output": result["styled_output"],
+            "critrix_alert": result["critrix_alert"],
+            "critrix_state": float(core.critrix.state),
+            "critrix_tau_c": float(core.critrix.tau_c),
+            "critrix_coherence": float(core.critrix.coherence_score),
+            "echo_state": float(core.echo.state),
+            "echo_resonance": float(core.echo.resonance_sum),
+            "journal_state": float(core.journal.state),
+            "journal_traces": len(core.journal.store),
+            "step_ms": 1000 * elapsed,
+        }
+        row.update({f"noyau_{k}": v for k, v in result["noyau_state"].items()})
+        for key, value in row.items():
+            columns.setdefault(key, []).append(value)
+    out = {key: np.asarray(values) for key, values in columns.items()}
+    out["session"] = np.full(len(steps), session_id)
+    return out
+
+
+def _concat(parts: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    keys = list(dict.fromkeys(k for part in parts for k in part))
+    return {k: np.concatenate([part[k] for part in parts]) for k in keys}
+
+
+def _preload():
+    """Poids de l'encodeur chargés avant le fork : une copie partagée par tous les workers."""
+    from lyra.encoder import get_encoder
+    get_encoder().model
+
+
+def replay(sessions: Dict[str, List[Dict]], options: Dict, workers: int = 1) -> Dict[str, np.ndarray]:
+    """Rejoue toutes les sessions ; colonnes concaténées par session (ordre alphabétique)."""
+    order = sorted(sessions, key=lambda s: len(sessions[s]), reverse=True)  # plus longues d'abord
+    if workers <= 1 or len(order) <= 1:
+        results = {s: replay_session(s, sessions[s], options) for s in order}
+    else:
+        import multiprocessing as mp
+        _preload()
+        context = mp.get_context("fork" if hasattr(os, "fork") else "spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = {s: pool.submit(replay_session, s, sessions[s], options) for s in order}
+            results = {s: f.result() for s, f in futures.items()}
+    parts = [results[s] for s in sorted(results) if len(sessions[s])]
+    return _concat(parts) if parts else {}
+
+
+# ----------------------------------------------------------------------
+# Comparaison de deux rejeux
+# ----------------------------------------------------------------------
+def diff(base: Dict[str, np.ndarray], new: Dict[str, np.ndarray], tolerance: float = 1e-9) -> List[Dict]:
+    """Écarts colonne par colonne entre deux rejeux des mêmes sessions."""
+    for key in ("session", "step"):
+        if key not in base or key not in new or not np.array_equal(base[key], new[key]):
+            raise ValueError("Replays do not cover the same sessions and steps")
+    report = []
+    for key in sorted(set(base) & set(new)):
+        if key in _IGNORED_IN_DIFF or key in ("session", "step", "meta"):
+            continue
+        a, b = base[key], new[key]
+        if a.dtype.kind == "f" or b.dtype.kind == "f":
+            delta = np.abs(a.astype(float) - b.astype(float))
+            changed = int((delta > tolerance).sum())
+            report.append({"column": key, "changed": changed, "max_abs": float(delta.max(initial=0.0))})
+        else:
+            report.append({"column": key, "changed": int((a != b).sum()), "max_abs": None})
+    for key in sorted(set(base) ^ set(new)):
+        report.append({"column": key, "changed": -1, "max_abs": None})  # colonne absente d'un côté
+    return report
+
+
+# ----------------------------------------------------------------------
+# CLI
+# ----------------------------------------------------------------------
+def _run(args) -> int:
+    # aucun appel LLM (réponses enregistrées) ni événement vers le flux de production
+    os.environ["LYRA_LLM_BACKEND"] = "stub"
+    os.environ.pop("LYRA_EVENTS", None)
+    options = {"dt": args.dt, "integrator": args.integrator, "realtime": args.realtime,
+               "params": parse_params(args.param)}
+    sessions = load_sessions(args.source, args.session or None, args.limit)
+    total = sum(len(s) for s in sessions.values())
+    print(f"{len(sessions)} sessions, {total} pas — {args.workers} worker(s)", flush=True)
+
+    start = time.perf_counter()
+    columns = replay(sessions, options, args.workers)
+    elapsed = time.perf_counter() - start
+    meta = {"source": os.path.abspath(args.source), "options": options, "workers": args.workers,
+            "sessions": len(sessions), "steps": total, "seconds": round(elapsed, 3)}
+    np.savez_compressed(args.out, meta=np.array(json.dumps(meta)), **columns)
+
+    if total:
+        step_ms = columns["step_ms"]
+        print(f"{elapsed:.2f} s, {total / elapsed:.0f} pas/s — par pas (CPU) : "
+              f"p50 {np.percentile(step_ms, 50):.2f} ms, p99 {np.percentile(step_ms, 99):.2f} ms, "
+              f"{int(columns['critrix_alert'].sum())} alertes CRITRIX")
+    print(f"→ {args.out}")
+    return 0
+
+
+def _diff(args) -> int:
+    with np.load(args.base) as base, np.load(args.new) as new:
+        report = diff(dict(base), dict(new), args.tolerance)
+    failed = False
+    for entry in report:
+        if entry["changed"] == 0:
+            continue
+        failed = True
+        if entry["changed"] < 0:
+            print(f"{entry['column']:<24} absente d'un des deux rejeux")
+        else:
+            extra = f", écart max {entry['max_abs']:.3g}" if entry["max_abs"] is not None else ""
+            print(f"{entry['column']:<24} {entry['changed']} pas différents{extra}")
+    print("identiques" if not failed else "différences détectées")
+    return 1 if failed else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="rejoue un journal d'événements")
+    run.add_argument("source", help="événements JSONL ou base SQLite (lyra.events)")
+    run.add_argument("--out", default="replay.npz")
+    run.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    run.add_argument("--session", action="append", default=[], help="ne rejouer que cette session (répétable)")
+    run.add_argument("--limit", type=int, default=None, help="pas maximum par session")
+    run.add_argument("--param", action="append", default=[], metavar="MODULE.KEY=VALUE")
+    run.add_argument("--dt", type=float, default=0.1)
+    run.add_argument("--integrator", default="euler", choices=INTEGRATORS)
+    run.add_argument("--realtime", type=float, default=0.0,
+                     help="rejoue les silences entre prompts (secondes simulées par seconde)")
+
+    cmp = sub.add_parser("diff", help="compare deux rejeux")
+    cmp.add_argument("base")
+    cmp.add_argument("new")
+    cmp.add_argument("--tolerance", type=float, default=1e-9)
+
+    args = parser.parse_args(argv)
+    return _run(args) if args.command == "run" else _diff(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""Lancement multi‑processus de l'API : préchargement, puis fork des workers.
+
+    python -m lyra.serve --workers 4 --host 0.0.0.0 --port 8000
+
+Le processus maître importe `lyra.api`, charge les poids de l'encodeur et
+construit un premier core (`lyra.warmup.PRELOAD_STEPS`), gèle le ramasse‑miettes
+(`gc.freeze`) puis crée les workers par `fork`. Chaque worker hérite ainsi des
+poids en copie sur écriture : une seule copie physique des tenseurs par hôte,
+au lieu d'une par worker avec `uvicorn --workers N`.
+
+Avant le fork, rien ne crée de thread natif ni de connexion : pas d'inférence
+(pools OpenMP/BLAS), pas de client HTTP. Les threads de Lyra (micro‑lots de
+l'encodeur, pool CPU, écriture des événements) repartent d'eux‑mêmes dans
+chaque enfant (`os.register_at_fork`), et chaque worker termine son propre
+préchauffage (première inférence, client LLM) avant de se déclarer prêt.
+
+Le maître relance un worker qui meurt et propage SIGTERM/SIGINT. Les
+métriques (/metrics) restent propres à chaque worker ; `lyra_process_memory_bytes`
+y expose rss/pss/private. `--report-memory` affiche la mémoire de chaque worker
+une fois prêts (voir aussi `lyra.benchmarks.worker_memory`).
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict
+
+from lyra.metrics import process_memory
+
+
+def preload():
+    """Importe l'API et charge les ressources partagées dans le processus maître."""
+    os.environ.setdefault("LYRA_WARMUP", "background")  # chaque worker finit son préchauffage
+    from lyra import api
+    from lyra.warmup import PRELOAD_STEPS, Warmup
+
+    warmup = Warmup(PRELOAD_STEPS)
+    warmup.run()
+    for name, component in warmup.components.items():
+        print(f"[lyra.serve] préchargement {name} : {component['status']} ({component['seconds']} s)"
+              + (f" — {component['error']}" if "error" in component else ""), flush=True)
+    gc.collect()
+    gc.freeze()  # objets du maître hors du GC : leurs pages ne sont pas recopiées par les workers
+    return api.app
+
+
+def _listen(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _worker(app, sock: socket.socket, log_level: str):
+    import uvicorn
+
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def memory_table(pids) -> str:
+    rows = [f"{'pid':>8} {'rss MiB':>9} {'pss MiB':>9} {'privé MiB':>10}"]
+    for pid in pids:
+        m = process_memory(pid)
+        if m:
+            rows.append(f"{pid:>8} {m['rss'] / 2**20:>9.1f} {m['pss'] / 2**20:>9.1f} {m['private'] / 2**20:>10.1f}")
+    return "\n".join(rows)
+
+
+def serve(host: str = "127.0.0.1", port: int = 8000, workers: int = 2, log_level: str = "info",
+          report_memory: float | None = None):
+    app = preload()
+    sock = _listen(host, port)
+    children: Dict[int, float] = {}
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _worker(app, sock, log_level)
+            finally:
+                os._exit(0)
+        children[pid] = time.monotonic()
+
+    def stop(signum, _frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for _ in range(workers):
+        spawn()
+    print(f"[lyra.serve] {workers} workers sur {host}:{port} (maître {os.getpid()})", flush=True)
+    report_at = time.monotonic() + report_memory if report_memory is not None else None
+
+    while children:
+        if report_at is not None and time.monotonic() >= report_at:
+            print(f"[lyra.serve] mémoire (maître {os.getpid()} inclus)\n"
+                  + memory_table([os.getpid(), *children]), flush=True)
+            report_at = None
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid == 0:
+            time.sleep(0.2)
+            continue
+        started = children.pop(pid, None)
+        if stopping or started is None:
+            continue
+        print(f"[lyra.serve] worker {pid} terminé (statut {status}), relancé", flush=True)
+        if time.monotonic() - started < 1.0:
+            time.sleep(1.0)  # évite une boucle de relance si le worker meurt au démarrage
+        spawn()
+    sock.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=os.getenv("LYRA_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("LYRA_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("LYRA_WORKERS", "2")))
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--report-memory", type=float, default=None, metavar="SECONDS",
+                        help="affiche la mémoire de chaque processus après ce délai")
+    args = parser.parse_args(argv)
+    if not hasattr(os, "fork"):
+        sys.exit("lyra.serve requiert fork() ; utiliser `uvicorn lyra.api:app --workers N`")
+    serve(args.host, args.port, args.workers, args.log_level, args.report_memory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""Gestion des sessions : un LyraCoreMinimal par client.
+
+Chaque identifiant de session est associé paresseusement à son propre core
+(état émotionnel, journal, temps simulé). Les sessions sont :
+    • évincées par LRU au‑delà de `max_sessions` ou d'un budget mémoire estimé,
+    • expirées après `ttl` secondes d'inactivité,
+    • sérialisées : un verrou par session, une seule requête à la fois par core,
+    • hibernées (optionnel) : une session évincée ou expirée est écrite sur disque
+      (`lyra.snapshot.Hibernator`) et réveillée telle quelle à sa prochaine requête.
+
+Écriture, réveil et fermeture des cores retirés tournent sur le pool CPU
+(`lyra.workers.run_cpu`), jamais sur la boucle d'événements ; une requête
+arrivant pendant le transfert de sa session l'attend.
+
+Les ressources lourdes (encodeur sentence-transformers, client LLM) sont
+partagées au niveau du processus et ne sont jamais copiées par core.
+"""
+
+import asyncio
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Callable, Dict
+
+from lyra.workers import run_cpu
+
+_SAFE_KEY = re.compile(r"[A-Za-z0-9_-][A-Za-z0-9_.-]{0,63}")
+
+
+def session_key(session_id: str) -> str:
+    """Nom de fichier/dossier propre à `session_id` (deux ids distincts → deux noms).
+
+    Un id déjà sûr est gardé tel quel (lisible, dossiers existants conservés) ;
+    tout autre devient « ~ » + empreinte blake2b, « ~ » n'apparaissant jamais
+    dans un id sûr.
+    """
+    if _SAFE_KEY.fullmatch(session_id):
+        return session_id
+    return "~" + hashlib.blake2b(session_id.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _close(core):
+    close = getattr(core, "close", None)
+    if close is not None:
+        close()
+
+
+class Session:
+    """Un core et son verrou."""
+
+    def __init__(self, session_id: str, core):
+        self.id = session_id
+        self.core = core
+        self.lock = asyncio.Lock()
+        self.created = time.monotonic()
+        self.last_used = self.created
+        self.size = 0
+
+    def refresh_size(self) -> int:
+        estimate = getattr(self.core, "memory_estimate", None)
+        self.size = estimate() if estimate else 0
+        return self.size
+
+
+class SessionManager:
+    """🗂️ Sessions LRU avec TTL et plafond mémoire.
+
+    Args:
+        factory: Crée le core d'une session (ex. `lambda session_id: LyraCoreMinimal(dt=0.1)`).
+        max_sessions: Nombre maximal de cores résidents.
+        ttl: Inactivité (s) au‑delà de laquelle une session expire (None = jamais).
+        max_memory_mb: Budget mémoire estimé pour l'ensemble des cores (None = aucun).
+        hibernator: Range sur disque les sessions évincées/expirées (None = oubliées).
+    """
+
+    def __init__(self, factory: Callable[[str], object], max_sessions: int = 1000,
+                 ttl: float | None = 3600.0, max_memory_mb: float | None = None, hibernator=None):
+        if max_sessions < 1:
+            raise ValueError("max_sessions must be >= 1")
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_memory = None if max_memory_mb is None else max_memory_mb * 1024 * 1024
+        self.hibernator = hibernator
+        self.sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self.memory = 0
+        self.evictions = 0
+        self._pending: Dict[str, asyncio.Future] = {}  # session_id → transfert en cours
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def __contains__(self, session_id: str):
+        return session_id in self.sessions
+
+    def get(self, session_id: str) -> Session | None:
+        """Retourne la session sans la créer ni la rafraîchir."""
+        return self.sessions.get(session_id)
+
+    def touch(self, session_id: str) -> Session:
+        """Retourne la session résidente (créée par la factory si besoin) et la marque comme récente.
+
+        Sans verrou ni réveil depuis l'hibernation : utiliser `use`.
+        """
+        self._expire()
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = self._admit(session_id, self.factory(session_id))
+        self.sessions.move_to_end(session_id)
+        session.last_used = time.monotonic()
+        self._evict(keep=session_id)
+        return session
+
+    @asynccontextmanager
+    async def use(self, session_id: str):
+        """Réserve le core de `session_id` pendant le bloc (créé ou réveillé si besoin)."""
+        while True:
+            await self._resident(session_id)
+            session = self.touch(session_id)
+            await session.lock.acquire()
+            if self.sessions.get(session_id) is session:
+                break
+            session.lock.release()  # retirée pendant l'attente du verrou (reset, éviction)
+        try:
+            yield session.core
+        finally:
+            session.last_used = time.monotonic()
+            if self.sessions.get(session.id) is session:
+                self.memory -= session.size
+                self.memory += session.refresh_size()
+            session.lock.release()
+        self._evict()
+
+    async def reset(self, session_id: str, then: Callable[[], object] | None = None) -> bool:
+        """Oublie la session après sa requête en cours ; recréée à la prochaine (depuis sa mémoire persistée, le cas échéant).
+
+        `then` (ex. effacer la mémoire persistée) s'exécute sur le pool CPU, core
+        fermé, avant qu'une nouvelle requête ne puisse recréer la session.
+        """
+        while (pending := self._pending.get(session_id)) is not None:
+            await asyncio.wait([pending])
+        return await asyncio.shield(self._transfer(session_id, self._forget(session_id, then)))
+
+    def drop(self, session_id: str) -> bool:
+        """Retire la session et ferme son core (sur place)."""
+        session = self._pop(session_id)
+        if session is None:
+            return False
+        _close(session.core)
+        return True
+
+    def hibernate(self, session_id: str) -> bool:
+        """Retire la session ; son core est écrit sur disque (avec hibernator) puis fermé, sur le pool CPU.
+
+        Une requête de la session arrivant entre‑temps attend la fin de l'écriture puis la réveille.
+        """
+        session = self._pop(session_id)
+        if session is None:
+            return False
+        self._transfer(session_id, run_cpu(self._retire, session_id, session.core))
+        return True
+
+    async def hibernate_all(self) -> int:
+        """Hiberne toutes les sessions libres (arrêt du processus) et attend les écritures ; retourne leur nombre."""
+        idle = [session_id for session_id, session in self.sessions.items() if not session.lock.locked()]
+        for session_id in idle:
+            self.hibernate(session_id)
+        if self._pending:
+            await asyncio.wait(list(self._pending.values()))
+        return len(idle)
+
+    # ------------------------------------------------------------------
+    def _admit(self, session_id: str, core) -> Session:
+        session = self.sessions[session_id] = Session(session_id, core)
+        self.memory += session.refresh_size()
+        return session
+
+    def _pop(self, session_id: str) -> Session | None:
+        session = self.sessions.pop(session_id, None)
+        if session is not None:
+            self.memory -= session.size
+        return session
+
+    def _transfer(self, session_id: str, awaitable) -> asyncio.Future:
+        """Inscrit le transfert en cours (hibernation, réveil, reset), attendu par les requêtes de la session."""
+        task = self._pending[session_id] = asyncio.ensure_future(awaitable)
+
+        def done(_):
+            if self._pending.get(session_id) is task:
+                del self._pending[session_id]
+
+        task.add_done_callback(done)
+        return task
+
+    async def _resident(self, session_id: str):
+        """Attend tout transfert en cours de la session, puis la réveille si elle est hibernée."""
+        while True:
+            pending = self._pending.get(session_id)
+            if pending is not None:
+                await asyncio.wait([pending])  # issue indifférente : l'état est réexaminé
+            elif self.hibernator is None or session_id in self.sessions:
+                return
+            else:
+                await asyncio.shield(self._transfer(session_id, self._wake(session_id)))
+
+    async def _wake(self, session_id: str):
+        core = await run_cpu(self.hibernator.load, session_id)
+        self._admit(session_id, core if core is not None else self.factory(session_id))
+
+    def _retire(self, session_id: str, core):
+        try:
+            if self.hibernator is not None:
+                self.hibernator.save(session_id, core)
+        finally:
+            _close(core)
+
+    async def _forget(self, session_id: str, then: Callable[[], object] | None) -> bool:
+        session = self.sessions.get(session_id)
+        dropped = False
+        if session is not None:
+            async with session.lock:
+                dropped = self.sessions.get(session_id) is session and self._pop(session_id) is session
+            if dropped:
+                await run_cpu(_close, session.core)
+        hibernated = self.hibernator is not None and await run_cpu(self.hibernator.discard, session_id)
+        if then is not None:
+            await run_cpu(then)
+        return dropped or hibernated
+
+    # ------------------------------------------------------------------
+    def _expire(self):
+        if self.ttl is None:
+            return
+        limit = time.monotonic() - self.ttl
+        expired = []
+        for session_id, session in self.sessions.items():
+            if session.last_used >= limit:
+                break  # ordre LRU : les suivantes sont plus récentes
+            if not session.lock.locked():
+                expired.append(session_id)
+        for session_id in expired:
+            self.hibernate(session_id)
+            self.evictions += 1
+
+    def _over_budget(self) -> bool:
+        if len(self.sessions) > self.max_sessions:
+            return True
+        return self.max_memory is not None and self.memory > self.max_memory
+
+    def _evict(self, keep: str | None = None):
+        """Évince les sessions les moins récemment utilisées, jamais celles en cours."""
+        if not self._over_budget():
+            return
+        for session_id, session in list(self.sessions.items()):
+            if not self._over_budget():
+                break
+            if session_id == keep or session.lock.locked():
+                continue
+            self.hibernate(session_id)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "sessions": len(self.sessions),
+            "memory_bytes": self.memory,
+            "evictions": self.evictions,
+            **(self.hibernator.stats() if self.hibernator is not None else {}),
+        }
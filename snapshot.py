@@ -0,0 +1,361 @@
+"""Instantané binaire d'un LyraCoreMinimal : sauvegarde, restauration, hibernation.
+
+Format (version 1, petit‑boutiste) :
+    b"LYRASNAP" | version u16 | drapeaux u16 (réservés) | taille de l'en‑tête u32
+    en‑tête JSON UTF‑8 — temps, paramètres, voisins (gfunc par nom, voir
+                         `lyra.transfer_functions.name_of`), états, noyau émotionnel,
+                         et pour chaque tableau : [dtype, forme, position]
+    tableaux bruts alignés sur 8 octets — x du réseau, historique à retard, colonnes
+                         du journal (ids, instants, valeurs, normes, échéances) et
+                         embeddings normalisés tels que stockés (float32).
+
+La restauration lit les tableaux sans copie intermédiaire (`np.frombuffer`) et
+recharge le journal en bloc (`VectorStore.load`) : quelques millisecondes pour
+des milliers de traces. Une gfunc que `transfer_functions.get` ne sait pas
+reconstruire depuis son nom rend le core non sauvegardable (ValueError) ; un paramètre non JSON (ex. un backend injecté) est
+omis — le core restauré utilise celui du processus.
+
+`Hibernator` range les sessions inactives sur disque (un fichier par session,
+nommé par `lyra.sessions.session_key`) et les réveille à la demande : voir
+`lyra.sessions.SessionManager(hibernator=…)`. L'en‑tête porte l'id de la
+session, vérifié au réveil.
+"""
+
+import json
+import os
+import struct
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from lyra import transfer_functions
+from lyra.modules.critrix import CRITRIX
+from lyra.modules.echofuse import EchoFuse
+from lyra.modules.journal import JournalOubli
+from lyra.modules.llm_bridge import AutoGenesisCoreLLM
+from lyra.sessions import session_key
+
+MAGIC = b"LYRASNAP"
+VERSION = 1
+_PREFIX = struct.Struct("<8sHHI")
+
+# Attributs propres (JSON) conservés en plus de state / tau_c / params / voisins
+_EXTRA = {
+    AutoGenesisCoreLLM: ("last_text",),
+    CRITRIX: ("is_over_threshold", "coherence_score", "last_output"),
+    EchoFuse: ("resonance_sum",),
+    JournalOubli: ("decay_lambda", "threshold", "max_length"),  # copiés de params à la construction
+}
+
+_RESTORABLE = set()  # noms de gfunc déjà relus avec succès par `transfer_functions.get`
+
+
+def _plain(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _params(params: Dict) -> Dict:
+    out = {}
+    for key, value in params.items():
+        value = _plain(value)
+        try:
+            json.dumps(value)
+        except (TypeError, ValueError):
+            continue  # objet du processus (backend, cache…) : non sauvegardé
+        out[key] = value
+    return out
+
+
+def _neighbors(module) -> List[list]:
+    out = []
+    for j, (rho, delta, gfunc) in module.neighbors.items():
+        name = transfer_functions.name_of(gfunc)
+        if name not in _RESTORABLE:
+            try:
+                transfer_functions.get(name or "")
+            except KeyError:
+                raise ValueError(f"gfunc of edge {module.name} ← {j} cannot be restored by name ({name!r})") from None
+            _RESTORABLE.add(name)
+        out.append([j, float(rho), float(delta), name])
+    return out
+
+
+# ----------------------------------------------------------------------
+# Sauvegarde
+# ----------------------------------------------------------------------
+def dumps(core, session_id: str | None = None) -> bytes:
+    """Instantané binaire complet de `core` (`session_id` : id inscrit, défaut `core.session_id`)."""
+    arrays: Dict[str, np.ndarray] = {}
+    net = core.network
+    history = net.history
+    arrays.update({
+        "x": net.x,
+        "history.times": history.times, "history.values": history.values,
+        "history.head": history.head.astype(np.int64), "history.count": history.count.astype(np.int64),
+        "history.last_t": history.last_t,
+    })
+
+    modules = {}
+    for name, m in core.modules.items():
+        entry = {"params": _params(m.params), "neighbors": _neighbors(m), "tau_c": float(m.tau_c)}
+        for attr in _EXTRA.get(type(m), ()):
+            entry[attr] = _plain(getattr(m, attr))
+        modules[name] = entry
+
+    journal = core.journal
+    store = journal.store
+    # sans suppression, les lignes vivantes sont 0..size : vues sans copie
+    rows = slice(0, store.size) if not store.dead else store.live_rows()
+    meta = [store.meta[i] for i in (range(store.size) if not store.dead else rows)]
+    expiry = journal._expiry
+    arrays.update({
+        "journal.ids": store.ids[rows], "journal.times": store.times[rows],
+        "journal.values": store.values[rows], "journal.norms": store.norms[rows],
+        "journal.expiry_t": np.array([e for e, _ in expiry], dtype=np.float64),
+        "journal.expiry_id": np.array([i for _, i in expiry], dtype=np.int64),
+    })
+    if store.matrix is not None:
+        arrays["journal.matrix"] = store.matrix[rows]
+
+    noyau = core.noyau
+    ctx = noyau.contexte
+    header = {
+        "core": {"t": core.t, "dt": core.dt, "session_id": core.session_id if session_id is None else session_id,
+                 "integrator": net.integrator, "realtime": core.realtime,
+                 "clock": core._clock, "wall_epoch": time.time() - (time.monotonic() - core._wall)},
+        "order": list(net.index),
+        "modules": modules,
+        "journal": {"state": float(journal.state), "anchor": journal._anchor, "next_id": int(store.next_id),
+                    "meta": meta},
+        "history": {"capacity": history.capacity},
+        "noyau": {
+            "etats": noyau.etats, "sensibilite": noyau.sensibilite, "journal": list(noyau.journal),
+            "memoire": [[moment.isoformat(), fragment] for moment, fragment in noyau.memoire.traces],
+            "contexte": None if ctx is None else {
+                "objectif": ctx.objectif, "tonalite": ctx.tonalite, "themes": ctx.themes,
+                "interdits": ctx.interdits, "ressources": ctx.ressources},
+        },
+    }
+
+    layout, chunks, offset = {}, [], 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        layout[name] = [array.dtype.str, list(array.shape), offset]
+        chunks.append(memoryview(array).cast("B"))
+        pad = -array.nbytes % 8
+        if pad:
+            chunks.append(b"\0" * pad)
+        offset += array.nbytes + pad
+    header["arrays"] = layout
+    raw = json.dumps(header, ensure_ascii=False, default=_plain).encode("utf-8")
+    raw += b" " * (-(len(raw) + _PREFIX.size) % 8)
+    return b"".join([_PREFIX.pack(MAGIC, VERSION, 0, len(raw)), raw, *chunks])
+
+
+def save(core, path: str, session_id: str | None = None):
+    """Écrit l'instantané de `core` dans `path` (remplacement atomique)."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as fh:
+            fh.write(dumps(core, session_id))
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+# ----------------------------------------------------------------------
+# Restauration
+# ----------------------------------------------------------------------
+def _read(data) -> Tuple[Dict, Dict[str, np.ndarray]]:
+    view = memoryview(data)
+    if len(view) < _PREFIX.size:
+        raise ValueError("Not a Lyra snapshot (truncated)")
+    magic, version, _flags, size = _PREFIX.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError("Not a Lyra snapshot")
+    if version > VERSION:
+        raise ValueError(f"Unsupported snapshot version {version} (this build reads up to {VERSION})")
+    header = json.loads(bytes(view[_PREFIX.size:_PREFIX.size + size]))
+    base = _PREFIX.size + size
+    arrays = {}
+    for name, (dtype, shape, offset) in header["arrays"].items():
+        dtype = np.dtype(dtype)
+        count = int(np.prod(shape))
+        arrays[name] = np.frombuffer(view, dtype=dtype, count=count, offset=base + offset).reshape(shape)
+    return header, arrays
+
+
+def loads(data, memory_dir: str | None = None, events=None, session_id: str | None = None):
+    """Reconstruit un LyraCoreMinimal depuis `dumps(core)`.
+
+    Le core est construit normalement (ressources partagées du processus) puis
+    son état est remplacé par celui de l'instantané. `session_id` : id attendu
+    dans l'en‑tête (ValueError s'il diffère).
+    """
+    from lyra.core_pipeline import LyraCoreMinimal
+
+    header, arrays = _read(data)
+    meta = header["core"]
+    if session_id is not None and meta["session_id"] != session_id:
+        raise ValueError(f"Snapshot belongs to session {meta['session_id']!r}, not {session_id!r}")
+    core = LyraCoreMinimal(dt=meta["dt"], memory_dir=memory_dir, session_id=meta["session_id"],
+                           events=events, integrator=meta["integrator"], realtime=meta["realtime"])
+    core.t = meta["t"]
+    core._clock = meta["clock"]
+    # temps passé en hibernation compris : `catch_up` le simule en mode realtime
+    core._wall = time.monotonic() - max(time.time() - meta["wall_epoch"], 0.0)
+
+    for name, entry in header["modules"].items():
+        m = core.modules[name]
+        m.params.update(entry["params"])
+        m.tau_c = entry["tau_c"]
+        for attr in _EXTRA.get(type(m), ()):
+            if attr in entry:
+                setattr(m, attr, entry[attr])
+        m.neighbors = {}
+        for j, rho, delta, gfunc in entry["neighbors"]:
+            m.add_neighbor(j, rho=rho, delta=delta, gfunc=transfer_functions.get(gfunc))
+
+    net = core.network
+    for name, value in zip(header["order"], arrays["x"]):
+        net.x[net.index[name]] = value
+    history = net.history
+    history.capacity = header["history"]["capacity"]
+    history.times = arrays["history.times"].copy()
+    history.values = arrays["history.values"].copy()
+    history.head = arrays["history.head"].astype(np.intp)
+    history.count = arrays["history.count"].astype(np.intp)
+    history.last_t = arrays["history.last_t"].copy()
+    net.invalidate()
+
+    journal = core.journal
+    saved = header["journal"]
+    store = journal.store
+    if len(store) or store.size:
+        store.clear()
+    if "journal.matrix" in arrays:
+        store.load(arrays["journal.ids"], arrays["journal.times"], arrays["journal.values"],
+                   arrays["journal.matrix"], arrays["journal.norms"], saved["meta"])
+    store.next_id = max(store.next_id, saved["next_id"])
+    journal._anchor = saved["anchor"]
+    journal.state = saved["state"]
+    journal._expiry = list(zip(arrays["journal.expiry_t"].tolist(), arrays["journal.expiry_id"].tolist()))
+
+    noyau = core.noyau
+    saved = header["noyau"]
+    noyau.etats.update(saved["etats"])
+    noyau.sensibilite = saved["sensibilite"]
+    noyau.journal = deque(saved["journal"], maxlen=noyau.journal.maxlen)
+    noyau.memoire.traces = deque(((datetime.fromisoformat(moment), fragment) for moment, fragment in saved["memoire"]),
+                                 maxlen=noyau.memoire.traces.maxlen)
+    if saved["contexte"] is not None and noyau.contexte is not None:
+        for key, value in saved["contexte"].items():
+            setattr(noyau.contexte, key, value)
+    return core
+
+
+def load(path: str, memory_dir: str | None = None, events=None, session_id: str | None = None):
+    with open(path, "rb") as fh:
+        return loads(fh.read(), memory_dir=memory_dir, events=events, session_id=session_id)
+
+
+# ----------------------------------------------------------------------
+# Hibernation des sessions
+# ----------------------------------------------------------------------
+class Hibernator:
+    """💤 Sessions inactives écrites sur disque, une par fichier, réveillées à la demande.
+
+    Args:
+        directory: Répertoire des instantanés (`<session>.snap`).
+        memory_dir: session_id → répertoire du journal persisté (None si aucun).
+    """
+
+    def __init__(self, directory: str, memory_dir: Callable[[str], str | None] | None = None):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.memory_dir = memory_dir or (lambda session_id: None)
+        self.saved = 0
+        self.restored = 0
+
+    def path(self, session_id: str) -> str:
+        return os.path.join(self.directory, f"{session_key(session_id)}.snap")
+
+    def save(self, session_id: str, core):
+        save(core, self.path(session_id), session_id)
+        self.saved += 1
+
+    def load(self, session_id: str):
+        """Core réveillé depuis son instantané (retiré du disque), ou None.
+
+        Un instantané illisible est écarté (`.bad`) avant de propager l'erreur :
+        la requête suivante repart d'un core neuf au lieu d'échouer à nouveau.
+        """
+        path = self.path(session_id)
+        try:
+            with open(path, "rb") as fh:
+                data = fh.read()
+        except FileNotFoundError:
+            return None
+        try:
+            core = loads(data, memory_dir=self.memory_dir(session_id), session_id=session_id)
+        except Exception:
+            os.replace(path, f"{path}.bad")
+            raise
+        os.remove(path)
+        self.restored += 1
+        return core
+
+    def discard(self, session_id: str) -> bool:
+        try:
+            os.remove(self.path(session_id))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        return {"hibernated": self.saved, "woken": self.restored}
+
+
+# 🧪 Test local : session de quelques milliers de traces, aller‑retour
+if __name__ == "__main__":
+    os.environ.setdefault("LYRA_LLM_BACKEND", "stub")
+    os.environ.setdefault("LYRA_STUB_LATENCY_MS", "0")
+    os.environ.setdefault("LYRA_ENCODER_BACKEND", "stub")
+    from lyra.core_pipeline import LyraCoreMinimal
+
+    core = LyraCoreMinimal(dt=0.1)
+    tf = transfer_functions
+    core.echo.add_neighbor("critrix", rho=0.3, delta=0.2, gfunc=tf.compose(tf.compose(tf.sigmoid, tf.relu), tf.tanh))
+    core.journal.max_length = 5000
+    core.journal.decay_lambda = 0.0  # aucune trace oubliée
+    for i in range(5000):
+        core.step(f"prompt {i} une mer de silence" if i % 10 == 0 else "")
+    start = time.perf_counter()
+    data = dumps(core)
+    saved_ms = 1000 * (time.perf_counter() - start)
+    start = time.perf_counter()
+    clone = loads(data)
+    loaded_ms = 1000 * (time.perf_counter() - start)
+    print(f"{len(core.journal.store)} traces, {len(data) / 1024:.0f} Kio — "
+          f"sauvegarde {saved_ms:.2f} ms, restauration {loaded_ms:.2f} ms")
+    a, b = core.step("encore la mer"), clone.step("encore la mer")
+    print("même pas suivant :", {k: a[k] == b[k] for k in ("styled_output", "critrix_alert", "noyau_state", "t")})
+    assert core.echo.state == clone.echo.state
+    assert tf.name_of(clone.echo.neighbors["critrix"][2]) == "compose(compose(sigmoid,relu),tanh)"
+
+    import tempfile
+    with tempfile.TemporaryDirectory() as directory:
+        hibernator = Hibernator(directory)
+        hibernator.save("a@b", core)
+        assert hibernator.path("a@b") != hibernator.path("a_b") and hibernator.load("a_b") is None
+        os.replace(hibernator.path("a@b"), hibernator.path("a_b"))
+        try:
+            hibernator.load("a_b")
+        except ValueError as exc:
+            print("instantané d'une autre session refusé :", exc)
+        assert not os.path.exists(hibernator.path("a_b"))
@@ -1,29 +1,134 @@
+"""Fonctions de transfert g(x) des couplages Lyra.
+
+Chaque fonction accepte indifféremment un scalaire ou un tableau NumPy, avec la
+même sémantique élément par élément : LyraNetwork applique g à des groupes
+d'arêtes entiers en un seul appel.
+
+Chaque fonction est décrite par un gabarit d'expression (`{x}` = entrée) et
+enregistrée sous son nom (`REGISTRY`, `get`, `name_of`) : un graphe peut ainsi
+être sérialisé par noms de fonctions. `compose` enchaîne les gabarits dans un
+seul corps de fonction compilé — un appel Python par composition, pas par étage.
+"""
+
+from typing import Callable, Dict
+
 import numpy as np
 
+REGISTRY: Dict[str, Callable] = {}
+_TEMPLATES: Dict[str, str] = {}
+
+
+def transfer(name: str, template: str) -> Callable:
+    """Compile et enregistre la fonction `lambda x: <template>`."""
+    func = eval(f"lambda x: {template.format(x='x')}", {"np": np})
+    return register(name, func, template)
+
+
+def register(name: str, func: Callable, template: str | None = None) -> Callable:
+    """Enregistre `func` sous `name` (gabarit facultatif pour la fusion dans `compose`)."""
+    func.__name__ = name
+    func.lyra_name = name
+    REGISTRY[name] = func
+    if template is not None:
+        func.ufunc_safe = True
+        _TEMPLATES[name] = template
+    return func
+
+
+def name_of(func: Callable) -> str | None:
+    """Nom enregistré de `func` (None si elle n'est pas dans le registre)."""
+    name = getattr(func, "lyra_name", None)
+    return name if name is not None and (REGISTRY.get(name) is func or name.startswith("compose(")) else None
+
+
+def _arguments(inner: str) -> list:
+    """Découpe « a,compose(b,c),d » aux seules virgules de premier niveau."""
+    parts, depth, start = [], 0, 0
+    for i, char in enumerate(inner):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth < 0:
+                break
+        elif char == "," and depth == 0:
+            parts.append(inner[start:i])
+            start = i + 1
+    if depth != 0:
+        raise KeyError(f"Unbalanced transfer function name: compose({inner})")
+    parts.append(inner[start:])
+    return parts
+
+
+def get(name: str) -> Callable:
+    """Fonction enregistrée sous `name` ; « compose(a,b,…) », même imbriquée, est reconstruite."""
+    if name in REGISTRY:
+        return REGISTRY[name]
+    if name.startswith("compose(") and name.endswith(")"):
+        return compose(*(get(part) for part in _arguments(name[len("compose("):-1])))
+    raise KeyError(f"Unknown transfer function: {name!r}")
+
+
 # 🪞 Fonctions linéaires
-identity = lambda x: x
-negate = lambda x: -x
-scale_half = lambda x: 0.5 * x
+identity = transfer("identity", "{x}")
+negate = transfer("negate", "-({x})")
+scale_half = transfer("scale_half", "0.5 * ({x})")
 
 # 🌀 Fonctions non-linéaires classiques
-sigmoid = lambda x: 1 / (1 + np.exp(-x))
-tanh = lambda x: np.tanh(x)
-relu = lambda x: max(0, x)
+sigmoid = transfer("sigmoid", "1 / (1 + np.exp(-({x})))")
+tanh = transfer("tanh", "np.tanh({x})")
+relu = transfer("relu", "np.fmax(0, {x})")  # fmax : relu(nan) = 0, comme max(0, nan)
 
 # 🌿 Fonctions poétiques
-soft_mirror = lambda x: np.sign(x) * np.sqrt(abs(x))  # Amplifie les faibles, compresse les forts
-chaos_echo = lambda x: np.sin(x) * np.tanh(x)         # Filtre ondulatoire non monotone
-sensitivity_curve = lambda x: np.sign(x) * abs(x)**0.3
+soft_mirror = transfer("soft_mirror", "np.sign({x}) * np.sqrt(abs({x}))")  # Amplifie les faibles, compresse les forts
+chaos_echo = transfer("chaos_echo", "np.sin({x}) * np.tanh({x})")         # Filtre ondulatoire non monotone
+sensitivity_curve = transfer("sensitivity_curve", "np.sign({x}) * abs({x})**0.3")
 
 # 🧃 Seuils et clamps
-hard_threshold = lambda x: 1 if x > 0.5 else 0
-clamped = lambda x: np.clip(x, -1, 1)
+hard_threshold = transfer("hard_threshold", "(np.asarray({x}) > 0.5) * 1")
+clamped = transfer("clamped", "np.clip({x}, -1, 1)")
 
 # 🌗 Combinatoires
 def compose(*funcs):
-    """Compose plusieurs fonctions gfunc (f∘g∘h)(x)"""
-    def composed(x):
-        for f in reversed(funcs):
-            x = f(x)
-        return x
+    """Compose plusieurs fonctions gfunc (f∘g∘h)(x) en une seule fonction compilée.
+
+    Les fonctions à gabarit sont recopiées en ligne ; les autres sont appelées
+    telles quelles depuis le corps généré.
+    """
+    scope = {"np": np}
+    lines = ["def composed(x):"]
+    for i, f in enumerate(reversed(funcs)):
+        template = _TEMPLATES.get(name_of(f) or "")
+        if template is None:
+            scope[f"_f{i}"] = f
+            template = f"_f{i}({{x}})"
+        lines.append(f"    x = {template.format(x='x')}")
+    lines.append("    return x")
+    exec("\n".join(lines), scope)
+    composed = scope["composed"]
+    names = [name_of(f) for f in funcs]
+    if all(names):
+        composed.lyra_name = composed.__name__ = f"compose({','.join(names)})"
+    composed.ufunc_safe = all(getattr(f, "ufunc_safe", False) for f in funcs)
     return composed
+
+
+if __name__ == "__main__":
+    # 🧪 Test local : chemins scalaire et tableau identiques pour toute la bibliothèque
+    probe = np.array([-3.0, -1.0, -0.5, 0.0, 0.25, 0.5, 0.75, 1.0, 4.0])
+    funcs = dict(REGISTRY)
+    funcs["compose(sigmoid,relu,negate)"] = compose(sigmoid, relu, negate)
+    funcs["compose(lambda,tanh)"] = compose(lambda x: 2 * x, tanh)
+    for name, f in funcs.items():
+        array = np.asarray(f(probe), dtype=float)
+        scalar = np.array([f(float(v)) for v in probe], dtype=float)
+        # à l'ulp près : NumPy peut vectoriser pow/exp différemment du chemin scalaire
+        assert array.shape == probe.shape and np.allclose(array, scalar, rtol=1e-14, atol=0), name
+        assert np.ndim(f(0.75)) == 0, name
+    assert get("compose(sigmoid,relu,negate)")(probe).tolist() == sigmoid(relu(negate(probe))).tolist()
+    assert name_of(compose(sigmoid, relu)) == "compose(sigmoid,relu)" and name_of(lambda x: x) is None
+    nested = compose(compose(sigmoid, relu), tanh, compose(negate, compose(clamped, relu)))
+    assert get(name_of(nested))(probe).tolist() == nested(probe).tolist()
+    assert name_of(get(name_of(nested))) == name_of(nested)
+    assert relu(float("nan")) == 0 and relu(np.array([np.nan]))[0] == 0
+    print(f"{len(funcs)} fonctions : scalaire ≡ tableau ✔")
@@ -0,0 +1,270 @@
+"""VectorStore — mémoire vectorielle en colonnes contiguës.
+
+Les embeddings sont rangés normalisés dans une matrice float (une ligne par
+trace), à côté de colonnes parallèles : identifiant stable, horodatage,
+valeur, norme d'origine et métadonnées. La similarité cosinus devient un seul
+produit matrice‑vecteur, le top‑k un `argpartition` :
+
+    • pas de norme recalculée à chaque requête,
+    • coût de requête O(n·d) en NumPy, sans boucle Python,
+    • requêtes groupées (plusieurs prompts → un produit matrice‑matrice).
+
+Un index approché facultatif (`lyra.ann.IVFIndex`) peut remplacer le balayage
+exact : il suit les ajouts et suppressions du store et répond par identifiant.
+
+L'ordre d'insertion est conservé (`keep` compacte sans réordonner), ce qui
+garde la sémantique « dernières traces » du journal. `delete` pose des pierres
+tombales (colonne `alive`) en O(1) par trace ; la matrice n'est tassée que
+lorsque la moitié des lignes sont mortes.
+À score égal, la trace la plus ancienne passe en premier (tri stable).
+"""
+
+from typing import Any, Iterator, List, Tuple
+
+import numpy as np
+
+
+class VectorStore:
+    """🗄️ Matrice d'embeddings pré‑normalisés + colonnes (id, t, valeur, méta).
+
+    Args:
+        dim: Dimension des vecteurs (None = fixée par le premier ajout).
+        capacity: Capacité initiale ; doublée à chaque dépassement.
+        dtype: Type flottant de la matrice.
+        index: Index approché (ex. `IVFIndex`) ; None = recherche exacte.
+    """
+
+    def __init__(self, dim: int | None = None, capacity: int = 64, dtype=np.float32, index=None):
+        self.dtype = np.dtype(dtype)
+        self.index = index
+        self.size = 0  # lignes occupées, pierres tombales comprises
+        self.dead = 0
+        self.next_id = 0
+        self.dim = None
+        self._capacity = max(1, int(capacity))
+        self.ids = np.zeros(self._capacity, dtype=np.int64)
+        self.times = np.zeros(self._capacity)
+        self.values = np.zeros(self._capacity)
+        self.norms = np.zeros(self._capacity)
+        self.alive = np.zeros(self._capacity, dtype=bool)
+        self.meta: List[Any] = []
+        self.matrix = None
+        if dim is not None:
+            self._init_matrix(dim)
+
+    def _init_matrix(self, dim: int):
+        self.dim = int(dim)
+        self.matrix = np.zeros((self._capacity, self.dim), dtype=self.dtype)
+
+    def _grow(self, needed: int):
+        capacity = self._capacity
+        while capacity < needed:
+            capacity *= 2
+        if capacity == self._capacity:
+            return
+        for name in ("ids", "times", "values", "norms", "alive", "matrix"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+        self._capacity = capacity
+
+    # ------------------------------------------------------------------
+    def __len__(self):
+        return self.size - self.dead
+
+    @property
+    def nbytes(self) -> int:
+        columns = self.ids.nbytes + self.times.nbytes + self.values.nbytes + self.norms.nbytes
+        return columns + (self.matrix.nbytes if self.matrix is not None else 0)
+
+    def add(self, t: float, value: float, vector, meta=None) -> int:
+        """Ajoute une trace ; retourne son identifiant stable."""
+        vector = np.asarray(vector, dtype=self.dtype).ravel()
+        if self.matrix is None:
+            self._init_matrix(vector.size)
+        elif vector.size != self.dim:
+            raise ValueError(f"VectorStore holds dim {self.dim}, got {vector.size}")
+        self._grow(self.size + 1)
+        i = self.size
+        norm = float(np.linalg.norm(vector))
+        self.matrix[i] = vector / norm if norm else 0.0
+        self.norms[i] = norm
+        self.times[i] = t
+        self.values[i] = value
+        self.ids[i] = self.next_id
+        self.alive[i] = True
+        self.meta.append(meta)
+        self.size += 1
+        self.next_id += 1
+        if self.index is not None:
+            self.index.add(self.ids[i:i + 1], self.matrix[i:i + 1])
+        return int(self.ids[i])
+
+    def load(self, ids, times, values, matrix, norms, meta):
+        """Remplit un store vide avec des colonnes déjà normalisées (restauration d'un instantané)."""
+        if self.size:
+            raise ValueError("VectorStore.load requires an empty store")
+        n = len(ids)
+        if not n:
+            return
+        matrix = np.asarray(matrix, dtype=self.dtype)
+        if self.matrix is None:
+            self._init_matrix(matrix.shape[1])
+        elif matrix.shape[1] != self.dim:
+            raise ValueError(f"VectorStore holds dim {self.dim}, got {matrix.shape[1]}")
+        self._grow(n)
+        self.ids[:n] = ids
+        self.times[:n] = times
+        self.values[:n] = values
+        self.norms[:n] = norms
+        self.alive[:n] = True
+        self.matrix[:n] = matrix
+        self._load_meta(meta)
+        self.size = n
+        self.next_id = max(self.next_id, int(self.ids[n - 1]) + 1)
+        if self.index is not None:
+            self.index.add(self.ids[:n], self.matrix[:n])
+
+    def _load_meta(self, meta):
+        self.meta = list(meta)
+
+    def row(self, trace_id: int) -> int:
+        """Ligne de la trace `trace_id`, ou −1 si elle n'existe plus."""
+        i = int(np.searchsorted(self.ids[:self.size], trace_id))
+        return i if i < self.size and self.ids[i] == trace_id and self.alive[i] else -1
+
+    def live_rows(self) -> np.ndarray:
+        """Indices des lignes vivantes, dans l'ordre d'insertion."""
+        return np.flatnonzero(self.alive[:self.size]) if self.dead else np.arange(self.size)
+
+    def vector(self, i: int) -> np.ndarray:
+        """Vecteur d'origine de la ligne `i` (reconstruit depuis sa norme)."""
+        return self.matrix[i] * self.dtype.type(self.norms[i])
+
+    def rows(self) -> Iterator[Tuple[float, float, np.ndarray, Any]]:
+        """(timestamp, valeur, vecteur, méta) dans l'ordre d'insertion."""
+        for i in self.live_rows():
+            yield float(self.times[i]), float(self.values[i]), self.vector(i), self.meta[i]
+
+    # ------------------------------------------------------------------
+    def keep(self, mask: np.ndarray):
+        """Ne conserve que les lignes où `mask` est vrai (ordre préservé, lignes tassées)."""
+        alive = self.alive[:self.size]
+        mask = np.asarray(mask, dtype=bool) & alive
+        if mask.all():
+            return
+        if self.index is not None:
+            self.index.remove(self.ids[:self.size][alive & ~mask])
+        kept = np.flatnonzero(mask)
+        for name in ("ids", "times", "values", "norms", "alive"):
+            column = getattr(self, name)
+            column[:kept.size] = column[kept]
+        if self.matrix is not None:
+            self.matrix[:kept.size] = self.matrix[kept]
+        self.meta = [self.meta[i] for i in kept]
+        self.size = kept.size
+        self.dead = 0
+
+    def keep_last(self, n: int) -> np.ndarray:
+        """Ne conserve que les `n` dernières traces ; retourne les identifiants retirés."""
+        excess = len(self) - n
+        if excess <= 0:
+            return np.zeros(0, dtype=np.int64)
+        dropped = self.ids[self.live_rows()[:excess]]
+        self.delete(dropped)
+        return dropped
+
+    def delete(self, ids) -> int:
+        """Supprime (pierre tombale) les traces d'identifiants `ids` ; retourne le nombre supprimé."""
+        ids = np.atleast_1d(np.asarray(ids, dtype=np.int64))
+        rows = np.searchsorted(self.ids[:self.size], ids)
+        found = rows < self.size
+        rows = rows[found]
+        rows = rows[(self.ids[rows] == ids[found]) & self.alive[rows]]
+        if not rows.size:
+            return 0
+        self.alive[rows] = False
+        self.dead += rows.size
+        if self.index is not None:
+            self.index.remove(self.ids[rows])
+        if self.dead > max(64, self.size // 2):
+            self.compact()
+        return int(rows.size)
+
+    def shift_times(self, offset: float):
+        """Décale de `offset` l'instant de capture de toutes les traces vivantes."""
+        self.times[self.live_rows()] += offset
+
+    def compact(self):
+        """Tasse la matrice en retirant les pierres tombales."""
+        self.keep(self.alive[:self.size])
+
+    def clear(self):
+        self.size = 0
+        self.dead = 0
+        self.meta = []
+        if self.index is not None:
+            self.index.reset()
+
+    # ------------------------------------------------------------------
+    def scores(self, queries) -> np.ndarray:
+        """Similarités cosinus (B, n) de requêtes (B, d) — ou (n,) pour une requête (d,)."""
+        queries = np.asarray(queries, dtype=self.dtype)
+        norms = np.linalg.norm(queries, axis=-1, keepdims=True)
+        unit = np.divide(queries, norms, out=np.zeros_like(queries), where=norms != 0)
+        return unit @ self.matrix[:self.size].T
+
+    def search(self, query, top_k: int = 5, nprobe: int | None = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Top‑k d'une requête : (indices de ligne, scores), décroissants."""
+        indices, scores = self.search_many(np.asarray(query)[None, :], top_k, nprobe)
+        return indices[0], scores[0]
+
+    def search_many(self, queries, top_k: int = 5, nprobe: int | None = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Top‑k de B requêtes en un seul produit : (B, k) indices et scores.
+
+        Avec un index prêt, la recherche est approchée (`nprobe` listes sondées) ;
+        une ligne à court de candidats est complétée par l'indice −1.
+        """
+        queries = np.atleast_2d(queries)
+        k = min(int(top_k), len(self))
+        if k <= 0 or self.matrix is None:
+            empty = np.zeros((len(queries), 0))
+            return empty.astype(np.intp), empty
+        if self.index is not None and self.index.ready:
+            return self._search_index(queries, k, nprobe)
+        scores = self.scores(queries)
+        if self.dead:
+            scores[:, ~self.alive[:self.size]] = -np.inf
+        if k < self.size:
+            part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            part = np.broadcast_to(np.arange(self.size), scores.shape)
+        part_scores = np.take_along_axis(scores, part, axis=1)
+        order = np.lexsort((part, -part_scores), axis=1)
+        indices = np.take_along_axis(part, order, axis=1)
+        return indices, np.take_along_axis(part_scores, order, axis=1)
+
+    def _search_index(self, queries, k: int, nprobe: int | None):
+        queries = np.asarray(queries, dtype=self.dtype)
+        norms = np.linalg.norm(queries, axis=-1, keepdims=True)
+        unit = np.divide(queries, norms, out=np.zeros_like(queries), where=norms != 0)
+        ids, scores = self.index.search(unit, k, nprobe)
+        # identifiants croissants dans l'ordre d'insertion : ligne = recherche dichotomique
+        rows = np.searchsorted(self.ids[:self.size], ids)
+        return np.where(ids >= 0, rows, -1), scores
+
+
+if __name__ == "__main__":
+    # 🧪 Test local : comparaison avec la boucle cosinus d'origine
+    rng = np.random.default_rng(0)
+    store = VectorStore()
+    vectors = rng.normal(size=(1000, 384)).astype(np.float32)
+    for i, v in enumerate(vectors):
+        store.add(0.1 * i, 1.0, v, {"i": i})
+    q = rng.normal(size=384).astype(np.float32)
+    ref = sorted(range(len(vectors)), key=lambda i: -np.dot(q, vectors[i]) / (np.linalg.norm(q) * np.linalg.norm(vectors[i])))
+    idx, scores = store.search(q, top_k=5)
+    print("top-5 :", idx.tolist(), "référence :", ref[:5])
+    store.keep(np.arange(len(store)) % 2 == 1)
+    print("après compaction :", len(store), "traces, ids", store.ids[:3].tolist())
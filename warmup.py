@@ -0,0 +1,125 @@
+"""Préchauffage du processus et sondes de disponibilité.
+
+Rien de lourd n'est chargé à l'import de `lyra.api` : le modèle d'encodage,
+le client HTTP du LLM et la première construction d'un core (compilation du
+réseau, lexiques) sont faits par un `Warmup`, lancé au démarrage de l'API
+pendant que le serveur accepte déjà les connexions. `/healthz` répond dès que
+le processus vit ; `/readyz` seulement quand le préchauffage est terminé.
+
+Les ressources chargées sont partagées par le processus (`get_encoder`,
+`get_backend`) : une session recréée (/reset, éviction) ne les recharge pas.
+
+Mode (LYRA_WARMUP) : "background" (défaut), "blocking" (le serveur n'accepte
+les connexions qu'une fois prêt) ou "off" (chargement au premier usage).
+"""
+
+import threading
+import time
+from typing import Callable, Dict
+
+STARTED = time.perf_counter()  # import du premier module lyra qui importe celui‑ci
+
+
+def _load_encoder():
+    from lyra.encoder import get_encoder
+    get_encoder().model  # poids chargés, sans inférence
+
+
+def _warm_encoder():
+    from lyra.encoder import get_encoder
+    encoder = get_encoder()
+    encoder.model.encode(["préchauffage"])  # poids chargés et première inférence faite
+
+
+def _warm_llm():
+    from lyra.llm_backends import get_backend
+    get_backend().warm_up()
+
+
+def _warm_core():
+    from lyra.core_pipeline import LyraCoreMinimal
+    LyraCoreMinimal(dt=0.1)
+
+
+DEFAULT_STEPS: Dict[str, Callable[[], None]] = {
+    "encoder": _warm_encoder,
+    "llm": _warm_llm,
+    "core": _warm_core,
+}
+
+# Avant un fork (`lyra.serve`) : rien qui crée des threads natifs ou des connexions
+# (pas d'inférence, pas de client HTTP) — chaque worker fait le reste lui‑même.
+PRELOAD_STEPS: Dict[str, Callable[[], None]] = {
+    "encoder": _load_encoder,
+    "core": _warm_core,
+}
+
+
+class Warmup:
+    """🔥 Étapes de préchauffage exécutées une fois, en séquence, avec leur durée.
+
+    Une étape en échec est signalée (`report()["components"]`) sans bloquer les
+    suivantes ; le processus n'est alors pas déclaré prêt.
+    """
+
+    def __init__(self, steps: Dict[str, Callable[[], None]] | None = None):
+        self.steps = dict(DEFAULT_STEPS if steps is None else steps)
+        self.components: Dict[str, Dict] = {name: {"status": "pending"} for name in self.steps}
+        self.status = "pending"
+        self.ready_after: float | None = None  # secondes depuis STARTED
+        self._done = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def run(self):
+        self.status = "running"
+        for name, step in self.steps.items():
+            component = self.components[name]
+            component["status"] = "running"
+            start = time.perf_counter()
+            try:
+                step()
+            except Exception as exc:
+                component.update(status="failed", error=f"{type(exc).__name__}: {exc}")
+            else:
+                component["status"] = "ready"
+            component["seconds"] = round(time.perf_counter() - start, 4)
+        failed = any(c["status"] == "failed" for c in self.components.values())
+        self.status = "failed" if failed else "ready"
+        self.ready_after = round(time.perf_counter() - STARTED, 4)
+        self._done.set()
+
+    def start(self) -> threading.Thread:
+        """Lance le préchauffage sur un thread d'arrière-plan (une seule fois)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name="lyra-warmup", daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def skip(self):
+        """Pas de préchauffage : prêt tout de suite, chargement au premier usage."""
+        for component in self.components.values():
+            component["status"] = "lazy"
+        self.status = "ready"
+        self.ready_after = round(time.perf_counter() - STARTED, 4)
+        self._done.set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._done.wait(timeout)
+
+    def report(self) -> Dict:
+        return {"status": self.status, "ready_after_s": self.ready_after, "components": self.components}
+
+
+if __name__ == "__main__":
+    # 🧪 Test local : préchauffage hors ligne (backends stub)
+    import os
+    os.environ.setdefault("LYRA_LLM_BACKEND", "stub")
+    os.environ.setdefault("LYRA_ENCODER_BACKEND", "stub")
+    warmup = Warmup()
+    warmup.start()
+    warmup.wait()
+    print(warmup.report())
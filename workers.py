@@ -0,0 +1,41 @@
+"""Pool borné pour le travail CPU du chemin asynchrone.
+
+Encodage sentence-transformers, recherche de similarité et dynamique des
+modules tournent ici plutôt que sur la boucle d'événements. La taille du pool
+se règle via LYRA_CPU_WORKERS (défaut : nombre de cœurs, au plus 8).
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+_pool: ThreadPoolExecutor | None = None
+
+
+def cpu_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        size = int(os.getenv("LYRA_CPU_WORKERS", "0")) or min(8, os.cpu_count() or 1)
+        _pool = ThreadPoolExecutor(max_workers=size, thread_name_prefix="lyra-cpu")
+    return _pool
+
+
+def _after_fork_in_child():
+    global _pool
+    _pool = None  # les threads du pool parent n'existent pas dans l'enfant
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+async def run_cpu(fn, *args, **kwargs):
+    """Exécute fn(*args, **kwargs) sur le pool CPU et attend son résultat.
+
+    Le contexte (`contextvars`) de l'appelant est propagé, comme `asyncio.to_thread`.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(cpu_pool(), functools.partial(context.run, fn, *args, **kwargs))